@@ -1,8 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, designs, brands, ai_layout, ai_image
+from app.api.v1.endpoints import auth, designs, brands, batch, ai_layout, ai_image
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+# Mounted without a prefix: serves /designs:batch and /brands:batch
+api_router.include_router(batch.router)
 api_router.include_router(designs.router, prefix="/designs", tags=["designs"])
 api_router.include_router(brands.router, prefix="/brands", tags=["brands"])
 api_router.include_router(ai_layout.router, prefix="/ai/layout", tags=["ai-layout"])
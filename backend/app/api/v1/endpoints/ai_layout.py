@@ -1,26 +1,50 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError as PydanticValidationError
 from app.services.ai_layout import layout_ai
+from app.services.fabric_converter import fabric_converter
+from app.services.format_adapter import format_adapter
+from app.services.generation_jobs import save_generated_design
+from app.services.job_queue import job_queue
+from app.schemas.ai_models import GenerateRequest
+from app.schemas.canonical_design import CanonicalDesign, DesignFormat
 from app.core.auth import get_current_user_optional, get_user_id
+from app.core.config import settings
 from app.core.logging import get_logger
-from app.core.exceptions import AIServiceError, DatabaseError
-from app.db.supabase import get_supabase
-from supabase import Client
+from app.core.resilience import request_deadline
+from app.core.exceptions import AIServiceError, DatabaseError, NotFoundError, ValidationError
+from app.db.repositories import DesignRepository, get_design_repository
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 
-class GenerateRequest(BaseModel):
-    prompt: str
-    brand_id: str = None
+class AdaptRequest(BaseModel):
+    design: CanonicalDesign
+    # Formats to produce; every DesignFormat if omitted
+    formats: Optional[List[DesignFormat]] = None
+
+
+class ToCanonicalRequest(BaseModel):
+    fabric: Dict[str, Any]
+    title: Optional[str] = None
+    # Inferred from the canvas size if omitted; required when the JSON has none
+    format: Optional[DesignFormat] = None
+
+
+def _sse(event: str, data: Any, id: Optional[int] = None) -> str:
+    """Format one server-sent event; id lets clients resume with Last-Event-ID."""
+    prefix = f"id: {id}\n" if id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
 
 @router.post("/generate", response_model=dict)
 async def generate_design(
     request: GenerateRequest,
     current_user=Depends(get_current_user_optional),
-    supabase: Client = Depends(get_supabase)
+    designs: DesignRepository = Depends(get_design_repository)
 ):
     """
     Generate a design from a text prompt.
@@ -31,7 +55,7 @@ async def generate_design(
     Args:
         request: Generation request with prompt and optional brand_id
         current_user: Optional authenticated user
-        supabase: Supabase client
+        designs: Design repository
 
     Returns:
         Generated design JSON (with database ID if authenticated)
@@ -46,52 +70,313 @@ async def generate_design(
             f"with prompt: {prompt_preview}..."
         )
 
-        # 1. Generate Brief from prompt
-        brief = await layout_ai.prompt_to_brief(request.prompt)
-        logger.info(f"Generated brief for user {user_id}")
-
-        # 2. Generate Design JSON from brief
+        # 1-2. Generate brief and design JSON; identical concurrent
+        # requests share one generation
         # TODO: Pass brand info if brand_id provided
-        design = await layout_ai.brief_to_design(
-            brief, brand_id=request.brand_id
+        generated = await layout_ai.generate(
+            request.prompt,
+            brand_id=request.brand_id,
+            format=request.format,
+            use_cache=not request.bypass_cache,
+            fused=request.fused,
+            instant=request.instant,
         )
+        design = generated["design"]
         logger.info(f"Generated design for user {user_id}")
 
         # 3. Save design to database ONLY if user is authenticated
-        if is_authenticated:
-            design_data = {
-                "title": "AI Generated Design",
-                "format": "instagram_post",
-                "owner_id": user_id,
-                "brand_id": request.brand_id,
-                "design_json": design,
-            }
-
-            res = supabase.table("designs").insert(design_data).execute()
-
-            if not res.data:
-                raise DatabaseError("Failed to save generated design to database")
-
-            saved_design = res.data[0]
-            logger.info(f"Saved design {saved_design['id']} to database for user {user_id}")
-
-            # Return the saved design with the database ID
-            return saved_design
-        else:
-            # For anonymous users, return design in same format as DB record
-            # but with a mock ID (not saved to database)
-            logger.info(f"Returning generated design for anonymous user (not saved to database)")
-            return {
-                "id": "mock_design_1",
-                "title": "AI Generated Design",
-                "format": "instagram_post",
-                "owner_id": "anonymous",
-                "brand_id": request.brand_id,
-                "design_json": design,
-            }
+        return await save_generated_design(
+            design, request, user_id if is_authenticated else None, designs
+        )
 
     except DatabaseError:
         raise
     except Exception as e:
         logger.error(f"Error generating design for user {user_id}: {str(e)}")
         raise AIServiceError(f"Failed to generate design: {str(e)}")
+
+
+@router.post("/generate/stream")
+async def generate_design_stream(
+    request: GenerateRequest,
+    current_user=Depends(get_current_user_optional),
+    designs: DesignRepository = Depends(get_design_repository)
+):
+    """
+    Generate a design from a text prompt, streaming progress as server-sent events.
+
+    Events, in order:
+        brief:  the design brief, as soon as it is ready
+        object: {"index", "object"} for each Fabric.js object as the model
+                writes it
+        design: the complete design JSON (authoritative; replaces streamed
+                objects if generation had to be retried)
+        saved:  the saved design record, as returned by POST /generate
+        error:  {"error", "message"} if generation or saving fails
+
+    Saving follows the same rules as POST /generate.
+    """
+    user_id = get_user_id(current_user) if current_user else None
+    logger.info(
+        f"Streaming design for user {user_id or 'anonymous'} "
+        f"with prompt: {request.prompt[:50]}..."
+    )
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            # Brief and design share one deadline across all their attempts
+            with request_deadline(settings.GEMINI_REQUEST_DEADLINE):
+                brief = await layout_ai.prompt_to_brief(
+                    request.prompt, use_cache=not request.bypass_cache
+                )
+                if request.format:
+                    brief["format"] = request.format
+                yield _sse("brief", brief)
+
+                design = None
+                async for event in layout_ai.stream_design(brief, brand_id=request.brand_id):
+                    if event["type"] == "object":
+                        yield _sse("object", {"index": event["index"], "object": event["object"]})
+                    else:
+                        design = event["design"]
+                        yield _sse("design", design)
+
+            saved = await save_generated_design(design, request, user_id, designs)
+            yield _sse("saved", saved)
+        except DatabaseError as e:
+            yield _sse("error", {"error": e.error_code, "message": e.message})
+        except Exception as e:
+            logger.error(f"Error streaming design for user {user_id or 'anonymous'}: {str(e)}")
+            yield _sse("error", {
+                "error": "AI_SERVICE_ERROR",
+                "message": f"Failed to generate design: {str(e)}",
+            })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/variants")
+async def generate_variants(
+    request: GenerateRequest,
+    n: int = Query(4, ge=1, le=settings.LAYOUT_MAX_VARIANTS, description="Number of variants"),
+    current_user=Depends(get_current_user_optional)
+):
+    """
+    Generate n alternative designs for one prompt, streamed as server-sent events.
+
+    One brief is generated and shared; the designs are generated in
+    parallel, so the whole batch takes about as long as a single design.
+    Variants are not saved: save the chosen one with POST /designs.
+
+    Events, in order:
+        brief:   the shared design brief
+        variant: {"index", "design", "fallback"} as each design completes;
+                 fallback is true when that variant came from the
+                 local layout engine
+        done:    {"variants": n, "fallbacks": count}
+        error:   {"error", "message"} if the brief could not be generated
+    """
+    user_id = get_user_id(current_user) if current_user else "anonymous"
+    logger.info(
+        f"Generating {n} variants for user {user_id} "
+        f"with prompt: {request.prompt[:50]}..."
+    )
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            # The brief and all variants share one deadline
+            with request_deadline(settings.GEMINI_REQUEST_DEADLINE):
+                brief = await layout_ai.prompt_to_brief(
+                    request.prompt, use_cache=not request.bypass_cache
+                )
+                if request.format:
+                    brief["format"] = request.format
+                yield _sse("brief", brief)
+
+                fallbacks = 0
+                async for variant in layout_ai.generate_variants(brief, n, brand_id=request.brand_id):
+                    fallbacks += variant["fallback"]
+                    yield _sse("variant", variant)
+            yield _sse("done", {"variants": n, "fallbacks": fallbacks})
+        except Exception as e:
+            logger.error(f"Error generating variants for user {user_id}: {str(e)}")
+            yield _sse("error", {
+                "error": "AI_SERVICE_ERROR",
+                "message": f"Failed to generate variants: {str(e)}",
+            })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/adapt", response_model=dict)
+async def adapt_design(request: AdaptRequest):
+    """
+    Resize a canonical design to other formats without generating it again.
+
+    Layers keep their anchors, text hierarchy and image fit modes; nothing
+    is saved.
+
+    Args:
+        request: Source design and the formats to produce
+
+    Returns:
+        {"designs": {format: CanonicalDesign}}
+    """
+    adapted = format_adapter.adapt_all(request.design, request.formats)
+    logger.info(
+        f"Adapted design {request.design.id} from {request.design.format.value} "
+        f"to {len(adapted)} formats"
+    )
+    return {
+        "designs": {name: design.model_dump(mode="json") for name, design in adapted.items()}
+    }
+
+
+@router.post("/to-fabric", response_model=dict)
+async def design_to_fabric(design: CanonicalDesign):
+    """
+    Convert a canonical design to Fabric.js canvas JSON.
+
+    Args:
+        design: Canonical design
+
+    Returns:
+        Fabric.js JSON; z-index, effects and design fields are kept in data
+    """
+    return fabric_converter.to_fabric(design)
+
+
+@router.post("/to-canonical", response_model=dict)
+async def fabric_to_design(
+    request: ToCanonicalRequest,
+    current_user=Depends(get_current_user_optional)
+):
+    """
+    Convert Fabric.js canvas JSON to a canonical design.
+
+    Args:
+        request: Fabric.js JSON, with an optional title and format
+
+    Returns:
+        CanonicalDesign
+
+    Raises:
+        ValidationError: If the canvas does not make a valid design, or has
+            no width/height and no format was given
+    """
+    owner_id = get_user_id(current_user) if current_user else None
+    try:
+        design = fabric_converter.to_canonical(
+            request.fabric,
+            owner_id=owner_id,
+            title=request.title,
+            format=request.format.value if request.format else None,
+        )
+    except PydanticValidationError as e:
+        raise ValidationError(f"Invalid Fabric.js design: {e.error_count()} errors")
+    except ValueError as e:
+        raise ValidationError(str(e))
+    return design.model_dump(mode="json")
+
+
+async def _get_job_for(job_id: str, current_user) -> Dict[str, Any]:
+    """Return a job visible to current_user; other users' jobs are not found."""
+    job = await job_queue.get(job_id)
+    owner = job["user_id"] if job else None
+    if job is None or (owner is not None and (
+        current_user is None or get_user_id(current_user) != owner
+    )):
+        raise NotFoundError(f"Job {job_id} not found")
+    return job
+
+
+@router.post("/jobs", response_model=dict, status_code=202)
+async def create_generation_job(
+    request: GenerateRequest,
+    current_user=Depends(get_current_user_optional)
+):
+    """
+    Queue a design generation and return immediately.
+
+    The job runs on a background worker, is saved like POST /generate
+    when it finishes, and survives API restarts while queued.
+
+    Args:
+        request: Same body as POST /generate
+        current_user: Optional authenticated user (owner of the job)
+
+    Returns:
+        The queued job: {"id", "status", "queued_ahead", ...}
+
+    Raises:
+        TooManyRequestsError: If the user already has too many queued jobs
+    """
+    user_id = get_user_id(current_user) if current_user else None
+    job = await job_queue.submit(
+        "layout.generate", request.model_dump(exclude_none=True), user_id
+    )
+    logger.info(
+        f"Queued generation job {job['id']} for user {user_id or 'anonymous'} "
+        f"with prompt: {request.prompt[:50]}..."
+    )
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=dict)
+async def get_generation_job(
+    job_id: str,
+    current_user=Depends(get_current_user_optional)
+):
+    """
+    Get a generation job's status.
+
+    status is queued, running, succeeded or failed; stage is the latest
+    progress event; result is the saved design once the job succeeded.
+
+    Raises:
+        NotFoundError: If the job does not exist or belongs to another user
+    """
+    return await _get_job_for(job_id, current_user)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(
+    job_id: str,
+    current_user=Depends(get_current_user_optional),
+    last_event_id: Optional[int] = Header(None),
+):
+    """
+    Follow a generation job's progress as server-sent events.
+
+    Replays the job's events so far, then pushes new ones until it ends.
+    Each event has an id; reconnect with Last-Event-ID to resume.
+
+    Events:
+        queued:  the job is waiting (again, with "retry", after a lost worker)
+        started: a worker picked the job up ({"attempt"})
+        brief, object, design, saved: as in POST /generate/stream
+        done:    {"id", "result"}, the job succeeded
+        error:   {"error", "message"}, the job failed
+
+    Raises:
+        NotFoundError: If the job does not exist or belongs to another user
+    """
+    await _get_job_for(job_id, current_user)
+
+    async def events() -> AsyncIterator[str]:
+        async for seq, event, data in job_queue.follow(job_id, after=last_event_id or 0):
+            yield _sse(event, data, id=seq)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr
-from app.db.supabase import get_supabase
-from supabase import Client
-from app.core.auth import get_current_user
+from app.db.executor import db_executor
+from app.db.supabase import get_supabase_auth
+from supabase._sync.auth_client import SyncSupabaseAuthClient
+from app.core.auth import get_current_user, get_current_user_remote
 from app.core.logging import get_logger
 from app.core.exceptions import AuthenticationError, ValidationError
 
@@ -23,14 +24,14 @@ class LoginRequest(BaseModel):
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(
     request: SignupRequest,
-    supabase: Client = Depends(get_supabase)
+    auth_client: SyncSupabaseAuthClient = Depends(get_supabase_auth)
 ):
     """
     Sign up a new user.
 
     Args:
         request: Signup request with email and password
-        supabase: Supabase client
+        auth_client: Session-scoped Supabase Auth client
 
     Returns:
         User session data
@@ -41,7 +42,7 @@ async def signup(
         if len(request.password) < 8:
             raise ValidationError("Password must be at least 8 characters long")
 
-        res = supabase.auth.sign_up({
+        res = await db_executor.run(auth_client.sign_up, {
             "email": request.email,
             "password": request.password
         })
@@ -62,14 +63,14 @@ async def signup(
 @router.post("/login")
 async def login(
     request: LoginRequest,
-    supabase: Client = Depends(get_supabase)
+    auth_client: SyncSupabaseAuthClient = Depends(get_supabase_auth)
 ):
     """
     Log in an existing user.
 
     Args:
         request: Login request with email and password
-        supabase: Supabase client
+        auth_client: Session-scoped Supabase Auth client
 
     Returns:
         User session data with access token
@@ -77,7 +78,7 @@ async def login(
     try:
         logger.info(f"Login attempt for email: {request.email}")
 
-        res = supabase.auth.sign_in_with_password({
+        res = await db_executor.run(auth_client.sign_in_with_password, {
             "email": request.email,
             "password": request.password
         })
@@ -95,12 +96,12 @@ async def login(
 
 
 @router.get("/me")
-async def get_me(current_user=Depends(get_current_user)):
+async def get_me(current_user=Depends(get_current_user_remote)):
     """
     Get current user information.
 
     Args:
-        current_user: Authenticated user from JWT token
+        current_user: Full user record from Supabase Auth
 
     Returns:
         Current user data
@@ -116,21 +117,21 @@ async def get_me(current_user=Depends(get_current_user)):
 @router.post("/logout")
 async def logout(
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    auth_client: SyncSupabaseAuthClient = Depends(get_supabase_auth)
 ):
     """
     Log out the current user.
 
     Args:
         current_user: Authenticated user
-        supabase: Supabase client
+        auth_client: Session-scoped Supabase Auth client
 
     Returns:
         Success message
     """
     try:
         logger.info(f"Logout for user {current_user.id}")
-        supabase.auth.sign_out()
+        await db_executor.run(auth_client.sign_out)
         return {"message": "Logged out successfully"}
     except Exception as e:
         logger.error(f"Logout error: {str(e)}")
@@ -0,0 +1,280 @@
+"""
+Batch endpoints for designs and brand kits.
+
+Campaign tooling creates, re-themes and cleans up hundreds of rows at a
+time. These endpoints take up to BATCH_MAX_ITEMS items per request and turn
+them into a handful of bulk PostgREST statements:
+
+- create: one multi-row insert
+- update: one ``UPDATE ... WHERE id IN (...)`` per distinct change set, so
+  applying the same change to many rows is a single statement
+- delete: one ``DELETE ... WHERE id IN (...)``
+
+Every statement is filtered on owner_id. The response reports a status per
+item (201/200/204, 404 for rows the caller does not own or that do not
+exist, 422 for invalid items), so one bad item never fails the batch.
+
+Routes live on their own router because ``/designs:batch`` is not a path
+under the ``/designs`` prefix.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, List, Tuple, Type
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, ValidationError as PydanticValidationError
+
+from app.core.auth import get_current_user, get_user_id
+from app.core.config import settings
+from app.core.exceptions import DatabaseError, ValidationError
+from app.core.logging import get_logger
+from app.db.repositories import (
+    BrandRepository,
+    DesignRepository,
+    SupabaseRepository,
+    get_brand_repository,
+    get_design_repository,
+)
+from app.schemas.batch import (
+    BatchCreateRequest,
+    BatchDeleteRequest,
+    BatchItemResult,
+    BatchResponse,
+    BatchUpdateRequest,
+)
+from app.schemas.brand import BrandKitCreate, BrandKitUpdate
+from app.schemas.design import DesignCreate, DesignUpdate
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+def _check_size(count: int) -> None:
+    if count > settings.BATCH_MAX_ITEMS:
+        raise ValidationError(
+            f"Batch of {count} items exceeds the limit of {settings.BATCH_MAX_ITEMS}"
+        )
+
+
+def _is_uuid(value: Any) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+
+def _invalid(index: int, error: Any, id: Any = None) -> BatchItemResult:
+    return BatchItemResult(index=index, id=id, status=422, error=str(error))
+
+
+def _not_found(index: int, id: str, entity: str) -> BatchItemResult:
+    return BatchItemResult(index=index, id=id, status=404, error=f"{entity} {id} not found")
+
+
+def _response(results: List[BatchItemResult]) -> BatchResponse:
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(1 for result in results if result.status < 400)
+    return BatchResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+async def batch_create(
+    repository: SupabaseRepository,
+    model: Type[BaseModel],
+    items: List[Dict[str, Any]],
+    user_id: str,
+    entity: str,
+) -> BatchResponse:
+    """Validate items individually and insert the valid ones in one statement."""
+    _check_size(len(items))
+    results: List[BatchItemResult] = []
+    rows: List[Dict[str, Any]] = []
+    row_indexes: List[int] = []
+
+    for index, item in enumerate(items):
+        try:
+            data = model(**item).dict()
+        except (PydanticValidationError, TypeError) as e:
+            results.append(_invalid(index, e))
+            continue
+        data["owner_id"] = user_id
+        rows.append(data)
+        row_indexes.append(index)
+
+    if rows:
+        try:
+            created = await repository.create_many(rows)
+        except Exception as e:
+            logger.error(f"Error batch creating {entity.lower()}s: {str(e)}")
+            raise DatabaseError(f"Failed to create {entity.lower()}s: {str(e)}")
+        if len(created) != len(rows):
+            raise DatabaseError(f"Failed to create {entity.lower()}s")
+        for index, row in zip(row_indexes, created):
+            results.append(BatchItemResult(index=index, id=row.get("id"), status=201, data=row))
+
+    logger.info(f"Batch created {len(rows)}/{len(items)} {entity.lower()}s for user {user_id}")
+    return _response(results)
+
+
+async def batch_update(
+    repository: SupabaseRepository,
+    model: Type[BaseModel],
+    items: List[Dict[str, Any]],
+    user_id: str,
+    entity: str,
+) -> BatchResponse:
+    """
+    Apply per-item updates, grouping items that carry the same change set.
+
+    Each group is a single owner-filtered ``UPDATE ... WHERE id IN (...)``;
+    groups run concurrently on the shared connection pool, so an id may
+    appear only once per batch: later items repeating it are rejected.
+    """
+    _check_size(len(items))
+    results: List[BatchItemResult] = []
+    groups: Dict[str, Tuple[Dict[str, Any], List[Tuple[int, str]]]] = {}
+    first_index: Dict[str, int] = {}
+
+    for index, item in enumerate(items):
+        item = dict(item)
+        id = item.pop("id", None)
+        if not isinstance(id, str) or not id:
+            results.append(_invalid(index, "Item is missing an id"))
+            continue
+        if id in first_index:
+            results.append(_invalid(index, f"Item repeats the id of item {first_index[id]}", id=id))
+            continue
+        first_index[id] = index
+        try:
+            data = model(**item).dict(exclude_unset=True)
+        except (PydanticValidationError, TypeError) as e:
+            results.append(_invalid(index, e, id=id))
+            continue
+        if not data:
+            results.append(_invalid(index, "Item has no fields to update", id=id))
+            continue
+        if not _is_uuid(id):
+            results.append(_not_found(index, id, entity))
+            continue
+        key = json.dumps(data, sort_keys=True, default=str)
+        groups.setdefault(key, (data, []))[1].append((index, id))
+
+    try:
+        updated_groups = await asyncio.gather(*(
+            repository.update_many([id for _, id in members], user_id, data)
+            for data, members in groups.values()
+        ))
+    except Exception as e:
+        logger.error(f"Error batch updating {entity.lower()}s: {str(e)}")
+        raise DatabaseError(f"Failed to update {entity.lower()}s: {str(e)}")
+
+    for (_, members), updated in zip(groups.values(), updated_groups):
+        by_id = {row["id"]: row for row in updated}
+        for index, id in members:
+            row = by_id.get(id)
+            if row is None:
+                results.append(_not_found(index, id, entity))
+            else:
+                results.append(BatchItemResult(index=index, id=id, status=200, data=row))
+
+    logger.info(
+        f"Batch updated {len(items)} {entity.lower()}s in {len(groups)} statements for user {user_id}"
+    )
+    return _response(results)
+
+
+async def batch_delete(
+    repository: SupabaseRepository,
+    ids: List[str],
+    user_id: str,
+    entity: str,
+) -> BatchResponse:
+    """Delete all listed rows the caller owns in one statement."""
+    _check_size(len(ids))
+    valid_ids = list({id for id in ids if _is_uuid(id)})
+
+    try:
+        deleted = await repository.delete_many(valid_ids, user_id)
+    except Exception as e:
+        logger.error(f"Error batch deleting {entity.lower()}s: {str(e)}")
+        raise DatabaseError(f"Failed to delete {entity.lower()}s: {str(e)}")
+
+    deleted_ids = {row["id"] for row in deleted}
+    results = [
+        BatchItemResult(index=index, id=id, status=204) if id in deleted_ids
+        else _not_found(index, id, entity)
+        for index, id in enumerate(ids)
+    ]
+
+    logger.info(f"Batch deleted {len(deleted_ids)}/{len(ids)} {entity.lower()}s for user {user_id}")
+    return _response(results)
+
+
+@router.post("/designs:batch", response_model=BatchResponse, tags=["designs"])
+async def create_designs_batch(
+    request: BatchCreateRequest,
+    current_user=Depends(get_current_user),
+    designs: DesignRepository = Depends(get_design_repository)
+):
+    """Create up to BATCH_MAX_ITEMS designs in one request."""
+    return await batch_create(
+        designs, DesignCreate, request.items, get_user_id(current_user), "Design"
+    )
+
+
+@router.patch("/designs:batch", response_model=BatchResponse, tags=["designs"])
+async def update_designs_batch(
+    request: BatchUpdateRequest,
+    current_user=Depends(get_current_user),
+    designs: DesignRepository = Depends(get_design_repository)
+):
+    """Update up to BATCH_MAX_ITEMS designs; each item is {"id", <fields>}."""
+    return await batch_update(
+        designs, DesignUpdate, request.items, get_user_id(current_user), "Design"
+    )
+
+
+@router.delete("/designs:batch", response_model=BatchResponse, tags=["designs"])
+async def delete_designs_batch(
+    request: BatchDeleteRequest,
+    current_user=Depends(get_current_user),
+    designs: DesignRepository = Depends(get_design_repository)
+):
+    """Delete up to BATCH_MAX_ITEMS designs by ID."""
+    return await batch_delete(designs, request.ids, get_user_id(current_user), "Design")
+
+
+@router.post("/brands:batch", response_model=BatchResponse, tags=["brands"])
+async def create_brands_batch(
+    request: BatchCreateRequest,
+    current_user=Depends(get_current_user),
+    brands: BrandRepository = Depends(get_brand_repository)
+):
+    """Create up to BATCH_MAX_ITEMS brand kits in one request."""
+    return await batch_create(
+        brands, BrandKitCreate, request.items, get_user_id(current_user), "Brand"
+    )
+
+
+@router.patch("/brands:batch", response_model=BatchResponse, tags=["brands"])
+async def update_brands_batch(
+    request: BatchUpdateRequest,
+    current_user=Depends(get_current_user),
+    brands: BrandRepository = Depends(get_brand_repository)
+):
+    """Update up to BATCH_MAX_ITEMS brand kits; each item is {"id", <fields>}."""
+    return await batch_update(
+        brands, BrandKitUpdate, request.items, get_user_id(current_user), "Brand"
+    )
+
+
+@router.delete("/brands:batch", response_model=BatchResponse, tags=["brands"])
+async def delete_brands_batch(
+    request: BatchDeleteRequest,
+    current_user=Depends(get_current_user),
+    brands: BrandRepository = Depends(get_brand_repository)
+):
+    """Delete up to BATCH_MAX_ITEMS brand kits by ID."""
+    return await batch_delete(brands, request.ids, get_user_id(current_user), "Brand")
@@ -1,28 +1,57 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.db.supabase import get_supabase
-from supabase import Client
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from app.db.repositories import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    BrandRepository,
+    get_brand_repository,
+)
 from app.schemas.brand import BrandKit, BrandKitCreate, BrandKitUpdate
 from app.core.auth import get_current_user, get_user_id
+from app.core.etag import etag_matches_none, set_etag, updated_at_from_if_match
 from app.core.logging import get_logger
-from app.core.exceptions import NotFoundError, DatabaseError
+from app.core.exceptions import (
+    NotFoundError,
+    DatabaseError,
+    ValidationError,
+    PreconditionFailedError,
+)
 
 router = APIRouter()
 logger = get_logger(__name__)
 
 @router.get("/", response_model=List[dict])
 async def get_brands(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,name,colors,updated_at"),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    brands: BrandRepository = Depends(get_brand_repository)
 ):
-    """Get all brand kits for the current user."""
+    """
+    Get brand kits for the current user, newest first.
+
+    Results are paginated by keyset on (created_at, id). When more rows
+    remain, the cursor for the next page is returned in the X-Next-Cursor
+    header. id and created_at are always included in projected results.
+    """
     try:
         user_id = get_user_id(current_user)
-        logger.info(f"Fetching brands for user {user_id}")
-
-        res = supabase.table("brands").select("*").eq("owner_id", user_id).order("created_at", desc=True).execute()
-        logger.info(f"Found {len(res.data)} brands for user {user_id}")
-        return res.data
+        logger.info(f"Fetching brands for user {user_id} (limit={limit}, cursor={cursor is not None})")
+
+        rows, next_cursor = await brands.list_page(
+            user_id,
+            limit=limit,
+            cursor=cursor,
+            fields=fields.split(",") if fields else None,
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        logger.info(f"Found {len(rows)} brands for user {user_id}")
+        return rows
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching brands: {str(e)}")
         raise DatabaseError(f"Failed to fetch brands: {str(e)}")
@@ -30,8 +59,9 @@ async def get_brands(
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_brand(
     brand: BrandKitCreate,
+    response: Response,
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    brands: BrandRepository = Depends(get_brand_repository)
 ):
     """Create a new brand kit."""
     try:
@@ -41,13 +71,14 @@ async def create_brand(
         brand_data = brand.dict()
         brand_data["owner_id"] = user_id
 
-        res = supabase.table("brands").insert(brand_data).execute()
+        created = await brands.create(brand_data)
 
-        if not res.data:
+        if not created:
             raise DatabaseError("Failed to create brand")
 
-        logger.info(f"Created brand {res.data[0]['id']} for user {user_id}")
-        return res.data[0]
+        logger.info(f"Created brand {created['id']} for user {user_id}")
+        set_etag(response, created)
+        return created
     except Exception as e:
         logger.error(f"Error creating brand: {str(e)}")
         raise DatabaseError(f"Failed to create brand: {str(e)}")
@@ -55,21 +86,29 @@ async def create_brand(
 @router.get("/{id}", response_model=dict)
 async def get_brand(
     id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    brands: BrandRepository = Depends(get_brand_repository)
 ):
     """Get a specific brand kit by ID."""
     try:
         user_id = get_user_id(current_user)
         logger.info(f"Fetching brand {id} for user {user_id}")
 
-        res = supabase.table("brands").select("*").eq("id", id).eq("owner_id", user_id).execute()
+        row = await brands.get(id, user_id)
 
-        if not res.data:
+        if not row:
             logger.warning(f"Brand {id} not found for user {user_id}")
             raise NotFoundError(f"Brand {id} not found")
 
-        return res.data[0]
+        etag = set_etag(response, row)
+        if etag_matches_none(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": response.headers["Cache-Control"]},
+            )
+        return row
     except NotFoundError:
         raise
     except Exception as e:
@@ -80,29 +119,39 @@ async def get_brand(
 async def update_brand(
     id: str,
     brand: BrandKitUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    brands: BrandRepository = Depends(get_brand_repository)
 ):
-    """Update a brand kit."""
+    """
+    Update a brand kit.
+
+    Send If-Match with the ETag from GET to reject the update with 412 if
+    the brand changed since it was read.
+    """
     try:
         user_id = get_user_id(current_user)
         logger.info(f"Updating brand {id} for user {user_id}")
 
-        # Check if brand exists and belongs to user
-        existing = supabase.table("brands").select("id").eq("id", id).eq("owner_id", user_id).execute()
-        if not existing.data:
-            raise NotFoundError(f"Brand {id} not found")
-
-        # Update only provided fields
+        # Update only provided fields; ownership is checked by the update itself
         update_data = brand.dict(exclude_unset=True)
-        res = supabase.table("brands").update(update_data).eq("id", id).execute()
-
-        if not res.data:
-            raise DatabaseError("Failed to update brand")
+        expected_updated_at = updated_at_from_if_match(if_match)
+        if expected_updated_at == "":
+            raise PreconditionFailedError(f"Brand {id} does not match If-Match")
+        updated = await brands.update(
+            id, user_id, update_data, expected_updated_at=expected_updated_at
+        )
+
+        if not updated:
+            if expected_updated_at is not None and await brands.exists(id, user_id):
+                raise PreconditionFailedError(f"Brand {id} has been modified")
+            raise NotFoundError(f"Brand {id} not found")
 
         logger.info(f"Updated brand {id} for user {user_id}")
-        return res.data[0]
-    except (NotFoundError, DatabaseError):
+        set_etag(response, updated)
+        return updated
+    except (NotFoundError, PreconditionFailedError, DatabaseError):
         raise
     except Exception as e:
         logger.error(f"Error updating brand {id}: {str(e)}")
@@ -111,23 +160,32 @@ async def update_brand(
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_brand(
     id: str,
+    if_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    brands: BrandRepository = Depends(get_brand_repository)
 ):
-    """Delete a brand kit."""
+    """
+    Delete a brand kit.
+
+    Honors If-Match the same way as PATCH.
+    """
     try:
         user_id = get_user_id(current_user)
         logger.info(f"Deleting brand {id} for user {user_id}")
 
-        # Check if brand exists and belongs to user
-        existing = supabase.table("brands").select("id").eq("id", id).eq("owner_id", user_id).execute()
-        if not existing.data:
-            raise NotFoundError(f"Brand {id} not found")
+        # Ownership is checked by the delete itself
+        expected_updated_at = updated_at_from_if_match(if_match)
+        if expected_updated_at == "":
+            raise PreconditionFailedError(f"Brand {id} does not match If-Match")
+        deleted = await brands.delete(id, user_id, expected_updated_at=expected_updated_at)
 
-        supabase.table("brands").delete().eq("id", id).execute()
+        if not deleted:
+            if expected_updated_at is not None and await brands.exists(id, user_id):
+                raise PreconditionFailedError(f"Brand {id} has been modified")
+            raise NotFoundError(f"Brand {id} not found")
         logger.info(f"Deleted brand {id} for user {user_id}")
 
-    except NotFoundError:
+    except (NotFoundError, PreconditionFailedError):
         raise
     except Exception as e:
         logger.error(f"Error deleting brand {id}: {str(e)}")
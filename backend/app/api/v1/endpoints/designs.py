@@ -1,28 +1,61 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.db.supabase import get_supabase
-from supabase import Client
-from app.schemas.design import DesignJSON, DesignCreate, DesignUpdate
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from app.db.repositories import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    DesignRepository,
+    get_design_repository,
+)
+from app.schemas.design import DesignJSON, DesignCreate, DesignUpdate, JsonPatchOperation
 from app.core.auth import get_current_user, get_user_id
+from app.core.etag import etag_matches_none, set_etag, updated_at_from_if_match
 from app.core.logging import get_logger
-from app.core.exceptions import NotFoundError, DatabaseError, AuthorizationError
+from app.core.exceptions import (
+    NotFoundError,
+    DatabaseError,
+    ValidationError,
+    PreconditionFailedError,
+    ConflictError,
+    AuthorizationError,
+)
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+MAX_PATCH_OPERATIONS = 500
+
 @router.get("/", response_model=List[dict])
 async def get_designs(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,title,format,thumbnail_url,updated_at"),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    designs: DesignRepository = Depends(get_design_repository)
 ):
-    """Get all designs for the current user."""
+    """
+    Get designs for the current user, newest first.
+
+    Results are paginated by keyset on (created_at, id). When more rows
+    remain, the cursor for the next page is returned in the X-Next-Cursor
+    header. id and created_at are always included in projected results.
+    """
     try:
         user_id = get_user_id(current_user)
-        logger.info(f"Fetching designs for user {user_id}")
-
-        res = supabase.table("designs").select("*").eq("owner_id", user_id).order("created_at", desc=True).execute()
-        logger.info(f"Found {len(res.data)} designs for user {user_id}")
-        return res.data
+        logger.info(f"Fetching designs for user {user_id} (limit={limit}, cursor={cursor is not None})")
+
+        rows, next_cursor = await designs.list_page(
+            user_id,
+            limit=limit,
+            cursor=cursor,
+            fields=fields.split(",") if fields else None,
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        logger.info(f"Found {len(rows)} designs for user {user_id}")
+        return rows
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching designs: {str(e)}")
         raise DatabaseError(f"Failed to fetch designs: {str(e)}")
@@ -30,8 +63,9 @@ async def get_designs(
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_design(
     design: DesignCreate,
+    response: Response,
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    designs: DesignRepository = Depends(get_design_repository)
 ):
     """Create a new design."""
     try:
@@ -41,13 +75,14 @@ async def create_design(
         design_data = design.dict()
         design_data["owner_id"] = user_id
 
-        res = supabase.table("designs").insert(design_data).execute()
+        created = await designs.create(design_data)
 
-        if not res.data:
+        if not created:
             raise DatabaseError("Failed to create design")
 
-        logger.info(f"Created design {res.data[0]['id']} for user {user_id}")
-        return res.data[0]
+        logger.info(f"Created design {created['id']} for user {user_id}")
+        set_etag(response, created)
+        return created
     except Exception as e:
         logger.error(f"Error creating design: {str(e)}")
         raise DatabaseError(f"Failed to create design: {str(e)}")
@@ -55,21 +90,29 @@ async def create_design(
 @router.get("/{id}", response_model=dict)
 async def get_design(
     id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    designs: DesignRepository = Depends(get_design_repository)
 ):
     """Get a specific design by ID."""
     try:
         user_id = get_user_id(current_user)
         logger.info(f"Fetching design {id} for user {user_id}")
 
-        res = supabase.table("designs").select("*").eq("id", id).eq("owner_id", user_id).execute()
+        row = await designs.get(id, user_id)
 
-        if not res.data:
+        if not row:
             logger.warning(f"Design {id} not found for user {user_id}")
             raise NotFoundError(f"Design {id} not found")
 
-        return res.data[0]
+        etag = set_etag(response, row)
+        if etag_matches_none(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": response.headers["Cache-Control"]},
+            )
+        return row
     except NotFoundError:
         raise
     except Exception as e:
@@ -80,54 +123,119 @@ async def get_design(
 async def update_design(
     id: str,
     design: DesignUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    designs: DesignRepository = Depends(get_design_repository)
 ):
-    """Update a design."""
+    """
+    Update a design.
+
+    Send If-Match with the ETag from GET to reject the update with 412 if
+    the design changed since it was read.
+    """
     try:
         user_id = get_user_id(current_user)
         logger.info(f"Updating design {id} for user {user_id}")
 
-        # First check if design exists and belongs to user
-        existing = supabase.table("designs").select("id").eq("id", id).eq("owner_id", user_id).execute()
-        if not existing.data:
-            raise NotFoundError(f"Design {id} not found")
-
-        # Update only provided fields
+        # Update only provided fields; ownership is checked by the update itself
         update_data = design.dict(exclude_unset=True)
-        res = supabase.table("designs").update(update_data).eq("id", id).execute()
-
-        if not res.data:
-            raise DatabaseError("Failed to update design")
+        expected_updated_at = updated_at_from_if_match(if_match)
+        if expected_updated_at == "":
+            raise PreconditionFailedError(f"Design {id} does not match If-Match")
+        updated = await designs.update(
+            id, user_id, update_data, expected_updated_at=expected_updated_at
+        )
+
+        if not updated:
+            if expected_updated_at is not None and await designs.exists(id, user_id):
+                raise PreconditionFailedError(f"Design {id} has been modified")
+            raise NotFoundError(f"Design {id} not found")
 
         logger.info(f"Updated design {id} for user {user_id}")
-        return res.data[0]
-    except (NotFoundError, DatabaseError):
+        set_etag(response, updated)
+        return updated
+    except (NotFoundError, PreconditionFailedError, DatabaseError):
         raise
     except Exception as e:
         logger.error(f"Error updating design {id}: {str(e)}")
         raise DatabaseError(f"Failed to update design: {str(e)}")
 
+@router.patch("/{id}/design-json", response_model=dict)
+async def patch_design_json(
+    id: str,
+    operations: List[JsonPatchOperation],
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user=Depends(get_current_user),
+    designs: DesignRepository = Depends(get_design_repository)
+):
+    """
+    Apply an RFC 6902 JSON Patch to a design's design_json.
+
+    Intended for autosave: send only the edit (e.g. a replace of
+    /objects/3/left) instead of the whole document. The patch is applied
+    atomically in the database and only the changed fragments are returned.
+    A failed "test" operation returns 409; If-Match is honored as for PATCH.
+
+    Returns:
+        {"id", "updated_at", "changes": [{"op", "path", "value"}]}
+    """
+    try:
+        user_id = get_user_id(current_user)
+        logger.info(f"Patching design {id} for user {user_id} ({len(operations)} ops)")
+
+        if not operations:
+            raise ValidationError("Patch must contain at least one operation")
+        if len(operations) > MAX_PATCH_OPERATIONS:
+            raise ValidationError(f"Patch exceeds {MAX_PATCH_OPERATIONS} operations")
+
+        expected_updated_at = updated_at_from_if_match(if_match)
+        if expected_updated_at == "":
+            raise PreconditionFailedError(f"Design {id} does not match If-Match")
+
+        result = await designs.apply_json_patch(
+            id, user_id, operations, expected_updated_at=expected_updated_at
+        )
+
+        logger.info(f"Patched design {id} for user {user_id}")
+        set_etag(response, result)
+        return result
+    except (NotFoundError, PreconditionFailedError, ConflictError, ValidationError):
+        raise
+    except Exception as e:
+        logger.error(f"Error patching design {id}: {str(e)}")
+        raise DatabaseError(f"Failed to patch design: {str(e)}")
+
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_design(
     id: str,
+    if_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    designs: DesignRepository = Depends(get_design_repository)
 ):
-    """Delete a design."""
+    """
+    Delete a design.
+
+    Honors If-Match the same way as PATCH.
+    """
     try:
         user_id = get_user_id(current_user)
         logger.info(f"Deleting design {id} for user {user_id}")
 
-        # Check if design exists and belongs to user
-        existing = supabase.table("designs").select("id").eq("id", id).eq("owner_id", user_id).execute()
-        if not existing.data:
-            raise NotFoundError(f"Design {id} not found")
+        # Ownership is checked by the delete itself
+        expected_updated_at = updated_at_from_if_match(if_match)
+        if expected_updated_at == "":
+            raise PreconditionFailedError(f"Design {id} does not match If-Match")
+        deleted = await designs.delete(id, user_id, expected_updated_at=expected_updated_at)
 
-        supabase.table("designs").delete().eq("id", id).execute()
+        if not deleted:
+            if expected_updated_at is not None and await designs.exists(id, user_id):
+                raise PreconditionFailedError(f"Design {id} has been modified")
+            raise NotFoundError(f"Design {id} not found")
         logger.info(f"Deleted design {id} for user {user_id}")
 
-    except NotFoundError:
+    except (NotFoundError, PreconditionFailedError):
         raise
     except Exception as e:
         logger.error(f"Error deleting design {id}: {str(e)}")
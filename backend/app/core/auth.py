@@ -1,50 +1,268 @@
 """
 Authentication middleware for Radic API.
 Handles JWT validation and user context extraction from Supabase.
+
+Access tokens are verified locally (signature, expiry, audience) against the
+project's JWT secret or its published JWKS, so authenticated requests do not
+pay a round trip to Supabase Auth. The remote ``auth.get_user`` call is only
+used when local verification cannot decide, e.g. no secret is configured or
+the signing key cannot be found.
 """
 
-from typing import Optional
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel, Field
 from supabase import Client
-from app.db.supabase import get_supabase
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.executor import db_executor
+from app.db.supabase import get_supabase, supabase_pool
+
+logger = get_logger(__name__)
 
 security = HTTPBearer()
 
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+class AuthenticatedUser(BaseModel):
+    """User context extracted from a verified access token."""
+
+    id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
+    aud: Optional[str] = None
+    app_metadata: Dict[str, Any] = Field(default_factory=dict)
+    user_metadata: Dict[str, Any] = Field(default_factory=dict)
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "AuthenticatedUser":
+        return cls(
+            id=claims["sub"],
+            email=claims.get("email"),
+            role=claims.get("role"),
+            aud=claims.get("aud"),
+            app_metadata=claims.get("app_metadata") or {},
+            user_metadata=claims.get("user_metadata") or {},
+        )
+
+    @classmethod
+    def from_supabase_user(cls, user: Any) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            aud=user.aud,
+            app_metadata=user.app_metadata or {},
+            user_metadata=user.user_metadata or {},
+            created_at=user.created_at,
+        )
+
+
+class TokenUndecidable(Exception):
+    """Raised when a token can't be verified locally and needs the remote check."""
+
+
+class JWKSCache:
+    """
+    Cached JSON Web Key Set for asymmetric Supabase signing keys.
+
+    Keys are refreshed after ``ttl`` seconds, or early when a token names a
+    key ID we have not seen (key rotation). Early refreshes are rate-limited
+    so a flood of tokens with bogus key IDs can't hammer the JWKS endpoint.
+    """
+
+    def __init__(self, jwks_url: str, ttl: float, min_refresh_interval: float):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str) -> Optional[jwt.PyJWK]:
+        """Return the signing key for a key ID, refreshing the set if needed."""
+        if time.monotonic() - self._fetched_at > self.ttl:
+            await self.refresh()
+        elif kid not in self._keys:
+            await self.refresh(min_age=self.min_refresh_interval)
+        return self._keys.get(kid)
+
+    async def refresh(self, min_age: float = 0) -> None:
+        """Fetch the key set unless it was fetched less than min_age seconds ago."""
+        async with self._lock:
+            if min_age and time.monotonic() - self._fetched_at < min_age:
+                return
+            response = await db_executor.run(supabase_pool.http_client.get, self.jwks_url)
+            response.raise_for_status()
+            key_set = jwt.PyJWKSet.from_dict(response.json())
+            self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+            self._fetched_at = time.monotonic()
+            logger.info(f"Loaded {len(self._keys)} JWT signing keys from JWKS")
+
+
+class TokenVerifier:
+    """Local verifier for Supabase access tokens."""
+
+    def __init__(self, jwt_secret: str, audience: str, jwks: Optional[JWKSCache]):
+        self.jwt_secret = jwt_secret
+        self.audience = audience
+        self.jwks = jwks
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token's signature, expiry and audience.
+
+        Args:
+            token: Encoded JWT
+
+        Returns:
+            Verified claims
+
+        Raises:
+            jwt.InvalidTokenError: Token is definitely invalid
+            TokenUndecidable: Token can't be checked locally
+        """
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+
+        if algorithm == "HS256":
+            if not self.jwt_secret:
+                raise TokenUndecidable("SUPABASE_JWT_SECRET not configured")
+            key: Any = self.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            kid = header.get("kid")
+            if not self.jwks or not kid:
+                raise TokenUndecidable("No JWKS available for asymmetric token")
+            try:
+                signing_key = await self.jwks.get_key(kid)
+            except Exception as e:
+                raise TokenUndecidable(f"JWKS fetch failed: {e}") from e
+            if signing_key is None:
+                raise TokenUndecidable(f"Unknown signing key {kid}")
+            key = signing_key.key
+        else:
+            raise TokenUndecidable(f"Unsupported JWT algorithm {algorithm}")
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            options={"require": ["exp", "sub"]},
+        )
+
+
+token_verifier = TokenVerifier(
+    jwt_secret=settings.SUPABASE_JWT_SECRET,
+    audience=settings.SUPABASE_JWT_AUDIENCE,
+    jwks=JWKSCache(
+        jwks_url=f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json",
+        ttl=settings.AUTH_JWKS_CACHE_TTL,
+        min_refresh_interval=settings.AUTH_JWKS_MIN_REFRESH_INTERVAL,
+    ) if settings.SUPABASE_URL else None,
+)
+
+# Validated users keyed by token hash; entries never outlive the token
+claims_cache: TTLCache[AuthenticatedUser] = TTLCache(
+    max_size=settings.AUTH_CLAIMS_CACHE_SIZE,
+    ttl=settings.AUTH_CLAIMS_CACHE_TTL,
+)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _seconds_until_expiry(token: str) -> Optional[float]:
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return None
+    return exp - time.time() if exp else None
+
+
+async def _fetch_remote_user(token: str, supabase: Client) -> Optional[AuthenticatedUser]:
+    user_response = await db_executor.run(supabase.auth.get_user, token)
+    if not user_response or not user_response.user:
+        return None
+    return AuthenticatedUser.from_supabase_user(user_response.user)
+
+
+async def resolve_user(token: str, supabase: Client) -> Optional[AuthenticatedUser]:
+    """
+    Resolve an access token to a user, verifying locally when possible.
+
+    Args:
+        token: Encoded JWT from the Authorization header
+        supabase: Supabase client used for the remote fallback
+
+    Returns:
+        AuthenticatedUser, or None if the token is invalid
+    """
+    cache_key = _token_key(token)
+    cached = claims_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        claims = await token_verifier.verify(token)
+        user = AuthenticatedUser.from_claims(claims)
+        ttl = claims["exp"] - time.time()
+    except TokenUndecidable as e:
+        logger.debug(f"Local JWT verification undecided ({e}), asking Supabase Auth")
+        user = await _fetch_remote_user(token, supabase)
+        ttl = _seconds_until_expiry(token)
+    except jwt.InvalidTokenError as e:
+        logger.info(f"Rejected access token: {type(e).__name__}: {e}")
+        return None
+
+    if user is not None:
+        claims_cache.set(cache_key, user, ttl=ttl)
+    return user
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     supabase: Client = Depends(get_supabase)
-):
+) -> AuthenticatedUser:
     """
     Validate JWT token and return current user.
-    
+
     Args:
         credentials: Bearer token from Authorization header
-        supabase: Supabase client instance
-        
+        supabase: Supabase client instance (remote fallback only)
+
     Returns:
-        User object from Supabase auth
-        
+        AuthenticatedUser built from the verified token
+
     Raises:
         HTTPException: If token is invalid or user not found
     """
     try:
-        # Get user from Supabase using the JWT token
-        user_response = supabase.auth.get_user(credentials.credentials)
-        
-        if not user_response or not user_response.user:
+        user = await resolve_user(credentials.credentials, supabase)
+
+        if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
-        return user_response.user
-        
+
+        return user
+
     except Exception as e:
-        # Log the error (will be implemented with logging system)
-        print(f"Authentication error: {str(e)}")
+        logger.warning(f"Authentication error: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -52,43 +270,66 @@ async def get_current_user(
         )
 
 
+async def get_current_user_remote(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    supabase: Client = Depends(get_supabase)
+) -> AuthenticatedUser:
+    """
+    Validate JWT token against Supabase Auth and return the full user record.
+
+    Use only where fields absent from the token (such as created_at) are
+    needed; everything else should depend on get_current_user.
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    try:
+        user = await _fetch_remote_user(credentials.credentials, supabase)
+        if user:
+            return user
+    except Exception as e:
+        logger.warning(f"Authentication error: {str(e)}")
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     supabase: Client = Depends(get_supabase)
-):
+) -> Optional[AuthenticatedUser]:
     """
     Optional authentication - returns user if token provided, None otherwise.
     Useful for endpoints that work differently for authenticated vs anonymous users.
-    
+
     Args:
         credentials: Optional bearer token from Authorization header
-        supabase: Supabase client instance
-        
+        supabase: Supabase client instance (remote fallback only)
+
     Returns:
-        User object if authenticated, None otherwise
+        AuthenticatedUser if authenticated, None otherwise
     """
     if not credentials:
         return None
-    
+
     try:
-        user_response = supabase.auth.get_user(credentials.credentials)
-        if user_response and user_response.user:
-            return user_response.user
+        return await resolve_user(credentials.credentials, supabase)
     except Exception:
         pass
-    
+
     return None
 
 
 def get_user_id(user) -> str:
     """
-    Extract user ID from Supabase user object.
-    
+    Extract user ID from an authenticated user.
+
     Args:
-        user: Supabase user object
-        
+        user: AuthenticatedUser
+
     Returns:
         User ID string
     """
     return user.id
-
@@ -0,0 +1,413 @@
+"""
+Caching primitives for Radic backend.
+Thread-safe in-process TTL + LRU cache with hit/miss counters, a SQLite
+disk cache with the same interface, and an optional Redis-backed cache
+shared by all API workers.
+"""
+
+import itertools
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded mapping whose entries expire after a time-to-live.
+
+    When full, the least recently used entry is evicted. Each entry may
+    carry its own TTL, capped at the cache default.
+
+    A read-through caller that loads a value while it may be invalidated
+    takes version(key) before the load and stores with set_if_version(), so
+    a value loaded before an invalidate() is never cached after it.
+
+    Example:
+        cache = TTLCache(max_size=1024, ttl=60)
+        cache.set("key", value)
+        value = cache.get("key")
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        # Invalidation tokens of recently invalidated keys, oldest first
+        self._versions: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._version_counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """Store a value; ttl overrides (but never exceeds) the default TTL."""
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def _set(self, key: Hashable, value: V, ttl: Optional[float]) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def version(self, key: Hashable) -> Optional[int]:
+        """Token of the key's last invalidate(), or None if not recently invalidated."""
+        with self._lock:
+            return self._versions.get(key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove an entry and give the key a new version."""
+        with self._lock:
+            self._data.pop(key, None)
+            # Tokens are never reused, so a forgotten version cannot match again
+            self._versions[key] = next(self._version_counter)
+            self._versions.move_to_end(key)
+            while len(self._versions) > self.max_size:
+                self._versions.popitem(last=False)
+
+    def set_if_version(
+        self, key: Hashable, value: V, version: Optional[int], ttl: Optional[float] = None
+    ) -> bool:
+        """
+        Store a value only if the key was not invalidated since version(key).
+
+        Returns:
+            True if stored, False if the key was invalidated in the meantime
+        """
+        with self._lock:
+            if self._versions.get(key) != version:
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SQLiteCache:
+    """
+    Disk-backed TTL + LRU cache of JSON values, interchangeable with TTLCache.
+
+    Entries survive restarts and are shared by workers on the same host.
+    Expiry and recency use wall-clock time so they stay meaningful across
+    processes.
+
+    Example:
+        cache = SQLiteCache("data/cache.sqlite3", max_size=10000, ttl=3600)
+        cache.set("key", {"headline": "..."})
+        value = cache.get("key")
+    """
+
+    def __init__(self, path: str, max_size: int, ttl: float):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value; ttl overrides (but never exceeds) the default."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        now = time.time()
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, payload, now + ttl, now),
+            )
+            overflow = self._size() - self.max_size
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN"
+                    " (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def _size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._size()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._size(),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Compare-and-set against a key's invalidation token (KEYS[2])
+_SET_IF_VERSION = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[2] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[3])
+return 1
+"""
+
+
+class RedisCache:
+    """
+    JSON cache on Redis, shared by every API worker.
+
+    Entries and invalidations are visible to all workers at once, unlike
+    TTLCache. Requires the optional ``redis`` package. Redis errors are
+    logged and treated as misses, so an unavailable Redis only costs the
+    cache, never the request.
+
+    version(), invalidate() and set_if_version() work as on TTLCache. The
+    invalidation token is a random value kept for one TTL, far longer
+    than any load it guards.
+
+    Example:
+        cache = RedisCache("redis://localhost:6379/0", namespace="brand", ttl=300)
+        await cache.set("key", {"name": "Acme"})
+        value = await cache.get("key")
+    """
+
+    def __init__(self, url: str, namespace: str, ttl: float):
+        import redis.asyncio as redis_asyncio
+
+        self.namespace = namespace
+        self.ttl = ttl
+        self._redis = redis_asyncio.from_url(url)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"radic:{self.namespace}:{key}"
+
+    def _version_key(self, key: str) -> str:
+        return f"radic:{self.namespace}:version:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing, expired or unreachable."""
+        try:
+            raw = await self._redis.get(self._key(key))
+        except Exception as e:
+            self.errors += 1
+            self.misses += 1
+            logger.warning(f"Redis cache get failed: {e}")
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value; ttl never exceeds the default TTL."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        try:
+            await self._redis.set(
+                self._key(key), json.dumps(value, default=str), px=int(ttl * 1000)
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed: {e}")
+
+    async def delete(self, *keys: str) -> None:
+        """Remove entries if present."""
+        if not keys:
+            return
+        try:
+            await self._redis.delete(*(self._key(key) for key in keys))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache delete failed: {e}")
+
+    async def version(self, key: str) -> Optional[str]:
+        """Token of the key's last invalidate(), or None if not recently invalidated."""
+        try:
+            raw = await self._redis.get(self._version_key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache version failed: {e}")
+            # Matches no stored token, so the following set_if_version() is skipped
+            return uuid.uuid4().hex
+        return raw.decode() if isinstance(raw, bytes) else raw
+
+    async def invalidate(self, *keys: str) -> None:
+        """Remove entries and give the keys new versions."""
+        if not keys:
+            return
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.delete(*(self._key(key) for key in keys))
+                for key in keys:
+                    pipe.set(self._version_key(key), uuid.uuid4().hex, px=int(self.ttl * 1000))
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache invalidate failed: {e}")
+
+    async def set_if_version(
+        self, key: str, value: Any, version: Optional[str], ttl: Optional[float] = None
+    ) -> bool:
+        """
+        Store a value only if the key was not invalidated since version(key).
+
+        Returns:
+            True if stored, False if the key was invalidated in the meantime
+            or Redis is unreachable
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return False
+        try:
+            stored = await self._redis.eval(
+                _SET_IF_VERSION, 2, self._key(key), self._version_key(key),
+                json.dumps(value, default=str), version or "", int(ttl * 1000),
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed: {e}")
+            return False
+        return bool(stored)
+
+    async def close(self) -> None:
+        """Release the Redis connection pool."""
+        await self._redis.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache usage."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_shared_cache(url: str, namespace: str, ttl: float) -> Optional[RedisCache]:
+    """
+    Build a RedisCache when a URL is configured.
+
+    Returns:
+        RedisCache, or None when no URL is set or the ``redis`` package is
+        missing, in which case callers fall back to their in-process cache
+    """
+    if not url:
+        return None
+    try:
+        return RedisCache(url, namespace=namespace, ttl=ttl)
+    except ImportError:
+        logger.error("CACHE_REDIS_URL is set but the 'redis' package is not installed")
+        logger.warning(f"Falling back to in-process {namespace} cache")
+        return None
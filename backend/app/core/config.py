@@ -24,12 +24,69 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_KEY: str = ""
+    SUPABASE_TIMEOUT: float = 10.0  # Per-request HTTP timeout in seconds
+    SUPABASE_POOL_MAX_CONNECTIONS: int = 20  # Upper bound on open connections
+    SUPABASE_POOL_MAX_KEEPALIVE: int = 10  # Idle connections kept warm
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = 30.0  # Seconds before an idle connection is closed
+    SUPABASE_EXECUTOR_WORKERS: int = 20  # Threads for blocking Supabase calls (match pool size)
+
+    # Auth - local JWT verification
+    SUPABASE_JWT_SECRET: str = ""  # Legacy HS256 secret; asymmetric keys are read from JWKS
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    AUTH_JWKS_CACHE_TTL: int = 600  # Seconds before the signing key set is re-fetched
+    AUTH_JWKS_MIN_REFRESH_INTERVAL: int = 30  # Min seconds between refreshes on unknown key IDs
+    AUTH_CLAIMS_CACHE_TTL: int = 60  # Seconds a validated token is trusted without re-checking
+    AUTH_CLAIMS_CACHE_SIZE: int = 10000
     
+    # Caching
+    CACHE_REDIS_URL: str = ""  # Shared cache across workers, e.g. redis://localhost:6379/0 (needs `redis`)
+    BRAND_CACHE_TTL: int = 300  # Seconds a cached brand kit is served without re-reading
+    BRAND_CACHE_SIZE: int = 1000  # Max brand kits held in the in-process cache
+
+    BRIEF_CACHE_BACKEND: str = "memory"  # "memory", "disk" or "none"
+    BRIEF_CACHE_TTL: int = 86400  # Seconds a cached design brief is reused
+    BRIEF_CACHE_SIZE: int = 5000  # Max cached design briefs
+    BRIEF_CACHE_PATH: str = "data/brief_cache.sqlite3"  # SQLite file for the disk backend
+
+    # Batch endpoints
+    BATCH_MAX_ITEMS: int = 100  # Max items per /designs:batch or /brands:batch request
+
     # AI - Gemini Configuration
     GEMINI_API_KEY: str = ""
     GEMINI_MODEL_NAME: str = "gemini-2.0-flash-exp"  # Working model with current API key
     GEMINI_TIMEOUT: int = 30  # Request timeout in seconds
     GEMINI_MAX_RETRIES: int = 3  # Retry attempts for transient failures
+    GEMINI_POOL_MAX_CONNECTIONS: int = 50  # Max concurrent HTTP connections to Gemini
+    GEMINI_POOL_MAX_KEEPALIVE: int = 20  # Idle connections kept open for reuse
+    GEMINI_POOL_KEEPALIVE_EXPIRY: float = 60.0  # Seconds an idle connection is kept
+    GEMINI_REQUEST_DEADLINE: float = 45.0  # Total seconds for all attempts of one generation
+    GEMINI_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the circuit
+    GEMINI_BREAKER_RECOVERY_TIMEOUT: float = 30.0  # Seconds open before probing Gemini again
+    GEMINI_BREAKER_HALF_OPEN_PROBES: int = 1  # Concurrent probe calls while half-open
+    GEMINI_HEDGING: bool = False  # Race a duplicate call when Gemini is slower than usual
+    GEMINI_HEDGE_PERCENTILE: float = 95.0  # Hedge after this percentile of recent latencies
+    GEMINI_HEDGE_MIN_DELAY: float = 1.0  # Never hedge sooner than this many seconds
+    GEMINI_HEDGE_MAX_PER_MINUTE: int = 30  # Budget of duplicate calls per minute
+    GEMINI_HEDGE_MIN_SAMPLES: int = 20  # Latencies observed before hedging starts
+    GEMINI_SLIM_SCHEMAS: bool = True  # Send compact structured-output schemas to Gemini
+    GEMINI_PROMPT_CACHE: bool = True  # Cache the static ad-creative prompt prefix at Gemini
+    GEMINI_PROMPT_CACHE_TTL: int = 3600  # Seconds a cached prompt prefix lives
+    GEMINI_PROMPT_CACHE_REFRESH_MARGIN: int = 300  # Refresh when this many seconds remain
+    GEMINI_FUSED_GENERATION: bool = False  # Generate brief and design in one call by default
+    LAYOUT_MAX_VARIANTS: int = 6  # Max designs per /ai/layout/variants request
+    LAYOUT_VARIANT_CONCURRENCY: int = 6  # Variants of one request generated at once
+    LAYOUT_VARIANT_GLOBAL_CONCURRENCY: int = 24  # Variant generations in flight across all requests
+
+    # Background generation jobs
+    JOBS_DB_PATH: str = "data/jobs.sqlite3"  # SQLite queue shared by API and worker processes; ":memory:" is not durable
+    JOBS_WORKERS: int = 4  # Jobs run at once by each API process; 0 leaves them to `python -m app.worker`
+    JOBS_LEASE_SECONDS: float = 60.0  # A job whose worker stops renewing for this long is retried
+    JOBS_MAX_ATTEMPTS: int = 2  # Tries per job before it fails
+    JOBS_TIMEOUT: float = 300.0  # Max seconds one job may run
+    JOBS_POLL_INTERVAL: float = 1.0  # Seconds between checks for jobs and events from other processes
+    JOBS_RETENTION: int = 86400  # Seconds finished jobs and their results are kept
+    JOBS_MAX_QUEUED: int = 1000  # Queued jobs across all users before new ones are refused
+    JOBS_MAX_QUEUED_PER_USER: int = 20  # Queued jobs per user (all anonymous users share one quota)
 
     # AI - Replicate Configuration
     REPLICATE_API_TOKEN: str = ""  # Replicate API token from replicate.com/account/api-tokens
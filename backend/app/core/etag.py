@@ -0,0 +1,91 @@
+"""
+Entity tag helpers for conditional requests.
+
+Row ETags are derived from ``updated_at`` (bumped by a trigger on every
+update), encoded so an If-Match header can be turned back into an
+``updated_at = ...`` filter on the write itself. That lets PATCH/DELETE
+reject lost updates without reading the row first. Rows without
+``updated_at`` fall back to a content hash.
+"""
+
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import Response
+
+_UPDATED_AT_PREFIX = "u."
+_CONTENT_PREFIX = "h."
+
+
+def make_etag(row: Dict[str, Any]) -> str:
+    """Strong ETag for a database row."""
+    updated_at = row.get("updated_at")
+    if updated_at:
+        token = base64.urlsafe_b64encode(str(updated_at).encode()).decode().rstrip("=")
+        return f'"{_UPDATED_AT_PREFIX}{token}"'
+    digest = hashlib.sha256(
+        json.dumps(row, sort_keys=True, default=str, separators=(",", ":")).encode()
+    ).hexdigest()[:32]
+    return f'"{_CONTENT_PREFIX}{digest}"'
+
+
+def _parse_header(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches_none(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches (i.e. a 304 should be sent).
+
+    Uses weak comparison, as RFC 9110 requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    bare = etag.removeprefix("W/")
+    for tag in _parse_header(if_none_match):
+        if tag == "*" or tag.removeprefix("W/") == bare:
+            return True
+    return False
+
+
+def updated_at_from_if_match(if_match: Optional[str]) -> Optional[str]:
+    """
+    Turn an If-Match header into the updated_at value it was issued for.
+
+    Returns:
+        None when there is no precondition (header absent or ``*``), else
+        the updated_at string. Tags that were not issued by make_etag (or
+        do not decode to a timestamp) map to an empty string, which never
+        matches a row.
+    """
+    if not if_match:
+        return None
+    tags = _parse_header(if_match)
+    if "*" in tags:
+        return None
+    # Only the first tag is used: an update can be conditioned on one version
+    tag = tags[0] if tags else ""
+    if tag.startswith("W/") or not (tag.startswith('"') and tag.endswith('"')):
+        return ""
+    value = tag[1:-1]
+    if not value.startswith(_UPDATED_AT_PREFIX):
+        return ""
+    token = value[len(_UPDATED_AT_PREFIX):]
+    try:
+        updated_at = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        # Anything else would fail PostgREST's timestamptz cast with a 500
+        datetime.fromisoformat(updated_at)
+        return updated_at
+    except Exception:
+        return ""
+
+
+def set_etag(response: Response, row: Dict[str, Any]) -> str:
+    """Attach the row's ETag and revalidation headers to a response."""
+    etag = make_etag(row)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return etag
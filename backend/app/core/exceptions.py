@@ -66,6 +66,39 @@ class ValidationError(RadicException):
         )
 
 
+class PreconditionFailedError(RadicException):
+    """Raised when an If-Match precondition does not hold (lost update)."""
+    
+    def __init__(self, message: str = "Resource has been modified"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            error_code="PRECONDITION_FAILED"
+        )
+
+
+class ConflictError(RadicException):
+    """Raised when a request conflicts with the current state of a resource."""
+    
+    def __init__(self, message: str = "Conflict with current resource state"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_409_CONFLICT,
+            error_code="CONFLICT"
+        )
+
+
+class TooManyRequestsError(RadicException):
+    """Raised when a client has too much work queued or in flight."""
+    
+    def __init__(self, message: str = "Too many requests"):
+        super().__init__(
+            message=message,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            error_code="TOO_MANY_REQUESTS"
+        )
+
+
 class AIServiceError(RadicException):
     """Raised when AI service fails."""
     
@@ -0,0 +1,410 @@
+"""
+Failure isolation for upstream AI calls.
+
+CircuitBreaker stops calling an upstream that keeps failing so requests go
+straight to their fallback instead of waiting out every timeout and retry.
+Deadline caps the total time one request may spend across all attempts.
+Hedger cuts tail latency by racing a duplicate call against a slow one.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    closed:    calls pass; failure_threshold consecutive failures open it
+    open:      calls fail fast with CircuitOpenError for recovery_timeout
+    half_open: up to half_open_max_calls probe calls pass; a success
+               closes the circuit, a failure opens it again
+
+    Example:
+        breaker = CircuitBreaker("gemini", failure_threshold=5, recovery_timeout=30)
+        response = await breaker.call(lambda: client.generate(...), timeout=10)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+            logger.info(f"Circuit '{self.name}' half-open, probing upstream")
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (reserves a probe when half-open)."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed, upstream recovered")
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _release(self) -> None:
+        # An abandoned probe neither closes nor reopens the circuit
+        if self._state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def _open(self) -> None:
+        if self._state != self.OPEN:
+            self.times_opened += 1
+            logger.warning(
+                f"Circuit '{self.name}' open after {self._consecutive_failures} "
+                f"consecutive failures, failing fast for {self.recovery_timeout}s"
+            )
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+
+    @asynccontextmanager
+    async def guard(self, neutral: Tuple[Type[BaseException], ...] = ()) -> AsyncIterator[None]:
+        """
+        Guard a block of upstream work: fail fast when open, record the outcome.
+
+        Args:
+            neutral: Exceptions that say nothing about the upstream's health
+                (e.g. a timeout cut short by the request deadline); they
+                count as neither success nor failure
+
+        Raises:
+            CircuitOpenError: If the circuit does not allow the call
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            self._release()
+            raise
+        except neutral:
+            self._release()
+            raise
+        except BaseException:
+            self.record_failure()
+            raise
+        self.record_success()
+
+    async def call(
+        self, func: Callable[[], Awaitable[T]], timeout: float, deadline_bound: bool = False
+    ) -> T:
+        """
+        Run one upstream call under the breaker with a timeout.
+
+        Args:
+            func: The upstream call
+            timeout: Seconds the call may take
+            deadline_bound: timeout was shortened by the request deadline, so
+                a timeout is the request running out of time, not a failure
+
+        Raises:
+            CircuitOpenError: If the circuit does not allow the call
+            asyncio.TimeoutError: If the call exceeds timeout (counts as a
+                failure unless deadline_bound)
+        """
+        async with self.guard(neutral=(asyncio.TimeoutError,) if deadline_bound else ()):
+            return await asyncio.wait_for(func(), timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of breaker state."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar("deadline", default=None)
+
+
+class Deadline:
+    """
+    Point in time by which a request must finish all of its attempts.
+
+    Example:
+        deadline = Deadline.current() or Deadline(45)
+        response = await asyncio.wait_for(call(), timeout=deadline.timeout(30))
+    """
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def current(cls) -> Optional["Deadline"]:
+        """The deadline of the enclosing request_deadline() scope, if any."""
+        return _current_deadline.get()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float) -> float:
+        """Timeout for the next attempt: cap, shortened to the time left."""
+        return min(cap, self.remaining())
+
+    async def sleep(self, seconds: float) -> None:
+        """Back off for up to seconds, never past the deadline."""
+        await asyncio.sleep(min(seconds, self.remaining()))
+
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[Deadline]:
+    """
+    Scope a total deadline over everything awaited inside the block.
+
+    A deadline already in scope is kept if it expires sooner.
+    """
+    outer = _current_deadline.get()
+    deadline = Deadline(seconds)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        try:
+            _current_deadline.reset(token)
+        except ValueError:
+            # An async generator holding the scope was closed from another
+            # task (e.g. abandoned by a disconnected client); the context
+            # the scope was set in is gone with its task
+            pass
+
+
+def gemini_deadline() -> Deadline:
+    """Deadline for a Gemini operation: the request's, or a fresh default one."""
+    return Deadline.current() or Deadline(settings.GEMINI_REQUEST_DEADLINE)
+
+
+class Hedger:
+    """
+    Hedged calls: if a call has not answered by the given percentile of
+    recent latencies, start a duplicate and keep whichever finishes first.
+
+    Latencies are kept per call kind (e.g. short brief calls and long
+    design calls), since one percentile over both would hedge the long
+    calls too early and the short ones too late. Hedging is skipped until
+    min_samples latencies of a kind have been recorded and once
+    max_per_minute hedges (across kinds) have been fired in the last
+    minute, so a slow upstream never sees more than that much extra load.
+
+    Example:
+        hedger = Hedger("gemini", percentile=95, max_per_minute=30)
+        response = await hedger.call(lambda: client.generate(...), key="brief")
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95.0,
+        min_delay: float = 0.5,
+        max_per_minute: int = 30,
+        min_samples: int = 20,
+        window: int = 200,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_per_minute = max_per_minute
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._hedge_times: Deque[float] = deque()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def record(self, latency: float, key: str = "default") -> None:
+        """Add the latency of a successful call to its kind's window."""
+        window = self._latencies.get(key)
+        if window is None:
+            window = self._latencies[key] = deque(maxlen=self.window)
+        window.append(latency)
+
+    def delay(self, key: str = "default") -> Optional[float]:
+        """Seconds to wait before hedging a call of this kind, or None without enough data."""
+        latencies = self._latencies.get(key, ())
+        if not self.enabled or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        rank = math.ceil(self.percentile / 100 * len(ordered)) - 1
+        return max(self.min_delay, ordered[min(max(rank, 0), len(ordered) - 1)])
+
+    def _take_budget(self) -> bool:
+        now = time.monotonic()
+        while self._hedge_times and now - self._hedge_times[0] >= 60:
+            self._hedge_times.popleft()
+        if len(self._hedge_times) >= self.max_per_minute:
+            self.budget_exhausted += 1
+            return False
+        self._hedge_times.append(now)
+        return True
+
+    async def call(self, func: Callable[[], Awaitable[T]], key: str = "default") -> T:
+        """
+        Run func, racing a second func() against it if it is slow.
+
+        "Slow" is judged against recent calls with the same key. func must
+        be safe to call twice. The losing call is cancelled. If the
+        first call to finish fails, the other one is still awaited; the error
+        is raised only when both fail.
+        """
+        self.calls += 1
+        started = time.monotonic()
+        primary = asyncio.ensure_future(func())
+        tasks = [primary]
+        try:
+            delay = self.delay(key)
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done() and self._take_budget():
+                    self.hedged += 1
+                    logger.debug(f"Hedging '{self.name}' {key} call after {delay:.2f}s")
+                    tasks.append(asyncio.ensure_future(func()))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        self.record(time.monotonic() - started, key)
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of hedging activity."""
+        delays = {key: self.delay(key) for key in self._latencies}
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+            "budget_exhausted": self.budget_exhausted,
+            "hedge_delay": {
+                key: round(delay, 3) if delay is not None else None
+                for key, delay in delays.items()
+            },
+        }
+
+
+# Shared by every service that calls Gemini, so they all fail fast together
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=settings.GEMINI_BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=settings.GEMINI_BREAKER_RECOVERY_TIMEOUT,
+    half_open_max_calls=settings.GEMINI_BREAKER_HALF_OPEN_PROBES,
+)
+
+gemini_hedger = Hedger(
+    "gemini",
+    percentile=settings.GEMINI_HEDGE_PERCENTILE,
+    min_delay=settings.GEMINI_HEDGE_MIN_DELAY,
+    max_per_minute=settings.GEMINI_HEDGE_MAX_PER_MINUTE,
+    min_samples=settings.GEMINI_HEDGE_MIN_SAMPLES,
+    enabled=settings.GEMINI_HEDGING,
+)
+
+
+async def call_gemini(
+    func: Callable[[], Awaitable[T]],
+    timeout: float,
+    deadline_bound: bool = False,
+    kind: str = "default",
+) -> T:
+    """
+    Make one Gemini attempt through the shared breaker and hedger.
+
+    A hedged pair counts as a single call for the breaker and shares the
+    timeout. With deadline_bound (timeout shortened by the request
+    deadline), running out of time is not held against Gemini. kind
+    (e.g. "brief", "design") selects the latency window used to decide
+    when to hedge.
+
+    Raises:
+        CircuitOpenError: If the Gemini circuit is open
+        asyncio.TimeoutError: If no answer arrives within timeout
+    """
+    return await gemini_breaker.call(
+        lambda: gemini_hedger.call(func, key=kind), timeout=timeout, deadline_bound=deadline_bound
+    )
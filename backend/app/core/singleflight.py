@@ -0,0 +1,81 @@
+"""
+In-flight request coalescing for Radic backend.
+
+Concurrent callers asking for the same key share one execution instead of
+each doing the same expensive work (e.g. identical Gemini generations fired
+from several browsers at once).
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Run at most one call per key at a time; concurrent callers await it.
+
+    The shared call runs as its own task, so a caller that disconnects does
+    not cancel it for the others. Each caller gets its own deep copy of the
+    result, and every caller sees the exception if the call fails.
+
+    Example:
+        flight = SingleFlight()
+        result = await flight.do(("prompt", None), lambda: generate("prompt"))
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[T]"] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+        self._waiters: Dict[Hashable, int] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await the in-flight call for key, starting it if there is none.
+
+        Args:
+            key: Identity of the work; equal keys share one execution
+            func: Coroutine factory performing the work
+
+        Returns:
+            Copy of the shared result
+        """
+        self.calls += 1
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self._waiters[key])
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[T]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of coalescing activity."""
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "max_waiters": self.max_waiters,
+            "coalesced_rate": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+        }
@@ -0,0 +1,146 @@
+"""
+Bounded thread pool for blocking I/O.
+
+supabase-py's PostgREST and Auth clients are synchronous. Calling them
+directly from an ``async def`` handler blocks the event loop for the whole
+round trip, so every blocking call is dispatched to this pool instead. The
+pool is sized to match the Supabase connection pool so threads never queue
+behind connections they cannot get.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class BlockingIOExecutor:
+    """
+    Instrumented, bounded thread pool for running blocking calls from async code.
+
+    Example:
+        result = await db_executor.run(query.execute)
+    """
+
+    def __init__(self, max_workers: int, name: str = "blocking-io"):
+        self.max_workers = max_workers
+        self.name = name
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.run_time_total = 0.0
+
+    def start(self) -> None:
+        """Create the worker threads' executor (idempotent)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.name,
+                )
+                logger.info(f"Started {self.name} executor with {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        """Wait for running calls to finish and release the threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            logger.info(f"Stopped {self.name} executor")
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Whatever func returns; exceptions are re-raised in the caller
+        """
+        if self._executor is None:
+            self.start()
+
+        submitted = time.perf_counter()
+        call = partial(func, *args, **kwargs)
+        # Whoever leaves the queue first (the call starting, or the caller
+        # being cancelled before it starts) takes the call off "queued"
+        dequeued = False
+
+        def dequeue() -> None:
+            nonlocal dequeued
+            if not dequeued:
+                dequeued = True
+                self.queued -= 1
+
+        def instrumented() -> T:
+            started = time.perf_counter()
+            waited = started - submitted
+            with self._lock:
+                dequeue()
+                self.active += 1
+                self.wait_time_total += waited
+                self.wait_time_max = max(self.wait_time_max, waited)
+            ok = False
+            try:
+                result = call()
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.failed += 0 if ok else 1
+                    self.run_time_total += time.perf_counter() - started
+
+        with self._lock:
+            self.queued += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, instrumented)
+        finally:
+            with self._lock:
+                dequeue()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of executor usage for health checks and monitoring."""
+        with self._lock:
+            completed = self.completed
+            return {
+                "running": self._executor is not None,
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queued": self.queued,
+                "completed": completed,
+                "failed": self.failed,
+                "wait_time_avg_ms": round(
+                    self.wait_time_total / completed * 1000, 3
+                ) if completed else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+                "run_time_avg_ms": round(
+                    self.run_time_total / completed * 1000, 3
+                ) if completed else 0.0,
+            }
+
+
+# Singleton executor for Supabase calls
+db_executor = BlockingIOExecutor(
+    max_workers=settings.SUPABASE_EXECUTOR_WORKERS,
+    name="supabase-io",
+)
@@ -0,0 +1,470 @@
+"""
+Async data access layer for Radic API.
+
+Repositories wrap the shared Supabase client and run every PostgREST call on
+the bounded db_executor, so handlers can ``await`` database I/O without
+blocking the event loop.
+"""
+
+import base64
+import copy
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+from supabase import Client
+
+from app.core.cache import RedisCache, TTLCache, create_shared_cache
+from app.core.config import settings
+from app.core.exceptions import (
+    ConflictError,
+    NotFoundError,
+    PreconditionFailedError,
+    ValidationError,
+)
+from app.db.executor import BlockingIOExecutor, db_executor
+from app.db.supabase import SupabasePool, supabase_pool
+from app.schemas.design import JsonPatchOperation, parse_json_pointer
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just past a row in (created_at, id) order."""
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Both values are checked (an ISO timestamp and a UUID) because they are
+    spliced into a PostgREST filter.
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        datetime.fromisoformat(created_at)
+        return created_at, str(uuid.UUID(id))
+    except Exception:
+        raise ValidationError("Invalid pagination cursor")
+
+
+class SupabaseRepository:
+    """Base repository for an owner-scoped Supabase table."""
+
+    table_name: str = ""
+    columns: FrozenSet[str] = frozenset()
+    # Columns every page needs to build the next cursor
+    key_columns: Tuple[str, ...] = ("id", "created_at")
+
+    def __init__(self, pool: SupabasePool, executor: BlockingIOExecutor):
+        self.pool = pool
+        self.executor = executor
+
+    @property
+    def client(self) -> Client:
+        return self.pool.client
+
+    def _table(self):
+        return self.client.table(self.table_name)
+
+    async def _execute(self, query: Any) -> List[Dict[str, Any]]:
+        """Run a prepared PostgREST query on the executor and return its rows."""
+        res = await self.executor.run(query.execute)
+        return res.data or []
+
+    def projection(self, fields: Optional[Iterable[str]]) -> str:
+        """
+        Build a select clause from requested field names.
+
+        Key columns are always included so the page can be continued.
+
+        Raises:
+            ValidationError: If a field is not a column of this table
+        """
+        if not fields:
+            return "*"
+        requested = [f.strip() for f in fields if f.strip()]
+        unknown = sorted(set(requested) - self.columns)
+        if unknown:
+            raise ValidationError(f"Unknown fields for {self.table_name}: {', '.join(unknown)}")
+        selected = list(self.key_columns)
+        selected += [f for f in requested if f not in selected]
+        return ",".join(selected)
+
+    async def list_page(
+        self,
+        owner_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of a user's rows, newest first, using keyset pagination.
+
+        Rows are ordered by (created_at, id) descending and the page starts
+        strictly after the cursor, so each page is an index range scan no
+        matter how deep the caller has paged.
+
+        Args:
+            owner_id: Owner to list rows for
+            limit: Maximum rows to return
+            cursor: Cursor from the previous page, if any
+            fields: Columns to return (all columns if omitted)
+
+        Returns:
+            (rows, next_cursor); next_cursor is None on the last page
+        """
+        query = (
+            self._table()
+            .select(self.projection(fields))
+            .eq("owner_id", owner_id)
+        )
+        if cursor:
+            created_at, id = decode_cursor(cursor)
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt."{id}")'
+            )
+        rows = await self._execute(
+            query
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit + 1)
+        )
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1])
+        return rows, None
+
+    async def get(self, id: str, owner_id: str) -> Optional[Dict[str, Any]]:
+        """A single row by ID, or None if missing or owned by someone else."""
+        rows = await self._execute(
+            self._table().select("*").eq("id", id).eq("owner_id", owner_id)
+        )
+        return rows[0] if rows else None
+
+    async def exists(self, id: str, owner_id: str) -> bool:
+        """
+        Whether a row with this ID exists and belongs to the owner.
+
+        Writes don't need this up front; use it only to explain a failed
+        conditional write (404 vs 412).
+        """
+        rows = await self._execute(
+            self._table().select("id").eq("id", id).eq("owner_id", owner_id)
+        )
+        return bool(rows)
+
+    async def create(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insert a row and return it, or None if nothing was inserted."""
+        rows = await self._execute(self._table().insert(data))
+        return rows[0] if rows else None
+
+    async def update(
+        self,
+        id: str,
+        owner_id: str,
+        data: Dict[str, Any],
+        expected_updated_at: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update a row the owner holds and return it, in one statement.
+
+        The ownership check is a filter on the UPDATE itself, so None means
+        the row is missing, owned by someone else, or (when
+        expected_updated_at is given) no longer at that version.
+        """
+        query = self._table().update(data).eq("id", id).eq("owner_id", owner_id)
+        if expected_updated_at is not None:
+            query = query.eq("updated_at", expected_updated_at)
+        rows = await self._execute(query)
+        return rows[0] if rows else None
+
+    async def delete(
+        self,
+        id: str,
+        owner_id: str,
+        expected_updated_at: Optional[str] = None,
+    ) -> bool:
+        """Delete a row the owner holds, in one statement. Returns whether it was deleted."""
+        query = self._table().delete().eq("id", id).eq("owner_id", owner_id)
+        if expected_updated_at is not None:
+            query = query.eq("updated_at", expected_updated_at)
+        return bool(await self._execute(query))
+
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert many rows in one statement and return them in input order."""
+        if not rows:
+            return []
+        return await self._execute(self._table().insert(rows))
+
+    async def update_many(
+        self,
+        ids: List[str],
+        owner_id: str,
+        data: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Apply the same update to every listed row the owner holds, in one statement."""
+        if not ids:
+            return []
+        return await self._execute(
+            self._table().update(data).in_("id", ids).eq("owner_id", owner_id)
+        )
+
+    async def delete_many(self, ids: List[str], owner_id: str) -> List[Dict[str, Any]]:
+        """Delete every listed row the owner holds, in one statement. Returns deleted rows."""
+        if not ids:
+            return []
+        return await self._execute(
+            self._table().delete().in_("id", ids).eq("owner_id", owner_id)
+        )
+
+
+# SQLSTATEs raised by apply_design_json_patch (see supabase/migrations/003)
+_PATCH_ERRORS = {
+    "PT404": NotFoundError,
+    "PT409": ConflictError,
+    "PT412": PreconditionFailedError,
+    "PT422": ValidationError,
+}
+
+
+class DesignRepository(SupabaseRepository):
+    """Data access for the designs table."""
+
+    table_name = "designs"
+    columns = frozenset({
+        "id", "owner_id", "brand_id", "title", "format", "design_json",
+        "thumbnail_url", "created_at", "updated_at",
+    })
+
+    async def apply_json_patch(
+        self,
+        id: str,
+        owner_id: str,
+        operations: List[JsonPatchOperation],
+        expected_updated_at: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Apply an RFC 6902 JSON Patch to a design's design_json in the database.
+
+        The patch is applied by the apply_design_json_patch SQL function in a
+        single round trip, so only the operations travel over the wire.
+
+        Args:
+            id: Design ID
+            owner_id: Owner the design must belong to
+            operations: Validated patch operations
+            expected_updated_at: Only apply if the design is still at this version
+
+        Returns:
+            {"id", "updated_at", "changes": [{"op", "path", "value"}]} where
+            value is the new value at each changed path (null if removed)
+
+        Raises:
+            NotFoundError, PreconditionFailedError, ConflictError (failed
+            "test" op), ValidationError (bad path or index)
+        """
+        params = {
+            "p_design_id": id,
+            "p_owner_id": owner_id,
+            "p_operations": [
+                {
+                    "op": operation.op,
+                    "path": parse_json_pointer(operation.path),
+                    "from": parse_json_pointer(operation.from_) if operation.from_ is not None else None,
+                    "value": operation.value,
+                    "pointer": operation.path,
+                    "from_pointer": operation.from_,
+                }
+                for operation in operations
+            ],
+            "p_expected_updated_at": expected_updated_at,
+        }
+        try:
+            res = await self.executor.run(
+                self.client.rpc("apply_design_json_patch", params).execute
+            )
+        except APIError as e:
+            error = _PATCH_ERRORS.get(e.code or "")
+            if error is not None:
+                raise error(e.message)
+            raise
+        return res.data
+
+
+class BrandRepository(SupabaseRepository):
+    """Data access for the brands table."""
+
+    table_name = "brands"
+    columns = frozenset({
+        "id", "owner_id", "name", "colors", "fonts", "logo_image_id",
+        "created_at", "updated_at",
+    })
+
+    def __init__(
+        self,
+        pool: SupabasePool,
+        executor: BlockingIOExecutor,
+        cache: TTLCache[Dict[str, Any]],
+        shared_cache: Optional[RedisCache] = None,
+    ):
+        """
+        Brand kits are read on every generation but rarely change, so get()
+        is a read-through cache keyed by (owner_id, brand_id). Every write
+        through this repository invalidates the rows it touches, and get()
+        only caches a row if its key was not invalidated during the read.
+
+        Args:
+            pool: Supabase pool
+            executor: Executor for blocking PostgREST calls
+            cache: In-process cache, used when no shared cache is configured
+            shared_cache: Redis cache shared across workers, so an update
+                handled by one worker is seen by all of them
+        """
+        super().__init__(pool, executor)
+        self.cache = cache
+        self.shared_cache = shared_cache
+
+    @staticmethod
+    def _cache_key(id: str, owner_id: str) -> str:
+        return f"{owner_id}:{id}"
+
+    async def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.shared_cache is not None:
+            return await self.shared_cache.get(key)
+        return copy.deepcopy(self.cache.get(key))
+
+    async def _cache_version(self, key: str) -> Any:
+        if self.shared_cache is not None:
+            return await self.shared_cache.version(key)
+        return self.cache.version(key)
+
+    async def _cache_fill(self, key: str, row: Dict[str, Any], version: Any) -> None:
+        if self.shared_cache is not None:
+            await self.shared_cache.set_if_version(key, row, version)
+        else:
+            self.cache.set_if_version(key, copy.deepcopy(row), version)
+
+    async def _cache_set(self, row: Dict[str, Any]) -> None:
+        key = self._cache_key(row["id"], row["owner_id"])
+        if self.shared_cache is not None:
+            await self.shared_cache.set(key, row)
+        else:
+            self.cache.set(key, copy.deepcopy(row))
+
+    async def invalidate(self, ids: Iterable[str], owner_id: str) -> None:
+        """Drop cached rows for these brand IDs."""
+        keys = [self._cache_key(id, owner_id) for id in ids]
+        if self.shared_cache is not None:
+            await self.shared_cache.invalidate(*keys)
+        else:
+            for key in keys:
+                self.cache.invalidate(key)
+
+    async def get(self, id: str, owner_id: str) -> Optional[Dict[str, Any]]:
+        """A single brand by ID, served from the cache when possible."""
+        key = self._cache_key(id, owner_id)
+        row = await self._cache_get(key)
+        if row is not None:
+            return row
+        # A write invalidating the key during the read must win over the row read
+        version = await self._cache_version(key)
+        row = await super().get(id, owner_id)
+        if row is not None:
+            await self._cache_fill(key, row, version)
+        return row
+
+    async def create(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        row = await super().create(data)
+        if row is not None:
+            await self._cache_set(row)
+        return row
+
+    async def update(
+        self,
+        id: str,
+        owner_id: str,
+        data: Dict[str, Any],
+        expected_updated_at: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            return await super().update(id, owner_id, data, expected_updated_at)
+        finally:
+            await self.invalidate([id], owner_id)
+
+    async def delete(
+        self,
+        id: str,
+        owner_id: str,
+        expected_updated_at: Optional[str] = None,
+    ) -> bool:
+        try:
+            return await super().delete(id, owner_id, expected_updated_at)
+        finally:
+            await self.invalidate([id], owner_id)
+
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        created = await super().create_many(rows)
+        for row in created:
+            await self._cache_set(row)
+        return created
+
+    async def update_many(
+        self,
+        ids: List[str],
+        owner_id: str,
+        data: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        try:
+            return await super().update_many(ids, owner_id, data)
+        finally:
+            await self.invalidate(ids, owner_id)
+
+    async def delete_many(self, ids: List[str], owner_id: str) -> List[Dict[str, Any]]:
+        try:
+            return await super().delete_many(ids, owner_id)
+        finally:
+            await self.invalidate(ids, owner_id)
+
+    async def close(self) -> None:
+        """Release the shared cache connection, if any."""
+        if self.shared_cache is not None:
+            await self.shared_cache.close()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the active brand cache."""
+        if self.shared_cache is not None:
+            return self.shared_cache.stats()
+        return {"backend": "memory", **self.cache.stats()}
+
+
+# Singleton repositories
+design_repository = DesignRepository(supabase_pool, db_executor)
+brand_repository = BrandRepository(
+    supabase_pool,
+    db_executor,
+    cache=TTLCache(max_size=settings.BRAND_CACHE_SIZE, ttl=settings.BRAND_CACHE_TTL),
+    shared_cache=create_shared_cache(
+        settings.CACHE_REDIS_URL, namespace="brand", ttl=settings.BRAND_CACHE_TTL
+    ),
+)
+
+
+def get_design_repository() -> DesignRepository:
+    """FastAPI dependency returning the design repository."""
+    return design_repository
+
+
+def get_brand_repository() -> BrandRepository:
+    """FastAPI dependency returning the brand repository."""
+    return brand_repository
@@ -1,8 +1,225 @@
-from supabase import create_client, Client
+"""
+Supabase client lifecycle for Radic API.
+
+A single client is created when the app starts (see the lifespan hook in
+app.main) and shared by every request. All PostgREST and Auth traffic goes
+through one bounded, keep-alive httpx connection pool so requests reuse
+warm connections instead of paying client construction and a TCP/TLS
+handshake each time.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from supabase import Client, ClientOptions, create_client
+from supabase._sync.auth_client import SyncSupabaseAuthClient
+
 from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _InstrumentedTransport(httpx.HTTPTransport):
+    """
+    HTTP transport that tracks in-flight requests and connection wait time.
+
+    Wait time is measured from the moment a request enters the pool until
+    httpcore reports the first network event for it (opening a new
+    connection or writing headers on a reused one).
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests_total = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = False
+        upstream_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired and event_name.endswith(".started"):
+                acquired = True
+                self._record_wait(time.perf_counter() - started)
+            if upstream_trace is not None:
+                upstream_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        with self._lock:
+            self.in_flight += 1
+            self.requests_total += 1
+        try:
+            return super().handle_request(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def idle_connections(self) -> int:
+        """Number of pooled connections currently idle."""
+        return sum(1 for conn in self._pool.connections if conn.is_idle())
+
+    def open_connections(self) -> int:
+        """Number of connections currently held by the pool."""
+        return len(self._pool.connections)
+
+
+class SupabasePool:
+    """
+    Owner of the app-lifetime Supabase client and its HTTP connection pool.
+
+    Example:
+        supabase_pool.open()
+        client = supabase_pool.client
+        ...
+        supabase_pool.close()
+    """
+
+    def __init__(
+        self,
+        url: str,
+        key: str,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        timeout: float,
+    ):
+        self.url = url
+        self.key = key
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._transport: Optional[_InstrumentedTransport] = None
+        self._http_client: Optional[httpx.Client] = None
+        self._client: Optional[Client] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None
+
+    def open(self) -> Client:
+        """Create the pooled HTTP client and Supabase client (idempotent)."""
+        with self._lock:
+            if self._client is not None:
+                return self._client
+
+            self._transport = _InstrumentedTransport(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+            self._http_client = httpx.Client(
+                transport=self._transport,
+                timeout=self.timeout,
+                follow_redirects=True,
+            )
+            # The shared client never holds a user session: sign-in/sign-out
+            # go through create_auth_client() so they cannot swap the
+            # Authorization header used by every other request.
+            self._client = create_client(
+                self.url,
+                self.key,
+                options=ClientOptions(
+                    httpx_client=self._http_client,
+                    auto_refresh_token=False,
+                    persist_session=False,
+                ),
+            )
+            logger.info(
+                f"Opened Supabase pool (max_connections={self.max_connections}, "
+                f"max_keepalive={self.max_keepalive_connections})"
+            )
+            return self._client
+
+    def close(self) -> None:
+        """Close all pooled connections and drop the client."""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                logger.info("Closed Supabase pool")
+            self._http_client = None
+            self._transport = None
+            self._client = None
+
+    @property
+    def client(self) -> Client:
+        """Shared Supabase client, opened lazily if the lifespan hook has not run."""
+        return self._client or self.open()
+
+    @property
+    def http_client(self) -> httpx.Client:
+        """Pooled httpx client, for Supabase endpoints supabase-py does not wrap."""
+        self.client  # ensure the pool is open
+        return self._http_client
+
+    def create_auth_client(self) -> SyncSupabaseAuthClient:
+        """
+        Create a session-scoped Auth client that reuses the pooled connections.
+
+        Use this for operations that establish or drop a user session
+        (sign up, sign in, sign out) so session state never leaks into the
+        shared client.
+        """
+        return SyncSupabaseAuthClient(
+            url=f"{self.url.rstrip('/')}/auth/v1",
+            headers={"apiKey": self.key, "Authorization": f"Bearer {self.key}"},
+            auto_refresh_token=False,
+            persist_session=False,
+            http_client=self.http_client,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage for health checks and monitoring."""
+        transport = self._transport
+        if transport is None:
+            return {"open": False}
+
+        requests_total = transport.requests_total
+        return {
+            "open": True,
+            "max_connections": self.max_connections,
+            "connections": transport.open_connections(),
+            "in_use": transport.in_flight,
+            "idle": transport.idle_connections(),
+            "requests_total": requests_total,
+            "wait_time_avg_ms": round(
+                transport.wait_time_total / requests_total * 1000, 3
+            ) if requests_total else 0.0,
+            "wait_time_max_ms": round(transport.wait_time_max * 1000, 3),
+        }
+
+
+supabase_pool = SupabasePool(
+    url=settings.SUPABASE_URL,
+    key=settings.SUPABASE_KEY,
+    max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+    keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+    timeout=settings.SUPABASE_TIMEOUT,
+)
+
 
 def get_supabase() -> Client:
-    url: str = settings.SUPABASE_URL
-    key: str = settings.SUPABASE_KEY
-    supabase: Client = create_client(url, key)
-    return supabase
+    """FastAPI dependency returning the shared Supabase client."""
+    return supabase_pool.client
+
+
+def get_supabase_auth() -> SyncSupabaseAuthClient:
+    """FastAPI dependency returning a session-scoped Auth client on the shared pool."""
+    return supabase_pool.create_auth_client()
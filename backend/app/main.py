@@ -1,8 +1,18 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logging import logger
+from app.db.executor import db_executor
+from app.db.repositories import brand_repository
+from app.core.resilience import gemini_breaker, gemini_hedger
+from app.services.ai_layout import layout_ai
+from app.services.brief_cache import brief_cache
+from app.services.gemini_client import gemini_client_pool
+from app.services.job_queue import job_queue
+from app.services.canonical_layout_generator import canonical_layout_generator
+from app.db.supabase import supabase_pool
 from app.core.exceptions import (
     RadicException,
     radic_exception_handler,
@@ -12,9 +22,30 @@ from app.core.exceptions import (
 # Initialize logging
 logger.info("Starting Radic Backend API")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients on startup and release them on shutdown."""
+    if settings.SUPABASE_URL and settings.SUPABASE_KEY:
+        supabase_pool.open()
+    else:
+        logger.warning("Supabase not configured, skipping client pool setup")
+    db_executor.start()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await brand_repository.close()
+    await canonical_layout_generator.close()
+    await gemini_client_pool.close()
+    job_queue.close()
+    db_executor.shutdown()
+    supabase_pool.close()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Add exception handlers
@@ -29,6 +60,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
         max_age=3600,  # Cache preflight requests for 1 hour
     )
     logger.info(f"CORS enabled for origins: {settings.BACKEND_CORS_ORIGINS}")
@@ -57,7 +89,17 @@ def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "radic-backend"
+        "service": "radic-backend",
+        "supabase_pool": supabase_pool.stats(),
+        "db_executor": db_executor.stats(),
+        "brand_cache": brand_repository.cache_stats(),
+        "brief_cache": brief_cache.stats(),
+        "layout_generations": layout_ai.generations.stats(),
+        "gemini_client": gemini_client_pool.stats(),
+        "prompt_cache": canonical_layout_generator.prompt_cache_stats(),
+        "gemini_breaker": gemini_breaker.stats(),
+        "gemini_hedging": gemini_hedger.stats(),
+        "job_queue": job_queue.stats(),
     }
 
 
@@ -115,25 +115,79 @@ def get_constraints() -> str:
 - Avoid text on busy backgrounds without contrast treatment"""
 
 
-def build_generation_prompt(
-    user_prompt: str,
-    brand_kit: Dict[str, Any] | None = None,
-    reference_images: list[str] | None = None,
-    preferences: Dict[str, Any] | None = None
-) -> str:
+def get_task_instructions() -> str:
+    """Get the step-by-step task and output requirements."""
+    return """## YOUR TASK
+
+Create a professional ad creative design following this process:
+
+### STEP 1: ANALYZE & PLAN
+Think through the design strategy:
+1. What is the primary message/goal?
+2. Who is the target audience?
+3. What format is most appropriate?
+4. What should be the focal point?
+5. What visual style matches the brand and message?
+6. What elements are needed (text, images, shapes)?
+
+### STEP 2: DESIGN DECISIONS
+Make specific decisions about:
+- Canvas format and dimensions
+- Background (color, gradient, or image)
+- Text hierarchy (headline, subheadline, body, CTA)
+- Image elements needed (product, person, background, etc.)
+- Decorative shapes for visual interest
+- Color application (60-30-10 rule)
+- Layout composition (rule of thirds, alignment)
+
+### STEP 3: GENERATE CANONICAL JSON
+Output a complete Canonical Design JSON with:
+- Appropriate canvas size for the format
+- Background configuration
+- All layers with accurate positions (within canvas bounds)
+- Text layers with complete typography properties
+- Image layers with detailed generation prompts (for AI image generation)
+- Shape layers for decorative elements
+- Proper z-index ordering (background to foreground)
+- Effects (shadows, opacity) where appropriate
+
+### CRITICAL REQUIREMENTS:
+1. **All coordinates must be within canvas bounds** (0 to width/height)
+2. **Image layers needing generation must have detailed prompts**
+3. **Text must be readable** (sufficient size and contrast)
+4. **Follow brand kit** (colors, fonts, logo placement)
+5. **Maintain visual hierarchy** (clear focal point)
+6. **Use safe zones** (5-10% margin from edges)
+7. **All generated images must specify transparent background**
+
+Output ONLY the Canonical Design JSON. No explanations, no markdown, just valid JSON."""
+
+
+def get_static_prefix() -> str:
     """
-    Build the complete prompt for ad creative generation.
-    
-    Args:
-        user_prompt: Natural language description from user
-        brand_kit: Brand kit information (colors, fonts, logo)
-        reference_images: List of reference image descriptions/IDs
-        preferences: User preferences (style, tone, etc.)
-    
-    Returns:
-        Complete prompt for AI model
+    Get the instructions shared by every generation request.
+
+    This is the part of the prompt that never changes between requests, so
+    it can be registered once as cached content; build_request_prompt()
+    then supplies the rest.
     """
-    
+    return f"""{get_system_prompt()}
+
+{get_design_principles()}
+
+{get_constraints()}
+
+{get_task_instructions()}"""
+
+
+def _request_sections(
+    user_prompt: str,
+    brand_kit: Dict[str, Any] | None,
+    reference_images: list[str] | None,
+    preferences: Dict[str, Any] | None,
+) -> str:
+    """Brand, reference, preference and user request sections of the prompt."""
+
     # Build brand context
     brand_context = ""
     if brand_kit:
@@ -178,14 +232,7 @@ Consider these references for style, composition, or content inspiration.
 {chr(10).join(prefs_list)}
 """
     
-    # Build the complete prompt
-    prompt = f"""{get_system_prompt()}
-
-{get_design_principles()}
-
-{get_constraints()}
-
-{brand_context}
+    return f"""{brand_context}
 
 {reference_context}
 
@@ -193,52 +240,54 @@ Consider these references for style, composition, or content inspiration.
 
 ## USER REQUEST
 
-{user_prompt}
+{user_prompt}"""
 
-## YOUR TASK
 
-Create a professional ad creative design following this process:
-
-### STEP 1: ANALYZE & PLAN
-Think through the design strategy:
-1. What is the primary message/goal?
-2. Who is the target audience?
-3. What format is most appropriate?
-4. What should be the focal point?
-5. What visual style matches the brand and message?
-6. What elements are needed (text, images, shapes)?
+def build_request_prompt(
+    user_prompt: str,
+    brand_kit: Dict[str, Any] | None = None,
+    reference_images: list[str] | None = None,
+    preferences: Dict[str, Any] | None = None
+) -> str:
+    """
+    Build the per-request part of the prompt, for use with a cached static prefix.
 
-### STEP 2: DESIGN DECISIONS
-Make specific decisions about:
-- Canvas format and dimensions
-- Background (color, gradient, or image)
-- Text hierarchy (headline, subheadline, body, CTA)
-- Image elements needed (product, person, background, etc.)
-- Decorative shapes for visual interest
-- Color application (60-30-10 rule)
-- Layout composition (rule of thirds, alignment)
+    Args:
+        user_prompt: Natural language description from user
+        brand_kit: Brand kit information (colors, fonts, logo)
+        reference_images: List of reference image descriptions/IDs
+        preferences: User preferences (style, tone, etc.)
 
-### STEP 3: GENERATE CANONICAL JSON
-Output a complete Canonical Design JSON with:
-- Appropriate canvas size for the format
-- Background configuration
-- All layers with accurate positions (within canvas bounds)
-- Text layers with complete typography properties
-- Image layers with detailed generation prompts (for AI image generation)
-- Shape layers for decorative elements
-- Proper z-index ordering (background to foreground)
-- Effects (shadows, opacity) where appropriate
+    Returns:
+        Prompt to send alongside cached get_static_prefix() content
+    """
+    return _request_sections(user_prompt, brand_kit, reference_images, preferences)
 
-### CRITICAL REQUIREMENTS:
-1. **All coordinates must be within canvas bounds** (0 to width/height)
-2. **Image layers needing generation must have detailed prompts**
-3. **Text must be readable** (sufficient size and contrast)
-4. **Follow brand kit** (colors, fonts, logo placement)
-5. **Maintain visual hierarchy** (clear focal point)
-6. **Use safe zones** (5-10% margin from edges)
-7. **All generated images must specify transparent background**
 
-Output ONLY the Canonical Design JSON. No explanations, no markdown, just valid JSON."""
+def build_generation_prompt(
+    user_prompt: str,
+    brand_kit: Dict[str, Any] | None = None,
+    reference_images: list[str] | None = None,
+    preferences: Dict[str, Any] | None = None
+) -> str:
+    """
+    Build the complete prompt for ad creative generation.
+    
+    Args:
+        user_prompt: Natural language description from user
+        brand_kit: Brand kit information (colors, fonts, logo)
+        reference_images: List of reference image descriptions/IDs
+        preferences: User preferences (style, tone, etc.)
     
-    return prompt
+    Returns:
+        Complete prompt for AI model
+    """
+    return f"""{get_system_prompt()}
+
+{get_design_principles()}
+
+{get_constraints()}
+
+{_request_sections(user_prompt, brand_kit, reference_images, preferences)}
 
+{get_task_instructions()}"""
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict
 
 
 class DesignBrief(BaseModel):
@@ -92,6 +92,20 @@ class FabricCircleObject(BaseModel):
     opacity: float = 1
 
 
+class GenerateRequest(BaseModel):
+    """Design generation request (POST /ai/layout/generate and its job/stream variants)."""
+
+    prompt: str
+    brand_id: str = None
+    format: str = None
+    # Skip the brief cache and ask the model for a fresh brief
+    bypass_cache: bool = False
+    # One Gemini call for brief and design; None uses GEMINI_FUSED_GENERATION
+    fused: Optional[bool] = None
+    # Skip Gemini and build the design with the local layout engine
+    instant: bool = False
+
+
 def get_fabric_canvas_dimensions(format: str) -> Dict[str, int]:
     """
     Get canvas dimensions for different design formats.
@@ -110,86 +124,3 @@ def get_fabric_canvas_dimensions(format: str) -> Dict[str, int]:
         "linkedin_post": {"width": 1200, "height": 627},
     }
     return dimensions.get(format, {"width": 1080, "height": 1080})
-
-
-def create_mock_design_brief() -> Dict[str, Any]:
-    """Create a mock design brief for fallback purposes."""
-    return {
-        "headline": "Sample Headline",
-        "subheadline": "Sample Subheadline",
-        "visual_focus": ["product"],
-        "layout_style": "modern",
-        "color_scheme": {
-            "primary": "#3b82f6",
-            "secondary": "#1e293b",
-            "accent": "#64748b"
-        },
-        "format": "instagram_post"
-    }
-
-
-def create_mock_fabric_design(brief: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Create a mock Fabric.js design for fallback purposes.
-    
-    Args:
-        brief: Design brief to base the mock design on
-        
-    Returns:
-        Fabric.js compatible design JSON
-    """
-    dimensions = get_fabric_canvas_dimensions(brief.get("format", "instagram_post"))
-    color_scheme = brief.get("color_scheme", {})
-    primary_color = color_scheme.get("primary", "#3b82f6")
-    text_color = color_scheme.get("secondary", "#1e293b")
-    accent_color = color_scheme.get("accent", "#64748b")
-    
-    return {
-        "version": "5.3.0",
-        "objects": [
-            {
-                "type": "rect",
-                "left": 100,
-                "top": 100,
-                "width": dimensions["width"] - 200,
-                "height": 200,
-                "fill": primary_color,
-                "stroke": None,
-                "strokeWidth": 0,
-                "angle": 0,
-                "opacity": 1,
-                "rx": 10,
-                "ry": 10,
-            },
-            {
-                "type": "text",
-                "left": dimensions["width"] / 2,
-                "top": dimensions["height"] / 2 - 50,
-                "width": 400,
-                "height": 100,
-                "text": brief.get("headline", "Sample Headline"),
-                "fontSize": 48,
-                "fontFamily": "Arial",
-                "fontWeight": "bold",
-                "fill": text_color,
-                "textAlign": "center",
-                "originX": "center",
-                "originY": "center",
-            },
-            {
-                "type": "text",
-                "left": dimensions["width"] / 2,
-                "top": dimensions["height"] / 2 + 50,
-                "width": 400,
-                "height": 50,
-                "text": brief.get("subheadline", "Sample Subheadline"),
-                "fontSize": 24,
-                "fontFamily": "Arial",
-                "fill": accent_color,
-                "textAlign": "center",
-                "originX": "center",
-                "originY": "center",
-            }
-        ],
-        "background": "#ffffff"
-    }
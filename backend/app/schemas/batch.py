@@ -0,0 +1,25 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class BatchCreateRequest(BaseModel):
+    # Items are validated one by one so a bad item fails alone
+    items: List[Dict[str, Any]] = Field(..., min_length=1)
+
+class BatchUpdateRequest(BaseModel):
+    # Each item is {"id": ..., <fields to update>}
+    items: List[Dict[str, Any]] = Field(..., min_length=1)
+
+class BatchDeleteRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status: int
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
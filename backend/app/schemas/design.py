@@ -1,5 +1,5 @@
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Literal
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 
 class SmartImageRecipe(BaseModel):
@@ -76,3 +76,39 @@ class DesignCreate(BaseModel):
 class DesignUpdate(BaseModel):
     title: Optional[str] = None
     designJson: Optional[Dict[str, Any]] = None
+
+
+def parse_json_pointer(pointer: str) -> List[str]:
+    """
+    Split an RFC 6901 JSON Pointer into unescaped path segments.
+
+    Raises:
+        ValueError: If the pointer is not empty and does not start with "/"
+    """
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer: {pointer!r}")
+    return [
+        segment.replace("~1", "/").replace("~0", "~")
+        for segment in pointer[1:].split("/")
+    ]
+
+
+class JsonPatchOperation(BaseModel):
+    """Single RFC 6902 JSON Patch operation on a design's design_json."""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    from_: Optional[str] = Field(default=None, alias="from")
+    value: Any = None
+
+    @model_validator(mode="after")
+    def check_operands(self):
+        parse_json_pointer(self.path)
+        if self.op in ("move", "copy"):
+            if self.from_ is None:
+                raise ValueError(f"'{self.op}' requires 'from'")
+            parse_json_pointer(self.from_)
+        if self.op in ("add", "replace", "test") and "value" not in self.model_fields_set:
+            raise ValueError(f"'{self.op}' requires 'value'")
+        return self
@@ -0,0 +1,152 @@
+"""
+JSON schemas sent to Gemini for structured output.
+
+Pydantic rebuilds a model's JSON schema on every model_json_schema() call,
+and the full CanonicalDesign schema is mostly descriptions, titles,
+examples and fields the model never needs to fill (timestamps, lock flags,
+schema version). The schemas here are built once at import and slimmed for
+the model: documentation keys are stripped and optional fields are dropped
+unless they shape the design. Output generated against a slim schema is
+expanded back to the full model locally, with every omitted field taking
+its model default.
+"""
+
+from typing import Any, Dict, Iterable, Set, Type, Union
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.schemas.ai_models import DesignBrief
+from app.schemas.canonical_design import CanonicalDesign
+
+# Keys that document a schema but do not constrain it
+_DOC_KEYS = frozenset({"title", "description", "example", "examples", "default"})
+
+# Optional CanonicalDesign fields (by name, in any sub-model) the model is
+# still offered because they change how the design looks
+CANONICAL_LLM_OPTIONAL_FIELDS = frozenset({
+    # Layer discriminator
+    "type",
+    # Position
+    "rotation",
+    # Effects, Shadow, Stroke
+    "effects", "opacity", "shadow", "stroke",
+    # TextProperties
+    "font_weight", "line_height", "letter_spacing", "text_align", "text_transform",
+    # ImageProperties, ImageGenerationPrompt
+    "generation_prompt", "fit", "negative_prompt", "style_modifiers",
+    "requires_transparent_bg",
+    # ShapeProperties
+    "fill", "border_radius",
+    # Background
+    "color", "gradient", "image_layer_id",
+    # DesignMetadata
+    "design_style", "visual_hierarchy",
+})
+
+
+def slim_json_schema(schema: Dict[str, Any], keep: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Strip documentation and optional fields from a JSON schema.
+
+    Args:
+        schema: JSON schema as produced by model_json_schema()
+        keep: Names of optional properties to keep; required ones always stay
+
+    Returns:
+        New schema with unreferenced $defs removed
+    """
+    keep = frozenset(keep)
+    slim = _slim_node(schema, keep)
+    defs = slim.get("$defs")
+    if defs:
+        used = _referenced_defs(slim, defs)
+        slim["$defs"] = {name: node for name, node in defs.items() if name in used}
+        if not slim["$defs"]:
+            del slim["$defs"]
+    return slim
+
+
+def _slim_node(node: Any, keep: frozenset) -> Any:
+    if isinstance(node, list):
+        return [_slim_node(item, keep) for item in node]
+    if not isinstance(node, dict):
+        return node
+
+    slim: Dict[str, Any] = {}
+    for key, value in node.items():
+        if key in _DOC_KEYS:
+            continue
+        if key == "properties":
+            required = set(node.get("required", ()))
+            value = {
+                name: prop for name, prop in value.items()
+                if name in required or name in keep
+            }
+            slim[key] = {name: _slim_node(prop, keep) for name, prop in value.items()}
+        elif key == "$defs":
+            slim[key] = {name: _slim_node(sub, keep) for name, sub in value.items()}
+        else:
+            slim[key] = _slim_node(value, keep)
+    return slim
+
+
+def _referenced_defs(schema: Dict[str, Any], defs: Dict[str, Any]) -> Set[str]:
+    """Names of $defs reachable from the root schema (not from $defs itself)."""
+    used: Set[str] = set()
+    pending = [{k: v for k, v in schema.items() if k != "$defs"}]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str) and ref.startswith("#/$defs/"):
+                name = ref[len("#/$defs/"):]
+                if name not in used and name in defs:
+                    used.add(name)
+                    pending.append(defs[name])
+            pending.extend(value for key, value in node.items() if key != "$ref")
+    return used
+
+
+# Full schemas, built once
+DESIGN_BRIEF_SCHEMA: Dict[str, Any] = DesignBrief.model_json_schema()
+CANONICAL_DESIGN_SCHEMA: Dict[str, Any] = CanonicalDesign.model_json_schema()
+
+# Model-facing schemas; every DesignBrief field matters, so only docs go
+DESIGN_BRIEF_LLM_SCHEMA: Dict[str, Any] = slim_json_schema(
+    DESIGN_BRIEF_SCHEMA, keep=DesignBrief.model_fields
+)
+CANONICAL_DESIGN_LLM_SCHEMA: Dict[str, Any] = slim_json_schema(
+    CANONICAL_DESIGN_SCHEMA, keep=CANONICAL_LLM_OPTIONAL_FIELDS
+)
+
+_SCHEMAS: Dict[Type[BaseModel], Dict[str, Dict[str, Any]]] = {
+    DesignBrief: {"full": DESIGN_BRIEF_SCHEMA, "slim": DESIGN_BRIEF_LLM_SCHEMA},
+    CanonicalDesign: {"full": CANONICAL_DESIGN_SCHEMA, "slim": CANONICAL_DESIGN_LLM_SCHEMA},
+}
+
+
+def response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Cached schema to send as response_json_schema for model.
+
+    The slim variant is used unless GEMINI_SLIM_SCHEMAS is off. Do not
+    mutate the result: it is shared.
+    """
+    return _SCHEMAS[model]["slim" if settings.GEMINI_SLIM_SCHEMAS else "full"]
+
+
+def expand_canonical_design(data: Union[str, bytes, Dict[str, Any]]) -> CanonicalDesign:
+    """
+    Build the full CanonicalDesign from output generated against the slim schema.
+
+    Fields the model was not offered take their model defaults.
+
+    Raises:
+        pydantic.ValidationError: If the output does not form a valid design
+    """
+    if isinstance(data, (str, bytes)):
+        return CanonicalDesign.model_validate_json(data)
+    return CanonicalDesign.model_validate(data)
@@ -1,70 +1,352 @@
-from typing import Dict, Any
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Any, Optional
 import asyncio
 import json
-from google import genai
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.resilience import (
+    CircuitOpenError,
+    call_gemini,
+    gemini_breaker,
+    gemini_deadline,
+    request_deadline,
+)
+from app.core.singleflight import SingleFlight
+from app.schemas.llm_schemas import response_schema
+from app.services.brief_cache import BriefCache, brief_cache
+from app.services.gemini_client import GeminiClientPool, gemini_client_pool
+from app.services.json_stream import LayoutElementStream, fabric_object_stream
+from app.services.layout_engine import brief_from_prompt, layout_engine
 from app.schemas.ai_models import (
     DesignBrief,
-    create_mock_design_brief,
-    create_mock_fabric_design,
     get_fabric_canvas_dimensions,
 )
 
+if TYPE_CHECKING:
+    from google import genai
+
 logger = get_logger(__name__)
 
+# Bump when the prompt_to_brief prompt changes so cached briefs are not reused
+BRIEF_PROMPT_VERSION = "1"
+# Same for the fused brief+design prompt; its briefs are cached separately
+FUSED_PROMPT_VERSION = "fused-1"
+
+# Art direction per variant, so parallel variants of one brief differ
+VARIANT_DIRECTIONS = (
+    "centered, symmetrical composition with the headline as the focal point",
+    "asymmetric layout with text aligned to the left and shapes on the right",
+    "bold full-bleed color blocks with large, heavy typography",
+    "minimal layout with generous whitespace and small accents",
+    "dynamic diagonal arrangement of shapes leading the eye to the headline",
+    "framed layout with a border and content stacked in the middle",
+)
+
+# Canvas sizes the fused prompt offers the model, by format
+FUSED_FORMATS = (
+    "instagram_post", "instagram_story", "facebook_post", "twitter_post", "linkedin_post",
+)
+
 
 class LayoutAI:
     """AI-powered layout generation service using Google Gemini."""
     
-    def __init__(self):
-        """Initialize Gemini client with API key from settings."""
-        try:
-            # Initialize client with API key from settings
-            api_key = settings.GEMINI_API_KEY
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY not configured in settings")
-            logger.info(f"API Key configured (length: {len(api_key)})")
-
-            self.client = genai.Client(api_key=api_key)
-            self.model_name = settings.GEMINI_MODEL_NAME
-            self.timeout = settings.GEMINI_TIMEOUT
-            self.max_retries = settings.GEMINI_MAX_RETRIES
+    def __init__(
+        self,
+        brief_cache: Optional[BriefCache] = None,
+        clients: Optional[GeminiClientPool] = None,
+    ):
+        """
+        Configure the service; the Gemini client is opened on first use.
+
+        Args:
+            brief_cache: Cache for prompt_to_brief results (disabled if None)
+            clients: Gemini client pool (defaults to the shared one)
+        """
+        self.brief_cache = brief_cache or BriefCache(None)
+        self.clients = clients or gemini_client_pool
+        # Identical concurrent generations share one upstream call
+        self.generations: SingleFlight[Dict[str, Any]] = SingleFlight()
+        # Caps variant generations in flight across all requests
+        self.variant_slots = asyncio.Semaphore(settings.LAYOUT_VARIANT_GLOBAL_CONCURRENCY)
+        self.model_name = settings.GEMINI_MODEL_NAME
+        self.timeout = settings.GEMINI_TIMEOUT
+        self.max_retries = settings.GEMINI_MAX_RETRIES
+        if self.clients.is_configured:
             logger.info(
                 f"Initialized LayoutAI with model={self.model_name}, "
                 f"timeout={self.timeout}s, max_retries={self.max_retries}"
             )
-            logger.info(
-                f"Client initialized successfully: {self.client is not None}"
-            )
+        else:
+            logger.warning("GEMINI_API_KEY not configured, LayoutAI will use the local layout engine")
+
+    @property
+    def client(self) -> Optional["genai.Client"]:
+        """Shared Gemini client, or None when Gemini is not configured."""
+        if not self.clients.is_configured:
+            return None
+        try:
+            return self.clients.client
         except Exception as e:
-            logger.error(
-                f"Failed to initialize Gemini client: "
-                f"{type(e).__name__}: {str(e)}"
-            )
-            logger.warning("Will fall back to mock data for all requests")
-            self.client = None
-            import traceback
-            logger.debug(
-                f"Initialization error traceback: {traceback.format_exc()}"
-            )
+            logger.error(f"Failed to initialize Gemini client: {type(e).__name__}: {str(e)}")
+            return None
 
-    async def prompt_to_brief(self, prompt: str) -> Dict[str, Any]:
+    async def generate(
+        self,
+        prompt: str,
+        brand_id: str | None = None,
+        format: str | None = None,
+        use_cache: bool = True,
+        fused: Optional[bool] = None,
+        instant: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Run prompt_to_brief and brief_to_design as one generation.
+
+        With instant, Gemini is not called at all, see instant_design.
+
+        With fused generation (per call, or GEMINI_FUSED_GENERATION by
+        default) the brief and design come from a single Gemini call
+        instead, see prompt_to_design.
+
+        All Gemini attempts of the generation share one total deadline
+        (GEMINI_REQUEST_DEADLINE), and every call goes through the shared
+        Gemini circuit breaker, so a degraded upstream costs a bounded wait
+        or an immediate fallback instead of every retry's timeout.
+
+        Concurrent calls with the same (prompt, brand_id, format, use_cache,
+        fused) are coalesced: the first caller runs the generation and the others
+        await its result, so a burst of identical requests costs one set of
+        Gemini calls.
+
+        Args:
+            prompt: User's design request
+            brand_id: Optional brand ID for brand-specific customization
+            format: Optional design format overriding the one in the brief
+            use_cache: Passed to prompt_to_brief
+            fused: One Gemini call instead of two; None uses the config
+            instant: Build the design locally instead of with Gemini
+
+        Returns:
+            {"brief": ..., "design": ...}
+        """
+        if instant:
+            return self.instant_design(prompt, format=format, use_cache=use_cache)
+
+        use_fused = settings.GEMINI_FUSED_GENERATION if fused is None else fused
+
+        async def run() -> Dict[str, Any]:
+            # Brief and design share one deadline across all their attempts
+            with request_deadline(settings.GEMINI_REQUEST_DEADLINE):
+                if use_fused:
+                    return await self.prompt_to_design(
+                        prompt, brand_id=brand_id, format=format, use_cache=use_cache
+                    )
+                brief = await self.prompt_to_brief(prompt, use_cache=use_cache)
+                if format:
+                    brief["format"] = format
+                design = await self.brief_to_design(brief, brand_id=brand_id)
+                return {"brief": brief, "design": design}
+
+        # A cache-bypassing or fused request must not join a run of the other kind
+        return await self.generations.do((prompt, brand_id, format, use_cache, use_fused), run)
+
+    def instant_design(
+        self,
+        prompt: str,
+        format: str | None = None,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Generate a brief and design without calling Gemini.
+
+        A brief the model produced earlier for an equivalent prompt is
+        reused from the brief cache; otherwise the brief is derived from the
+        prompt. The layout comes from the local layout engine, so the whole
+        generation takes well under a millisecond.
+
+        Args:
+            prompt: User's design request
+            format: Optional design format overriding the one in the brief
+            use_cache: Set False to ignore cached model briefs
+
+        Returns:
+            {"brief": ..., "design": ...}
+        """
+        brief = None
+        if use_cache:
+            brief = self.brief_cache.get(prompt, self.model_name, BRIEF_PROMPT_VERSION)
+        if brief is None:
+            brief = brief_from_prompt(prompt, format)
+        if format:
+            brief["format"] = format
+        return {"brief": brief, "design": layout_engine.layout(brief)}
+
+    async def prompt_to_design(
+        self,
+        prompt: str,
+        brand_id: str | None = None,
+        format: str | None = None,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Generate the brief and the Fabric.js design in one Gemini call.
+
+        The response schema asks for {"brief", "design"}; the brief is
+        validated through DesignBrief and cached like prompt_to_brief's, and
+        the design gets the same post-processing as brief_to_design. If the
+        brief is already cached only the design is generated. When every
+        attempt fails, falls back to the two-call path (and its local fallbacks).
+
+        Args:
+            prompt: User's design request
+            brand_id: Optional brand ID for brand-specific customization
+            format: Optional design format overriding the model's choice
+            use_cache: Set False to skip the brief cache lookup
+
+        Returns:
+            {"brief": ..., "design": ...}
+        """
+        if not self.client:
+            logger.warning("Client not initialized, using local brief and layout")
+            brief = brief_from_prompt(prompt, format)
+            return {"brief": brief, "design": layout_engine.layout(brief)}
+
+        if use_cache:
+            cached = self.brief_cache.get(prompt, self.model_name, FUSED_PROMPT_VERSION)
+            if cached is not None:
+                logger.info("Serving design brief from cache, generating design only")
+                if format:
+                    cached["format"] = format
+                design = await self.brief_to_design(cached, brand_id=brand_id)
+                return {"brief": cached, "design": design}
+
+        fused_prompt = self._fused_prompt(prompt, format)
+        schema_config = {
+            "response_mime_type": "application/json",
+            "response_json_schema": {
+                "type": "object",
+                "properties": {
+                    "brief": response_schema(DesignBrief),
+                    "design": {
+                        "type": "object",
+                        "properties": {
+                            "version": {"type": "string"},
+                            "background": {"type": "string"},
+                            "objects": {"type": "array", "items": {"type": "object"}},
+                        },
+                        "required": ["objects", "background"],
+                    },
+                },
+                "required": ["brief", "design"],
+            },
+        }
+
+        deadline = gemini_deadline()
+        for attempt in range(self.max_retries):
+            if deadline.expired:
+                logger.warning("Gemini deadline exhausted, giving up on retries")
+                break
+            response = None
+            try:
+                logger.info(
+                    f"Attempt {attempt + 1}/{self.max_retries}: "
+                    f"Generating brief and design with {self.model_name}"
+                )
+
+                timeout = deadline.timeout(self.timeout)
+
+                response = await call_gemini(
+                    lambda: self.client.aio.models.generate_content(
+                        model=self.model_name,
+                        contents=fused_prompt,
+                        config=schema_config  # type: ignore
+                    ),
+                    timeout=timeout,
+                    deadline_bound=timeout < self.timeout,
+                    kind="fused",
+                )
+
+                if not response.text:
+                    raise ValueError("Empty response from API")
+                payload = json.loads(response.text)
+                brief = DesignBrief.model_validate(payload.get("brief")).model_dump()
+                self.brief_cache.set(prompt, self.model_name, FUSED_PROMPT_VERSION, brief)
+                if format:
+                    brief["format"] = format
+
+                design_json = payload.get("design")
+                if not isinstance(design_json, dict):
+                    raise ValueError("Response has no design object")
+                design_json = self._finalize_design(
+                    design_json, get_fabric_canvas_dimensions(brief["format"])
+                )
+
+                logger.info(
+                    f"Successfully generated brief and design: "
+                    f"headline='{brief.get('headline')}', "
+                    f"{len(design_json.get('objects', []))} objects"
+                )
+                return {"brief": brief, "design": design_json}
+
+            except CircuitOpenError:
+                logger.warning("Gemini circuit open, skipping to fallback")
+                break
+
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"Timeout after {timeout:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                if attempt < self.max_retries - 1:
+                    await deadline.sleep(2 ** attempt)
+
+            except Exception as e:
+                logger.error(
+                    f"Error generating brief and design (attempt {attempt + 1}): "
+                    f"{type(e).__name__}: {str(e)}"
+                )
+                if response and response.text:
+                    logger.error(
+                        f"Response text (first 500 chars): "
+                        f"{response.text[:500]}"
+                    )
+                if attempt < self.max_retries - 1:
+                    await deadline.sleep(2 ** attempt)
+
+        logger.warning("Fused generation failed, falling back to separate calls")
+        brief = await self.prompt_to_brief(prompt, use_cache=use_cache)
+        if format:
+            brief["format"] = format
+        design = await self.brief_to_design(brief, brand_id=brand_id)
+        return {"brief": brief, "design": design}
+
+    async def prompt_to_brief(self, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Convert user prompt to structured design brief using Gemini.
 
         Uses structured output with Pydantic schema for reliable results.
-        Implements retry logic and fallback to mock data on failure.
+        Implements retry logic and falls back to a brief derived from the
+        prompt (layout_engine.brief_from_prompt) on failure.
+        Briefs for previously seen prompts (after folding case, whitespace
+        and punctuation) are served from the brief cache.
 
         Args:
             prompt: User's design request
+            use_cache: Set False to skip the cache lookup and force a fresh
+                brief (the fresh brief still refreshes the cache)
 
         Returns:
             Design brief as dict with headline, subheadline, colors, etc.
         """
         if not self.client:
-            logger.warning("Client not initialized, using mock brief")
-            return create_mock_design_brief()
+            logger.warning("Client not initialized, deriving brief from prompt")
+            return brief_from_prompt(prompt)
+
+        if use_cache:
+            cached = self.brief_cache.get(prompt, self.model_name, BRIEF_PROMPT_VERSION)
+            if cached is not None:
+                logger.info("Serving design brief from cache")
+                return cached
 
         logger.info(
             f"Generating design brief from prompt "
@@ -90,7 +372,11 @@ Consider design principles like visual hierarchy, color theory, and target
 audience appeal.
 """
         
+        deadline = gemini_deadline()
         for attempt in range(self.max_retries):
+            if deadline.expired:
+                logger.warning("Gemini deadline exhausted, giving up on retries")
+                break
             response = None
             try:
                 logger.info(
@@ -100,17 +386,20 @@ audience appeal.
                 
                 schema_config = {
                     "response_mime_type": "application/json",
-                    "response_json_schema": DesignBrief.model_json_schema(),
+                    "response_json_schema": response_schema(DesignBrief),
                 }
                 
                 # Use async generate_content with structured output and timeout
-                response = await asyncio.wait_for(
-                    self.client.aio.models.generate_content(
+                timeout = deadline.timeout(self.timeout)
+                response = await call_gemini(
+                    lambda: self.client.aio.models.generate_content(
                         model=self.model_name,
                         contents=enhanced_prompt,
                         config=schema_config  # type: ignore
                     ),
-                    timeout=self.timeout
+                    timeout=timeout,
+                    deadline_bound=timeout < self.timeout,
+                    kind="brief",
                 )
                 
                 logger.debug(
@@ -129,15 +418,22 @@ audience appeal.
                     f"headline='{brief_dict.get('headline')}', "
                     f"style={brief_dict.get('layout_style')}"
                 )
+                self.brief_cache.set(
+                    prompt, self.model_name, BRIEF_PROMPT_VERSION, brief_dict
+                )
                 return brief_dict
                 
+            except CircuitOpenError:
+                logger.warning("Gemini circuit open, skipping to fallback")
+                break
+
             except asyncio.TimeoutError:
                 logger.error(
-                    f"Timeout after {self.timeout}s "
+                    f"Timeout after {timeout:.1f}s "
                     f"(attempt {attempt + 1}/{self.max_retries})"
                 )
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                     
             except json.JSONDecodeError as e:
                 logger.error(
@@ -150,7 +446,7 @@ audience appeal.
                         f"{response.text[:500]}"
                     )
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                     
             except Exception as e:
                 logger.error(
@@ -159,7 +455,7 @@ audience appeal.
                 )
                 if attempt < self.max_retries - 1:
                     logger.debug(f"Will retry after {2 ** attempt}s backoff")
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                 else:
                     import traceback
                     logger.error(
@@ -167,9 +463,9 @@ audience appeal.
                         f"Traceback: {traceback.format_exc()}"
                     )
         
-        # Fallback to mock data after all retries exhausted
-        logger.warning("All attempts failed, falling back to mock brief")
-        return create_mock_design_brief()
+        # Fallback to a brief derived locally after all retries exhausted
+        logger.warning("All attempts failed, deriving brief from prompt")
+        return brief_from_prompt(prompt)
 
     async def brief_to_design(
         self,
@@ -190,50 +486,47 @@ audience appeal.
             Fabric.js compatible design JSON
         """
         if not self.client:
-            logger.warning("Client not initialized, using mock design")
-            return create_mock_fabric_design(brief)
-        
+            logger.warning("Client not initialized, using local layout engine")
+            return layout_engine.layout(brief)
+
+        design_json = await self._generate_design(brief)
+        if design_json is not None:
+            return design_json
+
+        # Fallback to the local layout engine after all retries exhausted
+        logger.warning("All attempts failed, falling back to local layout engine")
+        return layout_engine.layout(brief)
+
+    async def _generate_design(
+        self,
+        brief: Dict[str, Any],
+        variation: str | None = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Ask Gemini for a design, with retries.
+
+        Args:
+            brief: Design brief from prompt_to_brief()
+            variation: Optional art direction that makes this design differ
+                from others generated for the same brief
+
+        Returns:
+            Post-processed Fabric.js design JSON, or None if every attempt failed
+        """
         # Get canvas dimensions for the format
         dimensions = get_fabric_canvas_dimensions(
             brief.get("format", "instagram_post")
         )
         
-        # Build detailed prompt for Fabric.js generation
-        design_prompt = f"""
-You are a professional graphic designer creating a design in Fabric.js format.
-
-Design Brief:
-- Headline: {brief.get('headline')}
-- Subheadline: {brief.get('subheadline', 'N/A')}
-- Layout Style: {brief.get('layout_style')}
-- Visual Focus: {', '.join(brief.get('visual_focus', []))}
-- Color Scheme:
-  Primary: {brief.get('color_scheme', {}).get('primary', '#3b82f6')}
-  Secondary: {brief.get('color_scheme', {}).get('secondary', '#1e293b')}
-  Accent: {brief.get('color_scheme', {}).get('accent', '#64748b')}
-- Canvas Size: {dimensions['width']}x{dimensions['height']} pixels
-
-Create a Fabric.js JSON design that:
-1. Has a clean, professional layout matching the style
-2. Uses the specified color scheme
-3. Includes the headline and subheadline as text objects
-4. Adds 2-3 decorative shape objects (rectangles, circles) for visual interest
-5. Follows proper Fabric.js object structure
-6. Uses coordinates within the canvas bounds
-   (0 to {dimensions['width']} width, 0 to {dimensions['height']} height)
-
-Fabric.js Object Structure Requirements:
-- Each text object needs: type, left, top, width, height, text, fontSize,
-  fontFamily, fontWeight, fill, textAlign, originX, originY
-- Each shape object needs: type, left, top, width/height or radius, fill,
-  stroke, strokeWidth, opacity
-- The root object needs: version (5.3.0), objects (array),
-  background (hex color)
-
-Make the design visually appealing and professionally laid out.
-"""
+        design_prompt = self._design_prompt(brief, dimensions)
+        if variation:
+            design_prompt += f"\nArt direction for this variant: {variation}\n"
 
+        deadline = gemini_deadline()
         for attempt in range(self.max_retries):
+            if deadline.expired:
+                logger.warning("Gemini deadline exhausted, giving up on retries")
+                break
             response = None
             try:
                 logger.info(
@@ -242,35 +535,25 @@ Make the design visually appealing and professionally laid out.
                 )
                 
                 # Use JSON mode for free-form Fabric.js structure with timeout
-                response = await asyncio.wait_for(
-                    self.client.aio.models.generate_content(
+                timeout = deadline.timeout(self.timeout)
+                response = await call_gemini(
+                    lambda: self.client.aio.models.generate_content(
                         model=self.model_name,
                         contents=design_prompt,
                         config={
                             "response_mime_type": "application/json",
                         }
                     ),
-                    timeout=self.timeout
+                    timeout=timeout,
+                    deadline_bound=timeout < self.timeout,
+                    kind="design",
                 )
                 
                 # Parse and validate the JSON
                 if not response.text:
                     raise ValueError("Empty response from API")
-                design_json = json.loads(response.text)
-                
-                # Post-process: Ensure required fields
-                if "version" not in design_json:
-                    design_json["version"] = "5.3.0"
-                if "objects" not in design_json:
-                    design_json["objects"] = []
-                if "background" not in design_json:
-                    design_json["background"] = "#ffffff"
-                
-                # Validate coordinates are within bounds
-                design_json = self._validate_and_fix_coordinates(
-                    design_json,
-                    dimensions['width'],
-                    dimensions['height']
+                design_json = self._finalize_design(
+                    json.loads(response.text), dimensions
                 )
                 
                 logger.info(
@@ -279,13 +562,17 @@ Make the design visually appealing and professionally laid out.
                 )
                 return design_json
                 
+            except CircuitOpenError:
+                logger.warning("Gemini circuit open, skipping to fallback")
+                break
+
             except asyncio.TimeoutError:
                 logger.error(
-                    f"Timeout after {self.timeout}s "
+                    f"Timeout after {timeout:.1f}s "
                     f"(attempt {attempt + 1}/{self.max_retries})"
                 )
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                     
             except json.JSONDecodeError as e:
                 logger.error(
@@ -298,7 +585,7 @@ Make the design visually appealing and professionally laid out.
                         f"{response.text[:500]}"
                     )
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                     
             except Exception as e:
                 logger.error(
@@ -307,17 +594,285 @@ Make the design visually appealing and professionally laid out.
                 )
                 if attempt < self.max_retries - 1:
                     logger.debug(f"Will retry after {2 ** attempt}s backoff")
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                 else:
                     import traceback
                     logger.error(
                         f"Final attempt failed. "
                         f"Traceback: {traceback.format_exc()}"
                     )
-        
-        # Fallback to mock design after all retries exhausted
-        logger.warning("All attempts failed, falling back to mock design")
-        return create_mock_fabric_design(brief)
+
+        return None
+
+    async def generate_variants(
+        self,
+        brief: Dict[str, Any],
+        n: int,
+        brand_id: str | None = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate n alternative designs for one brief, concurrently.
+
+        Each variant gets its own art direction so the layouts differ. At
+        most LAYOUT_VARIANT_CONCURRENCY variants of a request, and
+        LAYOUT_VARIANT_GLOBAL_CONCURRENCY across all requests, talk to
+        Gemini at once. A variant whose generation fails is replaced by a
+        local layout and flagged, without affecting the others.
+
+        Args:
+            brief: Design brief from prompt_to_brief()
+            n: Number of variants
+            brand_id: Optional brand ID for brand-specific customization
+
+        Yields:
+            {"index": int, "design": {...}, "fallback": bool}, in order of
+            completion
+        """
+        limit = asyncio.Semaphore(settings.LAYOUT_VARIANT_CONCURRENCY)
+
+        async def variant(index: int) -> Dict[str, Any]:
+            design_json = None
+            if self.client:
+                try:
+                    async with limit, self.variant_slots:
+                        design_json = await self._generate_design(
+                            brief,
+                            variation=VARIANT_DIRECTIONS[index % len(VARIANT_DIRECTIONS)]
+                        )
+                except Exception as e:
+                    logger.error(
+                        f"Variant {index} failed: {type(e).__name__}: {str(e)}"
+                    )
+            if design_json is None:
+                logger.warning(f"Variant {index} falling back to local layout engine")
+                return {
+                    "index": index,
+                    "design": layout_engine.layout(brief, variant=index),
+                    "fallback": True,
+                }
+            return {"index": index, "design": design_json, "fallback": False}
+
+        logger.info(f"Generating {n} design variants")
+        tasks = [asyncio.ensure_future(variant(index)) for index in range(n)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding variants if the caller goes away
+            for task in tasks:
+                task.cancel()
+
+    async def stream_design(
+        self,
+        brief: Dict[str, Any],
+        brand_id: str | None = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a design like brief_to_design, yielding objects as they stream.
+
+        Uses the SDK's streaming API and emits each Fabric.js object as soon
+        as the model has finished writing it, validated against the Fabric
+        object models and with coordinates already clamped to the canvas.
+        Objects that fail validation are not streamed. The final event carries the complete design
+        and is authoritative: if the stream fails part way, the design is
+        generated again with brief_to_design (retries, local layout fallback) and
+        the final event replaces whatever objects were streamed.
+
+        Args:
+            brief: Design brief from prompt_to_brief()
+            brand_id: Optional brand ID for brand-specific customization
+
+        Yields:
+            {"type": "object", "index": int, "object": {...}} per valid
+            object (index is its position in the design's objects),
+            then {"type": "design", "design": {...}}
+        """
+        dimensions = get_fabric_canvas_dimensions(
+            brief.get("format", "instagram_post")
+        )
+        if self.client:
+            # Objects are validated against the Fabric models and clamped to
+            # the canvas one at a time, as each one closes
+            stream = fabric_object_stream(
+                repair=lambda obj: self._validate_and_fix_coordinates(
+                    {"objects": [obj]}, dimensions['width'], dimensions['height']
+                )["objects"][0]
+            )
+            emitted = 0
+            # The reader runs the upstream call on its own, so the timeout and
+            # breaker measure Gemini alone and never fire while the caller
+            # holds an object
+            objects: asyncio.Queue = asyncio.Queue()
+            reader = asyncio.create_task(self._read_design_stream(brief, dimensions, stream, objects))
+            reader.add_done_callback(lambda _: objects.put_nowait(None))
+            try:
+                while (item := await objects.get()) is not None:
+                    index, obj = item
+                    yield {"type": "object", "index": index, "object": obj}
+                    emitted += 1
+                await reader
+
+                design_json = self._finalize_design(json.loads(stream.text), dimensions)
+                logger.info(
+                    f"Successfully streamed design with "
+                    f"{len(design_json.get('objects', []))} objects "
+                    f"({len(stream.rejected)} failed validation)"
+                )
+                yield {"type": "design", "design": design_json}
+                return
+            except Exception as e:
+                logger.error(
+                    f"Error streaming design after {emitted} objects: "
+                    f"{type(e).__name__}: {str(e)}"
+                )
+            finally:
+                # The caller went away, or the reader failed
+                reader.cancel()
+
+        design_json = await self.brief_to_design(brief, brand_id=brand_id)
+        yield {"type": "design", "design": design_json}
+
+    async def _read_design_stream(
+        self,
+        brief: Dict[str, Any],
+        dimensions: Dict[str, int],
+        stream: LayoutElementStream,
+        objects: asyncio.Queue,
+    ) -> None:
+        """
+        Stream the design from Gemini into stream, queueing each object as it closes.
+
+        Runs under the Gemini breaker and the call timeout, shortened to the
+        request deadline.
+
+        Raises:
+            CircuitOpenError: If the Gemini circuit is open
+            TimeoutError: If the stream does not finish in time
+        """
+        logger.info(f"Streaming design with {self.model_name}")
+        timeout = gemini_deadline().timeout(self.timeout)
+        # Running into the request deadline is not Gemini's failure
+        neutral = (TimeoutError,) if timeout < self.timeout else ()
+        async with gemini_breaker.guard(neutral=neutral), asyncio.timeout(timeout):
+            chunks = await self.client.aio.models.generate_content_stream(
+                model=self.model_name,
+                contents=self._design_prompt(brief, dimensions),
+                config={
+                    "response_mime_type": "application/json",
+                }
+            )
+            async for chunk in chunks:
+                for index, obj in stream.feed(chunk.text or ""):
+                    objects.put_nowait((index, obj))
+
+    def _design_prompt(
+        self,
+        brief: Dict[str, Any],
+        dimensions: Dict[str, int]
+    ) -> str:
+        """Build the Fabric.js generation prompt for a brief."""
+        return f"""
+You are a professional graphic designer creating a design in Fabric.js format.
+
+Design Brief:
+- Headline: {brief.get('headline')}
+- Subheadline: {brief.get('subheadline', 'N/A')}
+- Layout Style: {brief.get('layout_style')}
+- Visual Focus: {', '.join(brief.get('visual_focus', []))}
+- Color Scheme:
+  Primary: {brief.get('color_scheme', {}).get('primary', '#3b82f6')}
+  Secondary: {brief.get('color_scheme', {}).get('secondary', '#1e293b')}
+  Accent: {brief.get('color_scheme', {}).get('accent', '#64748b')}
+- Canvas Size: {dimensions['width']}x{dimensions['height']} pixels
+
+Create a Fabric.js JSON design that:
+1. Has a clean, professional layout matching the style
+2. Uses the specified color scheme
+3. Includes the headline and subheadline as text objects
+4. Adds 2-3 decorative shape objects (rectangles, circles) for visual interest
+5. Follows proper Fabric.js object structure
+6. Uses coordinates within the canvas bounds
+   (0 to {dimensions['width']} width, 0 to {dimensions['height']} height)
+
+Fabric.js Object Structure Requirements:
+- Each text object needs: type, left, top, width, height, text, fontSize,
+  fontFamily, fontWeight, fill, textAlign, originX, originY
+- Each shape object needs: type, left, top, width/height or radius, fill,
+  stroke, strokeWidth, opacity
+- The root object needs: version (5.3.0), objects (array),
+  background (hex color)
+
+Make the design visually appealing and professionally laid out.
+"""
+
+    def _fused_prompt(self, prompt: str, format: str | None) -> str:
+        """Build the one-call prompt that asks for a brief and a design."""
+        sizes = "\n".join(
+            f"  {name}: {dims['width']}x{dims['height']} pixels"
+            for name in FUSED_FORMATS
+            for dims in [get_fabric_canvas_dimensions(name)]
+        )
+        format_rule = (
+            f"Use the format {format}."
+            if format else
+            "Choose the most appropriate format."
+        )
+        return f"""
+You are a professional graphic designer. Analyze the following design request,
+write a structured design brief, then create the design in Fabric.js format.
+
+Design Request: {prompt}
+
+1. "brief": a design brief that includes
+- A catchy, concise headline (max 6 words)
+- An optional subheadline for supporting text
+- Visual focus elements (what should stand out)
+- Layout style (modern, minimal, bold, elegant, playful, etc.)
+- Color scheme with primary, secondary, and accent colors (provide hex codes)
+- The format. {format_rule} Canvas sizes:
+{sizes}
+
+2. "design": a Fabric.js JSON design for that brief that
+- Has a clean, professional layout matching the style
+- Uses the brief's color scheme
+- Includes the headline and subheadline as text objects
+- Adds 2-3 decorative shape objects (rectangles, circles) for visual interest
+- Uses coordinates within the canvas bounds of the chosen format
+
+Fabric.js Object Structure Requirements:
+- Each text object needs: type, left, top, width, height, text, fontSize,
+  fontFamily, fontWeight, fill, textAlign, originX, originY
+- Each shape object needs: type, left, top, width/height or radius, fill,
+  stroke, strokeWidth, opacity
+- The root object needs: version (5.3.0), objects (array),
+  background (hex color)
+
+Consider visual hierarchy, color theory, and target audience appeal.
+"""
+
+    def _finalize_design(
+        self,
+        design_json: Dict[str, Any],
+        dimensions: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Fill in required Fabric.js fields and clamp object coordinates."""
+        # Post-process: Ensure required fields
+        if "version" not in design_json:
+            design_json["version"] = "5.3.0"
+        if "objects" not in design_json:
+            design_json["objects"] = []
+        if "background" not in design_json:
+            design_json["background"] = "#ffffff"
+        # The canvas size tells /to-canonical which format this is
+        design_json["width"] = dimensions["width"]
+        design_json["height"] = dimensions["height"]
+
+        # Validate coordinates are within bounds
+        return self._validate_and_fix_coordinates(
+            design_json,
+            dimensions['width'],
+            dimensions['height']
+        )
 
     def _validate_and_fix_coordinates(
         self,
@@ -356,4 +911,4 @@ Make the design visually appealing and professionally laid out.
 
 
 # Singleton instance
-layout_ai = LayoutAI()
+layout_ai = LayoutAI(brief_cache=brief_cache)
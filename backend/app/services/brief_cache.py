@@ -0,0 +1,113 @@
+"""
+Cache of design briefs produced by LayoutAI.prompt_to_brief.
+
+Many prompts repeat with trivial differences ("Black Friday sale 50% off"
+vs "black friday sale, 50% off!"). Briefs are cached under a key built
+from the normalized prompt, the Gemini model and the brief prompt-template
+version, so changing either invalidates old entries automatically.
+"""
+
+import copy
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Optional, Union
+
+from app.core.cache import SQLiteCache, TTLCache
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Punctuation that changes the meaning of an ad prompt ("50% off", "$20")
+_SIGNIFICANT_PUNCTUATION = set("%$€£¥#@&+")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Fold case, whitespace and punctuation so equivalent prompts share a key.
+
+    Example:
+        normalize_prompt("  Black Friday SALE -- 50% off!! ")
+        # "black friday sale 50% off"
+    """
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P") and ch not in _SIGNIFICANT_PUNCTUATION
+        else ch
+        for ch in text
+    )
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class BriefCache:
+    """
+    Brief cache over a TTLCache (memory) or SQLiteCache (disk) backend.
+
+    Example:
+        cache = BriefCache(TTLCache(max_size=1000, ttl=3600))
+        brief = cache.get(prompt, model="gemini-2.0-flash", template_version="1")
+    """
+
+    def __init__(self, backend: Optional[Union[TTLCache[Dict[str, Any]], SQLiteCache]]):
+        self.backend = backend
+
+    @staticmethod
+    def key(prompt: str, model: str, template_version: str) -> str:
+        """Cache key for a prompt under a given model and template version."""
+        raw = "\x1f".join((model, template_version, normalize_prompt(prompt)))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, prompt: str, model: str, template_version: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached brief, or None."""
+        if self.backend is None:
+            return None
+        try:
+            brief = self.backend.get(self.key(prompt, model, template_version))
+        except Exception as e:
+            logger.warning(f"Brief cache lookup failed: {e}")
+            return None
+        return copy.deepcopy(brief)
+
+    def set(
+        self,
+        prompt: str,
+        model: str,
+        template_version: str,
+        brief: Dict[str, Any],
+    ) -> None:
+        """Store a brief produced by the model."""
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(self.key(prompt, model, template_version), copy.deepcopy(brief))
+        except Exception as e:
+            logger.warning(f"Brief cache store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the backend."""
+        if self.backend is None:
+            return {"backend": "none"}
+        kind = "disk" if isinstance(self.backend, SQLiteCache) else "memory"
+        return {"backend": kind, **self.backend.stats()}
+
+
+def create_brief_cache() -> BriefCache:
+    """Build the brief cache configured by BRIEF_CACHE_BACKEND."""
+    backend_name = settings.BRIEF_CACHE_BACKEND
+    if backend_name == "memory":
+        return BriefCache(TTLCache(max_size=settings.BRIEF_CACHE_SIZE, ttl=settings.BRIEF_CACHE_TTL))
+    if backend_name == "disk":
+        return BriefCache(SQLiteCache(
+            settings.BRIEF_CACHE_PATH,
+            max_size=settings.BRIEF_CACHE_SIZE,
+            ttl=settings.BRIEF_CACHE_TTL,
+        ))
+    if backend_name != "none":
+        logger.warning(f"Unknown BRIEF_CACHE_BACKEND '{backend_name}', brief cache disabled")
+    return BriefCache(None)
+
+
+brief_cache = create_brief_cache()
@@ -3,16 +3,26 @@ Canonical Layout Generator Service
 Generates ad creative layouts in canonical JSON format using AI.
 """
 
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
 import asyncio
 import json
-from google import genai
 from pydantic import ValidationError
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.resilience import CircuitOpenError, call_gemini, gemini_deadline
 from app.schemas.canonical_design import CanonicalDesign
-from app.prompts.ad_creative_system_prompt import build_generation_prompt
+from app.schemas.llm_schemas import expand_canonical_design, response_schema
+from app.services.gemini_client import GeminiClientPool, gemini_client_pool
+from app.services.prompt_cache import PromptCache, create_prompt_cache, is_cache_rejected_error
+from app.prompts.ad_creative_system_prompt import (
+    build_generation_prompt,
+    build_request_prompt,
+    get_static_prefix,
+)
+
+if TYPE_CHECKING:
+    from google import genai
 
 logger = get_logger(__name__)
 
@@ -25,24 +35,38 @@ class CanonicalLayoutGenerator:
     following best practices for ad creative design.
     """
     
-    def __init__(self):
-        """Initialize the layout generator with Gemini client."""
+    def __init__(
+        self,
+        clients: Optional[GeminiClientPool] = None,
+        prompt_cache: Optional[PromptCache] = None,
+    ):
+        """
+        Configure the generator; the Gemini client is opened on first use.
+
+        Args:
+            clients: Gemini client pool (defaults to the shared one)
+            prompt_cache: Provider cache holding the static prompt prefix
+                (full prompts are sent if None)
+        """
+        self.clients = clients or gemini_client_pool
+        self.prompt_cache = prompt_cache
+        self.model_name = settings.GEMINI_MODEL_NAME
+        self.timeout = settings.GEMINI_TIMEOUT
+        self.max_retries = settings.GEMINI_MAX_RETRIES
+        logger.info(
+            f"Initialized CanonicalLayoutGenerator with model={self.model_name}"
+        )
+
+    @property
+    def client(self) -> Optional["genai.Client"]:
+        """Shared Gemini client, or None when Gemini is not configured."""
+        if not self.clients.is_configured:
+            return None
         try:
-            api_key = settings.GEMINI_API_KEY
-            if not api_key:
-                raise ValueError("GEMINI_API_KEY not configured")
-            
-            self.client = genai.Client(api_key=api_key)
-            self.model_name = settings.GEMINI_MODEL_NAME
-            self.timeout = settings.GEMINI_TIMEOUT
-            self.max_retries = settings.GEMINI_MAX_RETRIES
-            
-            logger.info(
-                f"Initialized CanonicalLayoutGenerator with model={self.model_name}"
-            )
+            return self.clients.client
         except Exception as e:
             logger.error(f"Failed to initialize: {e}")
-            self.client = None
+            return None
     
     async def generate_layout(
         self,
@@ -71,37 +95,50 @@ class CanonicalLayoutGenerator:
         
         logger.info(f"Generating layout for prompt: {user_prompt[:100]}...")
         
-        # Build the complete prompt
-        prompt = build_generation_prompt(
-            user_prompt=user_prompt,
-            brand_kit=brand_kit,
-            reference_images=reference_images,
-            preferences=preferences
-        )
+        prompt_args = (user_prompt, brand_kit, reference_images, preferences)
+        deadline = gemini_deadline()
+        # With the static prefix cached, send only the request's own sections
+        cache_name = None
+        if self.prompt_cache:
+            cache_name = await self.prompt_cache.handle(timeout=deadline.timeout(self.timeout))
         
         # Retry loop with exponential backoff
-        for attempt in range(self.max_retries):
+        attempt = 0
+        while attempt < self.max_retries:
+            if deadline.expired:
+                logger.warning("Gemini deadline exhausted, giving up on retries")
+                break
             try:
                 logger.info(f"Attempt {attempt + 1}/{self.max_retries}")
                 
+                config = {
+                    "response_mime_type": "application/json",
+                    "response_json_schema": response_schema(CanonicalDesign)
+                }
+                if cache_name:
+                    config["cached_content"] = cache_name
+                    prompt = build_request_prompt(*prompt_args)
+                else:
+                    prompt = build_generation_prompt(*prompt_args)
+                
                 # Generate with structured output
-                response = await asyncio.wait_for(
-                    self.client.aio.models.generate_content(
+                timeout = deadline.timeout(self.timeout)
+                response = await call_gemini(
+                    lambda: self.client.aio.models.generate_content(
                         model=self.model_name,
                         contents=prompt,
-                        config={
-                            "response_mime_type": "application/json",
-                            "response_json_schema": CanonicalDesign.model_json_schema()
-                        }
+                        config=config
                     ),
-                    timeout=self.timeout
+                    timeout=timeout,
+                    deadline_bound=timeout < self.timeout,
+                    kind="canonical",
                 )
                 
                 if not response.text:
                     raise ValueError("Empty response from API")
                 
-                # Validate with Pydantic
-                canonical_design = CanonicalDesign.model_validate_json(response.text)
+                # Validate with Pydantic, filling fields the schema left out
+                canonical_design = expand_canonical_design(response.text)
                 
                 # Post-process validation
                 self._validate_design(canonical_design)
@@ -111,23 +148,45 @@ class CanonicalLayoutGenerator:
                 )
                 return canonical_design
                 
+            except CircuitOpenError:
+                logger.warning("Gemini circuit open, skipping to fallback")
+                break
+
             except asyncio.TimeoutError:
-                logger.error(f"Timeout after {self.timeout}s (attempt {attempt + 1})")
+                logger.error(f"Timeout after {timeout:.1f}s (attempt {attempt + 1})")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                     
             except ValidationError as e:
                 logger.error(f"Validation error (attempt {attempt + 1}): {e}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
                     
             except Exception as e:
                 logger.error(f"Generation error (attempt {attempt + 1}): {e}")
+                if cache_name and is_cache_rejected_error(e):
+                    # Retry right away with the full prompt, without using up an attempt
+                    self.prompt_cache.invalidate(cache_name)
+                    cache_name = None
+                    continue
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await deadline.sleep(2 ** attempt)
+
+            attempt += 1
         
         raise ValueError("Failed to generate layout after all retries")
     
+    async def close(self) -> None:
+        """Release the cached prompt prefix at the provider."""
+        if self.prompt_cache is not None:
+            await self.prompt_cache.close()
+
+    def prompt_cache_stats(self) -> Dict[str, Any]:
+        """Prompt prefix cache usage for health checks."""
+        if self.prompt_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.prompt_cache.stats()}
+    
     def _validate_design(self, design: CanonicalDesign) -> None:
         """
         Validate design constraints and fix issues.
@@ -174,5 +233,7 @@ class CanonicalLayoutGenerator:
 
 
 # Singleton instance
-canonical_layout_generator = CanonicalLayoutGenerator()
+canonical_layout_generator = CanonicalLayoutGenerator(
+    prompt_cache=create_prompt_cache(get_static_prefix(), display_name="ad-creative-system-prompt")
+)
 
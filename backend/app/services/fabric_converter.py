@@ -0,0 +1,645 @@
+"""
+Conversion between CanonicalDesign and Fabric.js JSON.
+
+The canonical model is what generation, format adaptation and validation
+work on; Fabric.js JSON is what the editor and LayoutAI produce. The
+converter maps each layer type to a Fabric object and back:
+    - TextLayer  <-> textbox (letter spacing as charSpacing, 1/1000 em)
+    - ImageLayer <-> image (src from the url; fit and role kept in data)
+    - ShapeLayer <-> rect / circle / ellipse / line / polygon
+    - GroupLayer <-> group; canonical children are referenced by id and
+      positioned on the canvas, Fabric children are nested and positioned
+      relative to the group's center, rotation and scale
+Position maps to left/top/width/height/angle/originX/originY as is, and
+effects to opacity, globalCompositeOperation, shadow and stroke. Anything
+Fabric has no property for (ids, z-index, roles, generation prompts,
+design-level fields) travels in the objects' ``data``, so a design
+survives the round trip unchanged (group members' coordinates up to float
+rounding).
+
+Both directions work on plain dicts in one pass over the layers, with no
+model built per field or per layer: a CanonicalDesign is dumped once on
+the way in, and the canonical result is validated once, as a whole, on
+the way out (or returned as a dict).
+"""
+
+import math
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from app.core.logging import get_logger
+from app.schemas.ai_models import get_fabric_canvas_dimensions
+from app.schemas.canonical_design import CanonicalDesign, DesignFormat
+from app.services.layout_engine import FABRIC_VERSION
+
+logger = get_logger(__name__)
+
+DEFAULT_BACKGROUND = "#ffffff"
+DEFAULT_FONT = "Arial"
+DEFAULT_TEXT_COLOR = "#000000"
+DEFAULT_LINE_HEIGHT = 1.16
+
+# Canonical blend modes and their canvas globalCompositeOperation
+_BLEND_TO_FABRIC = {
+    "normal": "source-over",
+    "multiply": "multiply",
+    "screen": "screen",
+    "overlay": "overlay",
+    "darken": "darken",
+    "lighten": "lighten",
+}
+_BLEND_FROM_FABRIC = {value: key for key, value in _BLEND_TO_FABRIC.items()}
+
+_FONT_WEIGHTS = {"normal": 400, "bold": 700, "bolder": 800, "lighter": 300}
+
+_TEXT_TYPES = frozenset({"textbox", "text", "i-text"})
+_SHAPE_TYPES = {
+    "rect": "rectangle",
+    "circle": "circle",
+    "ellipse": "ellipse",
+    "line": "line",
+    "polygon": "polygon",
+    "triangle": "polygon",
+}
+
+# Design-level CanonicalDesign fields kept in the Fabric root's data
+_DESIGN_FIELDS = (
+    "id", "schema_version", "owner_id", "title", "format", "background",
+    "brand", "metadata", "constraints", "campaign_id",
+)
+
+_ORIGIN_FRACTION = {"left": 0.0, "top": 0.0, "center": 0.5, "right": 1.0, "bottom": 1.0}
+
+Design = Union[CanonicalDesign, Dict[str, Any]]
+
+# A Fabric group's transform on the canvas: center x, center y, angle, scaleX, scaleY
+GroupTransform = Tuple[float, float, float, float, float]
+
+
+class FabricConverter:
+    """
+    Bidirectional CanonicalDesign <-> Fabric.js converter.
+
+    Example:
+        fabric_json = fabric_converter.to_fabric(design)
+        design = fabric_converter.to_canonical(fabric_json, owner_id=user_id)
+    """
+
+    # -- canonical -> Fabric --------------------------------------------------
+
+    def to_fabric(self, design: Design) -> Dict[str, Any]:
+        """
+        Convert a canonical design to Fabric.js JSON.
+
+        Args:
+            design: CanonicalDesign or its JSON dict (as from model_dump(mode="json"))
+
+        Returns:
+            Fabric.js canvas JSON; objects are ordered by z-index
+        """
+        if isinstance(design, CanonicalDesign):
+            design = design.model_dump(mode="json")
+
+        layers = design.get("layers", [])
+        by_id = {layer["id"]: layer for layer in layers}
+        # Layers inside a group are emitted as part of it, once
+        nested: Set[str] = set()
+        for layer in layers:
+            if layer["type"] == "group":
+                nested.update(child for child in layer["children"] if child != layer["id"])
+
+        top_level = [layer for layer in layers if layer["id"] not in nested]
+        top_level.sort(key=_z_index)
+        placed: Set[str] = set()
+        objects = [self._to_object(layer, by_id, placed) for layer in top_level]
+        # Members of groups that are themselves nested in a cycle
+        objects.extend(
+            self._to_object(layer, by_id, placed)
+            for layer in sorted(layers, key=_z_index) if layer["id"] not in placed
+        )
+
+        background = design.get("background") or {}
+        canvas = design.get("canvas") or {}
+        return {
+            "version": FABRIC_VERSION,
+            "objects": objects,
+            "background": _background_color(background),
+            "width": canvas.get("width"),
+            "height": canvas.get("height"),
+            "data": {field: design.get(field) for field in _DESIGN_FIELDS if field in design},
+        }
+
+    def _to_object(
+        self, layer: Dict[str, Any], by_id: Dict[str, Dict[str, Any]], placed: Set[str]
+    ) -> Dict[str, Any]:
+        placed.add(layer["id"])
+        p = layer["position"]
+        effects = layer.get("effects") or {}
+        data: Dict[str, Any] = {"zIndex": p.get("z_index", 0)}
+        obj: Dict[str, Any] = {
+            "type": None,
+            "id": layer["id"],
+            "name": layer.get("name", ""),
+            "left": p["x"],
+            "top": p["y"],
+            "width": p["width"],
+            "height": p["height"],
+            "angle": p.get("rotation", 0),
+            "originX": p.get("origin_x", "left"),
+            "originY": p.get("origin_y", "top"),
+            "opacity": effects.get("opacity", 1.0),
+            "visible": layer.get("visible", True),
+            "selectable": not layer.get("locked", False),
+            "globalCompositeOperation": _BLEND_TO_FABRIC.get(
+                effects.get("blend_mode") or "normal", "source-over"
+            ),
+            "shadow": None,
+            "stroke": None,
+            "strokeWidth": 0,
+            "data": data,
+        }
+
+        shadow = effects.get("shadow")
+        if shadow:
+            obj["shadow"] = {
+                "color": shadow["color"],
+                "blur": shadow["blur"],
+                "offsetX": shadow["offset_x"],
+                "offsetY": shadow["offset_y"],
+            }
+            if shadow.get("opacity", 1.0) != 1.0:
+                data["shadowOpacity"] = shadow["opacity"]
+        stroke = effects.get("stroke")
+        if stroke:
+            obj["stroke"] = stroke["color"]
+            obj["strokeWidth"] = stroke["width"]
+            if stroke.get("position", "center") != "center":
+                data["strokePosition"] = stroke["position"]
+
+        kind = layer["type"]
+        if kind == "text":
+            self._text_to_object(layer["text"], obj, data)
+        elif kind == "image":
+            self._image_to_object(layer["image"], obj, data)
+        elif kind == "shape":
+            self._shape_to_object(layer["shape"], obj, data)
+        else:
+            self._group_to_object(layer, obj, by_id, placed)
+        return obj
+
+    @staticmethod
+    def _text_to_object(text: Dict[str, Any], obj: Dict[str, Any], data: Dict[str, Any]) -> None:
+        font_size = text["font_size"]
+        decoration = text.get("text_decoration") or "none"
+        obj.update(
+            type="textbox",
+            text=text["content"],
+            fontFamily=text["font_family"],
+            fontSize=font_size,
+            fontWeight=text.get("font_weight", 400),
+            lineHeight=text.get("line_height", 1.2),
+            charSpacing=(
+                round(text.get("letter_spacing", 0) / font_size * 1000, 3) if font_size else 0
+            ),
+            textAlign=text.get("text_align", "left"),
+            fill=text["color"],
+            underline=decoration == "underline",
+            linethrough=decoration == "line-through",
+        )
+        transform = text.get("text_transform") or "none"
+        if transform != "none":
+            data["textTransform"] = transform
+
+    @staticmethod
+    def _image_to_object(image: Dict[str, Any], obj: Dict[str, Any], data: Dict[str, Any]) -> None:
+        obj.update(
+            type="image",
+            src=image.get("url") or "",
+            crossOrigin="anonymous",
+            scaleX=1,
+            scaleY=1,
+        )
+        data["role"] = image["role"]
+        data["fit"] = image.get("fit", "contain")
+        for key, name in (
+            ("asset_id", "assetId"),
+            ("generation_prompt", "generationPrompt"),
+            ("filters", "filters"),
+        ):
+            if image.get(key) is not None:
+                data[name] = image[key]
+
+    @staticmethod
+    def _shape_to_object(shape: Dict[str, Any], obj: Dict[str, Any], data: Dict[str, Any]) -> None:
+        shape_type = shape["shape_type"]
+        width, height = obj["width"], obj["height"]
+        obj["fill"] = shape.get("fill")
+        data["shapeType"] = shape_type
+        if shape.get("corner_style", "round") != "round":
+            data["cornerStyle"] = shape["corner_style"]
+        if shape_type != "rectangle" and shape.get("border_radius"):
+            data["borderRadius"] = shape["border_radius"]
+
+        if shape_type == "rectangle":
+            radius = shape.get("border_radius") or 0
+            obj.update(type="rect", rx=radius, ry=radius)
+        elif shape_type == "circle":
+            # Fabric circles are sized by radius; an oval box scales it
+            radius = width / 2
+            obj.update(
+                type="circle", radius=radius, scaleX=1,
+                scaleY=height / width if width else 1,
+            )
+            obj["height"] = width
+        elif shape_type == "ellipse":
+            obj.update(type="ellipse", rx=width / 2, ry=height / 2)
+        elif shape_type == "line":
+            obj.update(type="line", x1=0, y1=0, x2=width, y2=height)
+            if obj["stroke"] is None:
+                # A line is drawn with its stroke; use the fill color
+                obj["stroke"], obj["strokeWidth"] = shape.get("fill"), 1
+                data["strokeFromFill"] = True
+        else:
+            obj.update(type="polygon", points=[
+                {"x": 0, "y": 0}, {"x": width, "y": 0},
+                {"x": width, "y": height}, {"x": 0, "y": height},
+            ])
+
+    def _group_to_object(
+        self,
+        layer: Dict[str, Any],
+        obj: Dict[str, Any],
+        by_id: Dict[str, Dict[str, Any]],
+        placed: Set[str],
+    ) -> None:
+        children = [
+            by_id[child] for child in layer["children"]
+            if child in by_id and child not in placed
+        ]
+        children.sort(key=_z_index)
+        # Fabric positions group members in the group's frame: relative to
+        # its center and unrotated by its angle
+        angle = obj["angle"]
+        center_x, center_y = _center(
+            obj["left"], obj["top"], obj["width"], obj["height"],
+            obj["originX"], obj["originY"], angle,
+        )
+        objects = []
+        for child in children:
+            child_obj = self._to_object(child, by_id, placed)
+            p = child["position"]
+            x, y = _center(
+                p["x"], p["y"], p["width"], p["height"],
+                child_obj["originX"], child_obj["originY"], child_obj["angle"],
+            )
+            x, y = _rotate(x - center_x, y - center_y, -angle)
+            child_obj["angle"] -= angle
+            child_obj["left"], child_obj["top"] = _origin(
+                x, y, p["width"], p["height"],
+                child_obj["originX"], child_obj["originY"], child_obj["angle"],
+            )
+            objects.append(child_obj)
+        obj.update(type="group", objects=objects)
+        if [child["id"] for child in children] != layer["children"]:
+            # Members missing, nested elsewhere or listed out of z order
+            obj["data"]["children"] = layer["children"]
+
+    # -- Fabric -> canonical --------------------------------------------------
+
+    def to_canonical(
+        self,
+        fabric: Dict[str, Any],
+        design_id: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        title: Optional[str] = None,
+        format: Optional[str] = None,
+    ) -> CanonicalDesign:
+        """
+        Convert Fabric.js JSON to a CanonicalDesign.
+
+        Design-level fields come from the arguments, then from the data
+        written by to_fabric(), then from defaults (an "imported" design).
+
+        Args:
+            fabric: Fabric.js canvas JSON (e.g. from LayoutAI or the editor)
+            design_id: Design id
+            owner_id: Owner user id
+            title: Design title
+            format: DesignFormat value; inferred from the canvas size if unset
+
+        Returns:
+            CanonicalDesign, validated once as a whole
+
+        Raises:
+            ValueError: If the JSON has neither a canvas size nor a format
+            pydantic.ValidationError: If the result is not a valid design
+        """
+        return CanonicalDesign.model_validate(
+            self.to_canonical_dict(fabric, design_id, owner_id, title, format)
+        )
+
+    def to_canonical_dict(
+        self,
+        fabric: Dict[str, Any],
+        design_id: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        title: Optional[str] = None,
+        format: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Like to_canonical(), but returns the CanonicalDesign JSON dict unvalidated.
+
+        Raises:
+            ValueError: If the JSON has neither a canvas size nor a format
+        """
+        data = fabric.get("data") or {}
+        design = {field: data[field] for field in _DESIGN_FIELDS if field in data}
+        overrides = {"id": design_id, "owner_id": owner_id, "title": title, "format": format}
+        design.update({key: value for key, value in overrides.items() if value is not None})
+
+        width, height = fabric.get("width"), fabric.get("height")
+        if (not width or not height) and "format" not in design:
+            # Guessing would silently resize the design to instagram_post
+            raise ValueError("Fabric.js JSON has no canvas width/height; a format is required")
+        if "format" not in design:
+            design["format"] = _format_for(width, height)
+        if not width or not height:
+            dimensions = get_fabric_canvas_dimensions(design["format"])
+            width, height = dimensions["width"], dimensions["height"]
+        design.setdefault("id", f"design_{uuid.uuid4().hex[:12]}")
+        design.setdefault("owner_id", "")
+        design.setdefault("title", "Imported Design")
+        design.setdefault("metadata", {"source": "imported"})
+        design.setdefault("background", {
+            "type": "color",
+            "color": fabric.get("background") if isinstance(fabric.get("background"), str)
+            else DEFAULT_BACKGROUND,
+        })
+        design["canvas"] = {"width": int(width), "height": int(height), "unit": "px"}
+
+        layers: List[Dict[str, Any]] = []
+        self._from_objects(fabric.get("objects") or [], layers)
+        design["layers"] = layers
+        return design
+
+    def _from_objects(
+        self,
+        objects: List[Dict[str, Any]],
+        layers: List[Dict[str, Any]],
+        group: Optional[GroupTransform] = None,
+    ) -> List[str]:
+        """
+        Append the layers for objects (and their members); returns their ids.
+
+        Members of a group are given in its frame and are mapped to canvas
+        coordinates through group, the group's transform on the canvas.
+        """
+        ids = []
+        for obj in objects:
+            layer = self._from_object(obj, len(layers))
+            if layer is None:
+                continue
+            if group is not None:
+                _apply_group_transform(layer, group)
+            layers.append(layer)
+            ids.append(layer["id"])
+            if layer["type"] == "group":
+                p = layer["position"]
+                center_x, center_y = _center(
+                    p["x"], p["y"], p["width"], p["height"],
+                    p["origin_x"], p["origin_y"], p["rotation"],
+                )
+                scale_x = (obj.get("scaleX", 1) or 1) * (group[3] if group else 1)
+                scale_y = (obj.get("scaleY", 1) or 1) * (group[4] if group else 1)
+                members = self._from_objects(
+                    obj.get("objects") or [], layers,
+                    (center_x, center_y, p["rotation"], scale_x, scale_y),
+                )
+                layer["children"] = obj.get("data", {}).get("children", members)
+        return ids
+
+    def _from_object(self, obj: Dict[str, Any], index: int) -> Optional[Dict[str, Any]]:
+        kind = obj.get("type")
+        if kind in _TEXT_TYPES:
+            layer_type = "text"
+        elif kind in _SHAPE_TYPES:
+            layer_type = "shape"
+        elif kind == "image":
+            layer_type = "image"
+        elif kind == "group":
+            layer_type = "group"
+        else:
+            logger.warning(f"Skipping unsupported Fabric object type {kind!r}")
+            return None
+
+        data = obj.get("data") or {}
+        scale_x, scale_y = obj.get("scaleX", 1) or 1, obj.get("scaleY", 1) or 1
+        width, height = obj.get("width"), obj.get("height")
+        if kind == "circle":
+            width = height = 2 * obj.get("radius", 0)
+        elif kind == "ellipse" and width is None:
+            width, height = 2 * obj.get("rx", 0), 2 * obj.get("ry", 0)
+        if width is None and kind in _TEXT_TYPES:
+            # Auto-sized text (i-text); estimate from the longest line
+            longest = max((len(line) for line in str(obj.get("text", "")).split("\n")), default=0)
+            width = longest * obj.get("fontSize", 16) * 0.6
+        left, top = obj.get("left", 0), obj.get("top", 0)
+
+        effects: Dict[str, Any] = {
+            "opacity": obj.get("opacity", 1.0),
+            "blend_mode": _BLEND_FROM_FABRIC.get(obj.get("globalCompositeOperation"), "normal"),
+        }
+        shadow = obj.get("shadow")
+        if isinstance(shadow, dict):
+            effects["shadow"] = {
+                "offset_x": shadow.get("offsetX", 0),
+                "offset_y": shadow.get("offsetY", 0),
+                "blur": shadow.get("blur", 0),
+                "color": shadow.get("color", "#000000"),
+                "opacity": data.get("shadowOpacity", 1.0),
+            }
+        if obj.get("stroke") and obj.get("strokeWidth") and not data.get("strokeFromFill"):
+            effects["stroke"] = {
+                "color": obj["stroke"],
+                "width": obj["strokeWidth"],
+                "position": data.get("strokePosition", "center"),
+            }
+
+        name = obj.get("name")
+        layer: Dict[str, Any] = {
+            "id": obj.get("id") or f"layer_{index}",
+            "type": layer_type,
+            "name": kind if name is None else name,
+            "position": {
+                "x": left,
+                "y": top,
+                "width": (width or 0) * scale_x,
+                "height": (height or 0) * scale_y,
+                "rotation": obj.get("angle", 0),
+                "z_index": data.get("zIndex", index),
+                "origin_x": obj.get("originX", "left"),
+                "origin_y": obj.get("originY", "top"),
+            },
+            "effects": effects,
+            "locked": not obj.get("selectable", True),
+            "visible": obj.get("visible", True),
+        }
+
+        if layer_type == "text":
+            layer["text"] = self._text_from_object(obj, data, scale_y)
+            if not height:
+                text = layer["text"]
+                lines = max(1, str(text["content"]).count("\n") + 1)
+                layer["position"]["height"] = text["font_size"] * text["line_height"] * lines
+        elif layer_type == "image":
+            image = {
+                "role": data.get("role", "decoration"),
+                "url": obj.get("src") or None,
+                "fit": data.get("fit", "contain"),
+            }
+            for name, key in (
+                ("assetId", "asset_id"),
+                ("generationPrompt", "generation_prompt"),
+                ("filters", "filters"),
+            ):
+                if name in data:
+                    image[key] = data[name]
+            layer["image"] = image
+        elif layer_type == "shape":
+            layer["shape"] = self._shape_from_object(obj, kind, data)
+        else:
+            layer["children"] = []
+        return layer
+
+    @staticmethod
+    def _text_from_object(
+        obj: Dict[str, Any], data: Dict[str, Any], scale: float
+    ) -> Dict[str, Any]:
+        font_size = obj.get("fontSize", 16) * scale
+        weight = obj.get("fontWeight", 400)
+        if isinstance(weight, str):
+            weight = int(weight) if weight.isdigit() else _FONT_WEIGHTS.get(weight, 400)
+        fill = obj.get("fill")
+        if obj.get("underline"):
+            decoration = "underline"
+        elif obj.get("linethrough"):
+            decoration = "line-through"
+        else:
+            decoration = "none"
+        return {
+            "content": obj.get("text", ""),
+            "font_family": obj.get("fontFamily") or DEFAULT_FONT,
+            "font_size": font_size,
+            "font_weight": weight,
+            "line_height": obj.get("lineHeight", DEFAULT_LINE_HEIGHT),
+            "letter_spacing": round(obj.get("charSpacing", 0) * font_size / 1000, 4),
+            "text_align": obj.get("textAlign", "left"),
+            "color": fill if isinstance(fill, str) else DEFAULT_TEXT_COLOR,
+            "text_transform": data.get("textTransform", "none"),
+            "text_decoration": decoration,
+        }
+
+    @staticmethod
+    def _shape_from_object(obj: Dict[str, Any], kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        fill = obj.get("fill")
+        if data.get("strokeFromFill"):
+            fill = obj.get("stroke")
+        shape = {
+            "shape_type": data.get("shapeType", _SHAPE_TYPES[kind]),
+            "fill": fill if isinstance(fill, str) else None,
+            "border_radius": obj.get("rx", 0) if kind == "rect" else data.get("borderRadius", 0),
+            "corner_style": data.get("cornerStyle", "round"),
+        }
+        return shape
+
+
+def _z_index(layer: Dict[str, Any]) -> int:
+    return layer["position"].get("z_index", 0)
+
+
+def _background_color(background: Dict[str, Any]) -> str:
+    """Fabric background color for a canonical Background."""
+    if background.get("color"):
+        return background["color"]
+    stops = (background.get("gradient") or {}).get("colors") or []
+    if stops:
+        first = stops[0]
+        return first if isinstance(first, str) else first.get("color", DEFAULT_BACKGROUND)
+    return DEFAULT_BACKGROUND
+
+
+def _rotate(x: float, y: float, angle: float) -> Tuple[float, float]:
+    """Rotate the vector (x, y) by angle degrees (clockwise on screen)."""
+    if not angle:
+        return x, y
+    radians = math.radians(angle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    return x * cos - y * sin, x * sin + y * cos
+
+
+def _center(
+    x: float, y: float, width: float, height: float,
+    origin_x: str, origin_y: str, angle: float,
+) -> Tuple[float, float]:
+    """Center of a box whose origin point is at (x, y), rotated about that point."""
+    dx, dy = _rotate(
+        (0.5 - _ORIGIN_FRACTION[origin_x]) * width,
+        (0.5 - _ORIGIN_FRACTION[origin_y]) * height,
+        angle,
+    )
+    return x + dx, y + dy
+
+
+def _origin(
+    center_x: float, center_y: float, width: float, height: float,
+    origin_x: str, origin_y: str, angle: float,
+) -> Tuple[float, float]:
+    """Origin point of a rotated box centered at (center_x, center_y)."""
+    dx, dy = _rotate(
+        (0.5 - _ORIGIN_FRACTION[origin_x]) * width,
+        (0.5 - _ORIGIN_FRACTION[origin_y]) * height,
+        angle,
+    )
+    return center_x - dx, center_y - dy
+
+
+def _apply_group_transform(layer: Dict[str, Any], group: GroupTransform) -> None:
+    """
+    Move a layer read from a group's frame onto the canvas.
+
+    Sizes, font size and corner radii are scaled by the group's scale and
+    the group's angle is added to the layer's (exact for uniform scales).
+    """
+    center_x, center_y, angle, scale_x, scale_y = group
+    p = layer["position"]
+    x, y = _center(
+        p["x"], p["y"], p["width"], p["height"], p["origin_x"], p["origin_y"], p["rotation"],
+    )
+    x, y = _rotate(x * scale_x, y * scale_y, angle)
+    p["width"] *= scale_x
+    p["height"] *= scale_y
+    p["rotation"] += angle
+    p["x"], p["y"] = _origin(
+        center_x + x, center_y + y, p["width"], p["height"],
+        p["origin_x"], p["origin_y"], p["rotation"],
+    )
+    if scale_x == 1 and scale_y == 1:
+        return
+    if layer["type"] == "text":
+        text = layer["text"]
+        text["font_size"] *= scale_y
+        text["letter_spacing"] = round(text["letter_spacing"] * scale_y, 4)
+    elif layer["type"] == "shape" and layer["shape"]["border_radius"]:
+        layer["shape"]["border_radius"] *= min(scale_x, scale_y)
+
+
+def _format_for(width: Optional[float], height: Optional[float]) -> str:
+    """DesignFormat value whose canvas matches width x height (instagram_post if none)."""
+    for design_format in DesignFormat:
+        dimensions = get_fabric_canvas_dimensions(design_format.value)
+        if (dimensions["width"], dimensions["height"]) == (width, height):
+            return design_format.value
+    return DesignFormat.INSTAGRAM_POST.value
+
+
+fabric_converter = FabricConverter()
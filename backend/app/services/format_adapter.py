@@ -0,0 +1,353 @@
+"""
+Format adaptation for canonical designs.
+
+Retargets a CanonicalDesign to another DesignFormat (e.g. an Instagram post
+to a story and a LinkedIn banner) with geometric rules instead of a new
+generation:
+    - layers covering the canvas (backgrounds) are stretched to the new
+      canvas; bands spanning its width or height keep spanning it
+    - every other layer keeps its aspect ratio, scaled by the factor that
+      fits the old canvas in the new one, and stays anchored to the side
+      (or center) of the safe zone it was closest to
+    - images are re-fit into the area they would occupy after stretching,
+      according to their fit mode
+    - text keeps its size hierarchy and never drops below min_font_size
+    - text is moved (and narrowed if needed) into the new safe zone,
+      computed from the design's DesignConstraints
+
+Positions are converted through each layer's origin point and rotation,
+so anchoring works on the box the layer actually covers and placed layers
+stay inside the canvas on all four sides.
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.schemas.ai_models import get_fabric_canvas_dimensions
+from app.schemas.canonical_design import (
+    CanonicalDesign,
+    DesignFormat,
+    GroupLayer,
+    ImageLayer,
+    ImageRole,
+    Layer,
+    Position,
+    ShapeLayer,
+    ShapeType,
+    TextLayer,
+)
+
+logger = get_logger(__name__)
+
+# A layer covering this fraction of a canvas dimension spans it
+SPAN_THRESHOLD = 0.9
+
+Box = Tuple[float, float, float, float]  # x, y, width, height
+
+# Where origin_x / origin_y sit along the box, as a fraction of its size
+_ORIGIN_FRACTION = {"left": 0.0, "top": 0.0, "center": 0.5, "right": 1.0, "bottom": 1.0}
+
+
+class FormatAdapter:
+    """
+    Rule-based re-layout of a CanonicalDesign for other formats.
+
+    Example:
+        story = format_adapter.adapt(design, DesignFormat.INSTAGRAM_STORY)
+        campaign = format_adapter.adapt_all(design)  # every format at once
+    """
+
+    def adapt(self, design: CanonicalDesign, target: DesignFormat) -> CanonicalDesign:
+        """
+        Re-layout design for the target format.
+
+        Args:
+            design: Source design
+            target: Format to produce
+
+        Returns:
+            New design with canvas, format and layer geometry for target;
+            the source is not modified
+        """
+        target = DesignFormat(target)
+        dimensions = get_fabric_canvas_dimensions(target.value)
+        adapted = design.model_copy(deep=True)
+        adapted.format = target
+        adapted.canvas.width = dimensions["width"]
+        adapted.canvas.height = dimensions["height"]
+        adapted.metadata.updated_at = datetime.utcnow()
+        if design.format == target and (design.canvas.width, design.canvas.height) == (
+            dimensions["width"], dimensions["height"]
+        ):
+            return adapted
+
+        if design.format != target:
+            adapted.id = f"{design.id}_{target.value}"
+        _Relayout(design, adapted).run()
+        return adapted
+
+    def adapt_all(
+        self,
+        design: CanonicalDesign,
+        formats: Optional[Iterable[DesignFormat]] = None,
+    ) -> Dict[str, CanonicalDesign]:
+        """
+        Re-layout design for several formats in one call.
+
+        Args:
+            design: Source design
+            formats: Formats to produce (default: every DesignFormat)
+
+        Returns:
+            Adapted designs keyed by format value
+        """
+        targets = list(formats) if formats else list(DesignFormat)
+        return {DesignFormat(f).value: self.adapt(design, f) for f in targets}
+
+
+class _Relayout:
+    """Geometry of one source-to-target adaptation."""
+
+    def __init__(self, source: CanonicalDesign, target: CanonicalDesign):
+        self.source = source
+        self.target = target
+        self.w0, self.h0 = source.canvas.width, source.canvas.height
+        self.w1, self.h1 = target.canvas.width, target.canvas.height
+        self.sx = self.w1 / self.w0
+        self.sy = self.h1 / self.h0
+        # Content keeps its aspect ratio, so it scales by the tighter axis
+        self.scale = min(self.sx, self.sy)
+        margin = source.constraints.safe_zone_margin
+        self.safe0 = self._safe_zone(self.w0, self.h0, margin)
+        self.safe1 = self._safe_zone(self.w1, self.h1, margin)
+
+    @staticmethod
+    def _safe_zone(width: float, height: float, margin: float) -> Box:
+        inset = min(width, height) * margin
+        return inset, inset, width - 2 * inset, height - 2 * inset
+
+    def run(self) -> None:
+        by_id = {layer.id: layer for layer in self.target.layers}
+        groups: List[GroupLayer] = []
+        for layer in self.target.layers:
+            if isinstance(layer, GroupLayer):
+                groups.append(layer)
+            elif isinstance(layer, ImageLayer):
+                self._place_image(layer)
+            elif isinstance(layer, ShapeLayer):
+                self._place_shape(layer)
+            else:
+                self._place(layer.position, *self._content_box(layer.position))
+
+        self._scale_text([layer for layer in self.target.layers if isinstance(layer, TextLayer)])
+        for layer in self.target.layers:
+            if isinstance(layer, TextLayer):
+                self._into_safe_zone(layer.position)
+
+        for group in groups:
+            self._place_group(group, by_id)
+
+    # -- classification -------------------------------------------------------
+
+    def _spans(self, position: Position) -> Tuple[bool, bool]:
+        """Whether a source box spans the canvas width / height."""
+        return (
+            position.width >= self.w0 * SPAN_THRESHOLD,
+            position.height >= self.h0 * SPAN_THRESHOLD,
+        )
+
+    def _anchor(self, start: float, size: float, safe_start: float, safe_size: float) -> str:
+        """Which side of the safe zone a source box belongs to on one axis."""
+        center = start + size / 2
+        if center < safe_start + safe_size / 3:
+            return "start"
+        if center > safe_start + safe_size * 2 / 3:
+            return "end"
+        return "center"
+
+    # -- geometry -------------------------------------------------------------
+
+    @staticmethod
+    def _origin_offset(position: Position, width: float, height: float) -> Tuple[float, float]:
+        """Offset from the center of a width x height box to its origin point, rotated."""
+        dx = (_ORIGIN_FRACTION[position.origin_x] - 0.5) * width
+        dy = (_ORIGIN_FRACTION[position.origin_y] - 0.5) * height
+        angle = math.radians(position.rotation)
+        cos, sin = math.cos(angle), math.sin(angle)
+        return dx * cos - dy * sin, dx * sin + dy * cos
+
+    @staticmethod
+    def _extent(position: Position, width: float, height: float) -> Tuple[float, float]:
+        """Width and height of the axis-aligned bounds of the rotated box."""
+        angle = math.radians(position.rotation)
+        cos, sin = abs(math.cos(angle)), abs(math.sin(angle))
+        return width * cos + height * sin, width * sin + height * cos
+
+    def _box(self, position: Position) -> Box:
+        """Unrotated top-left box of a layer, centered where the layer is."""
+        dx, dy = self._origin_offset(position, position.width, position.height)
+        center_x, center_y = position.x - dx, position.y - dy
+        return (center_x - position.width / 2, center_y - position.height / 2,
+                position.width, position.height)
+
+    def _bounds(self, position: Position) -> Box:
+        """Axis-aligned box the rotated layer covers on the canvas."""
+        x, y, width, height = self._box(position)
+        extent_w, extent_h = self._extent(position, width, height)
+        return (x + width / 2 - extent_w / 2, y + height / 2 - extent_h / 2, extent_w, extent_h)
+
+    # -- placement ------------------------------------------------------------
+
+    def _map_axis(
+        self,
+        start: float,
+        size: float,
+        new_size: float,
+        safe0: Tuple[float, float],
+        safe1: Tuple[float, float],
+    ) -> float:
+        """New start coordinate of a box on one axis, keeping its anchor."""
+        safe0_start, safe0_size = safe0
+        safe1_start, safe1_size = safe1
+        anchor = self._anchor(start, size, safe0_start, safe0_size)
+        if anchor == "start":
+            return safe1_start + (start - safe0_start) * self.scale
+        if anchor == "end":
+            gap = safe0_start + safe0_size - (start + size)
+            return safe1_start + safe1_size - gap * self.scale - new_size
+        offset = (start + size / 2) - (safe0_start + safe0_size / 2)
+        return safe1_start + safe1_size / 2 + offset * self.scale - new_size / 2
+
+    def _content_box(self, position: Position) -> Box:
+        """Aspect-preserving box for a layer, anchored like the source."""
+        x0, y0, width0, height0 = self._box(position)
+        width = width0 * self.scale
+        height = height0 * self.scale
+        x = self._map_axis(x0, width0, width,
+                           (self.safe0[0], self.safe0[2]), (self.safe1[0], self.safe1[2]))
+        y = self._map_axis(y0, height0, height,
+                           (self.safe0[1], self.safe0[3]), (self.safe1[1], self.safe1[3]))
+        return x, y, width, height
+
+    def _stretched_box(self, position: Position) -> Box:
+        """Box for a layer that spans the canvas on one or both axes."""
+        spans_x, spans_y = self._spans(position)
+        x, y, width, height = self._content_box(position)
+        x0, y0, width0, height0 = self._box(position)
+        if spans_x:
+            x, width = x0 * self.sx, width0 * self.sx
+        if spans_y:
+            y, height = y0 * self.sy, height0 * self.sy
+        return x, y, width, height
+
+    def _place(self, position: Position, x: float, y: float, width: float, height: float) -> None:
+        """
+        Move a layer to the unrotated top-left box (x, y, width, height),
+        shrunk and shifted so the rotated layer stays inside the canvas.
+        """
+        center_x, center_y = x + width / 2, y + height / 2
+        if position.rotation % 360 == 0:
+            width, height = min(width, self.w1), min(height, self.h1)
+        else:
+            extent_w, extent_h = self._extent(position, width, height)
+            shrink = min(1.0, self.w1 / extent_w if extent_w else 1.0,
+                         self.h1 / extent_h if extent_h else 1.0)
+            width, height = width * shrink, height * shrink
+        extent_w, extent_h = self._extent(position, width, height)
+        center_x = min(max(center_x, extent_w / 2), self.w1 - extent_w / 2)
+        center_y = min(max(center_y, extent_h / 2), self.h1 - extent_h / 2)
+        dx, dy = self._origin_offset(position, width, height)
+        position.x = round(center_x + dx, 2)
+        position.y = round(center_y + dy, 2)
+        position.width = round(width, 2)
+        position.height = round(height, 2)
+
+    def _place_shape(self, layer: ShapeLayer) -> None:
+        position = layer.position
+        spans_x, spans_y = self._spans(position)
+        round_shape = layer.shape.shape_type == ShapeType.CIRCLE
+        if (spans_x or spans_y) and not round_shape:
+            box = self._stretched_box(position)
+        else:
+            box = self._content_box(position)
+        if layer.shape.border_radius:
+            layer.shape.border_radius = round(layer.shape.border_radius * self.scale, 2)
+        self._place(position, *box)
+
+    def _place_image(self, layer: ImageLayer) -> None:
+        position = layer.position
+        spans_x, spans_y = self._spans(position)
+        if layer.image.role == ImageRole.BACKGROUND or (spans_x and spans_y):
+            allotted = (0.0, 0.0, float(self.w1), float(self.h1))
+        else:
+            # The area the image would cover if the design were stretched
+            x, y, width, height = self._content_box(position)
+            allotted_w, allotted_h = position.width * self.sx, position.height * self.sy
+            allotted = (x + width / 2 - allotted_w / 2, y + height / 2 - allotted_h / 2,
+                        allotted_w, allotted_h)
+        self._place(position, *self._fit(layer.image.fit, position, allotted))
+
+    @staticmethod
+    def _fit(fit: str, position: Position, allotted: Box) -> Box:
+        """Image box inside the allotted area for a fit mode."""
+        x, y, width, height = allotted
+        if fit in ("fill", "cover"):
+            # fill stretches and cover crops; both occupy the whole area
+            return allotted
+        aspect = position.width / position.height if position.height else 1.0
+        fit_width = min(width, height * aspect)
+        if fit == "scale-down":
+            fit_width = min(fit_width, position.width)
+        fit_height = fit_width / aspect if aspect else height
+        return x + (width - fit_width) / 2, y + (height - fit_height) / 2, fit_width, fit_height
+
+    def _place_group(self, group: GroupLayer, by_id: Dict[str, Layer]) -> None:
+        children = [by_id[child] for child in group.children if child in by_id]
+        boxes = [self._bounds(child.position) for child in children
+                 if not isinstance(child, GroupLayer)]
+        if not boxes:
+            self._place(group.position, *self._content_box(group.position))
+            return
+        left = min(x for x, _, _, _ in boxes)
+        top = min(y for _, y, _, _ in boxes)
+        right = max(x + width for x, _, width, _ in boxes)
+        bottom = max(y + height for _, y, _, height in boxes)
+        self._place(group.position, left, top, right - left, bottom - top)
+
+    # -- text -----------------------------------------------------------------
+
+    def _scale_text(self, layers: List[TextLayer]) -> None:
+        """Scale font sizes, keeping every size step of the source hierarchy."""
+        min_size = self.source.constraints.min_font_size
+        source_sizes = {layer.id: layer.text.font_size for layer in layers}
+        previous_source: Optional[float] = None
+        previous_new = 0.0
+        for layer in sorted(layers, key=lambda l: source_sizes[l.id]):
+            source_size = source_sizes[layer.id]
+            size = max(source_size * self.scale, min_size)
+            if previous_source is not None:
+                if source_size > previous_source:
+                    size = max(size, previous_new + 1)
+                else:
+                    size = previous_new
+            size = round(size, 1)
+            if size > source_size * self.scale:
+                # Grown to stay readable: grow the box with the text
+                growth = size / (source_size * self.scale)
+                layer.position.height = round(layer.position.height * growth, 2)
+            layer.text.font_size = size
+            layer.text.letter_spacing = round(layer.text.letter_spacing * self.scale, 2)
+            previous_source, previous_new = source_size, size
+
+    def _into_safe_zone(self, position: Position) -> None:
+        left, top, width, height = self.safe1
+        x, y, box_width, box_height = self._box(position)
+        box_width = min(box_width, width)
+        x = min(max(x, left), left + width - box_width)
+        y = min(max(y, top), top + height - box_height) if box_height <= height else top
+        self._place(position, x, y, box_width, box_height)
+
+
+format_adapter = FormatAdapter()
@@ -0,0 +1,137 @@
+"""
+Gemini client lifecycle for Radic API.
+
+LayoutAI and CanonicalLayoutGenerator share one genai.Client, created on
+first use rather than at import time, so importing the app neither loads
+the Gemini SDK nor builds TLS contexts. The client sends requests through
+a keep-alive httpx connection pool owned by this module. The pool is
+closed by the lifespan hook in app.main.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+if TYPE_CHECKING:
+    from google import genai
+
+logger = get_logger(__name__)
+
+
+class GeminiClientPool:
+    """
+    Owner of the app-lifetime Gemini client and its HTTP connection pool.
+
+    Example:
+        if gemini_client_pool.is_configured:
+            response = await gemini_client_pool.client.aio.models.generate_content(...)
+        ...
+        await gemini_client_pool.close()
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        timeout: float,
+    ):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional["genai.Client"] = None
+
+    @property
+    def is_configured(self) -> bool:
+        """Whether an API key is set; services use mock data otherwise."""
+        return bool(self.api_key)
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None
+
+    def open(self) -> "genai.Client":
+        """
+        Create the pooled HTTP client and Gemini client (idempotent).
+
+        Raises:
+            ValueError: If GEMINI_API_KEY is not configured
+        """
+        with self._lock:
+            if self._client is not None:
+                return self._client
+            if not self.is_configured:
+                raise ValueError("GEMINI_API_KEY not configured in settings")
+
+            # Imported here: the SDK is slow to import and unused without a key
+            from google import genai
+            from google.genai import types
+
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=self.timeout,
+            )
+            self._client = genai.Client(
+                api_key=self.api_key,
+                http_options=types.HttpOptions(httpx_async_client=self._http_client),
+            )
+            logger.info(
+                f"Opened Gemini client (max_connections={self.max_connections}, "
+                f"max_keepalive={self.max_keepalive_connections})"
+            )
+            return self._client
+
+    async def close(self) -> None:
+        """Close all pooled connections and drop the client."""
+        with self._lock:
+            client, http_client = self._client, self._http_client
+            self._client = None
+            self._http_client = None
+        if client is not None:
+            # The SDK's own sync client is unused but still holds a pool
+            client.close()
+        if http_client is not None:
+            await http_client.aclose()
+            logger.info("Closed Gemini client")
+
+    @property
+    def client(self) -> "genai.Client":
+        """Shared Gemini client, opened on first use."""
+        return self._client or self.open()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage for health checks and monitoring."""
+        http_client = self._http_client
+        if http_client is None:
+            return {"open": False, "configured": self.is_configured}
+
+        connections = http_client._transport._pool.connections
+        return {
+            "open": True,
+            "configured": True,
+            "max_connections": self.max_connections,
+            "connections": len(connections),
+            "idle": sum(1 for conn in connections if conn.is_idle()),
+        }
+
+
+gemini_client_pool = GeminiClientPool(
+    api_key=settings.GEMINI_API_KEY,
+    max_connections=settings.GEMINI_POOL_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.GEMINI_POOL_MAX_KEEPALIVE,
+    keepalive_expiry=settings.GEMINI_POOL_KEEPALIVE_EXPIRY,
+    timeout=settings.GEMINI_TIMEOUT,
+)
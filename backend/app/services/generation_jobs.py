@@ -0,0 +1,154 @@
+"""
+Design generation as a background job, and saving generated designs.
+
+run_generate_job is the "layout.generate" handler of the job queue; it is
+registered on import, by the API (through its endpoints) and by the
+dedicated worker process (app.worker). save_generated_design is shared
+with the synchronous and streaming endpoints.
+
+A job may run more than once (its worker died or lost its lease), so the
+design it saves is keyed by the job id: a retry finds the design an
+earlier attempt saved and returns it instead of generating and saving
+another copy.
+"""
+
+import uuid
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.exceptions import DatabaseError
+from app.core.logging import get_logger
+from app.core.resilience import request_deadline
+from app.db.repositories import DesignRepository, get_design_repository
+from app.schemas.ai_models import GenerateRequest
+from app.services.ai_layout import layout_ai
+from app.services.job_queue import Emit, job_queue
+
+logger = get_logger(__name__)
+
+
+async def save_generated_design(
+    design: Dict[str, Any],
+    request: GenerateRequest,
+    user_id: Optional[str],
+    designs: DesignRepository,
+    design_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Save a generated design for an authenticated user.
+
+    Anonymous users (user_id None) get the design in the same shape as a
+    database record, with a mock ID and nothing saved.
+
+    Args:
+        design: Fabric.js design JSON
+        request: The generation request
+        user_id: Owner, or None for anonymous users
+        designs: Design repository
+        design_id: ID for the new record; if a record with this ID already
+            exists for the user (an earlier attempt saved it), it is returned
+
+    Returns:
+        The saved design record
+
+    Raises:
+        DatabaseError: If the design could not be saved
+    """
+    if user_id is not None:
+        design_data = {
+            "title": "AI Generated Design",
+            "format": request.format or "instagram_post",
+            "owner_id": user_id,
+            "brand_id": request.brand_id,
+            "design_json": design,
+        }
+        if design_id is not None:
+            design_data["id"] = design_id
+
+        try:
+            saved_design = await designs.create(design_data)
+        except Exception:
+            # Duplicate key: a concurrent attempt saved it first
+            saved_design = await designs.get(design_id, user_id) if design_id else None
+            if saved_design is None:
+                raise
+
+        if not saved_design:
+            raise DatabaseError("Failed to save generated design to database")
+
+        logger.info(f"Saved design {saved_design['id']} to database for user {user_id}")
+
+        # Return the saved design with the database ID
+        return saved_design
+
+    # For anonymous users, return design in same format as DB record
+    # but with a mock ID (not saved to database)
+    logger.info(f"Returning generated design for anonymous user (not saved to database)")
+    return {
+        "id": "mock_design_1",
+        "title": "AI Generated Design",
+        "format": request.format or "instagram_post",
+        "owner_id": "anonymous",
+        "brand_id": request.brand_id,
+        "design_json": design,
+    }
+
+
+def job_design_id(job_id: str) -> str:
+    """ID of the design a generation job saves (the job id as a UUID)."""
+    return str(uuid.UUID(job_id))
+
+
+@job_queue.handler("layout.generate")
+async def run_generate_job(job: Dict[str, Any], emit: Emit) -> Dict[str, Any]:
+    """
+    Background version of POST /generate/stream.
+
+    Emits the same brief, object and design events, then saves the design
+    like POST /generate and returns the saved record as the job result.
+    On a retry whose earlier attempt already saved the design, emits that
+    design and returns it without generating again.
+    """
+    request = GenerateRequest(**job["payload"])
+    user_id = job["user_id"]
+    designs = get_design_repository()
+    design_id = job_design_id(job["id"])
+    if user_id is not None and job["attempts"] > 1:
+        saved = await designs.get(design_id, user_id)
+        if saved is not None:
+            logger.info(f"Job {job['id']} already saved design {design_id}, not regenerating")
+            await emit("design", saved["design_json"])
+            await emit("saved", saved)
+            return saved
+
+    fused = settings.GEMINI_FUSED_GENERATION if request.fused is None else request.fused
+    # Brief and design share one deadline across all their attempts
+    with request_deadline(settings.GEMINI_REQUEST_DEADLINE):
+        if request.instant or fused:
+            # One call produces brief and design together; nothing to stream
+            generated = await layout_ai.generate(
+                request.prompt,
+                brand_id=request.brand_id,
+                format=request.format,
+                use_cache=not request.bypass_cache,
+                fused=request.fused,
+                instant=request.instant,
+            )
+            await emit("brief", generated["brief"])
+            design = generated["design"]
+        else:
+            brief = await layout_ai.prompt_to_brief(request.prompt, use_cache=not request.bypass_cache)
+            if request.format:
+                brief["format"] = request.format
+            await emit("brief", brief)
+            design = None
+            async for event in layout_ai.stream_design(brief, brand_id=request.brand_id):
+                if event["type"] == "object":
+                    await emit("object", {"index": event["index"], "object": event["object"]})
+                else:
+                    design = event["design"]
+    await emit("design", design)
+
+    saved = await save_generated_design(design, request, user_id, designs, design_id=design_id)
+    await emit("saved", saved)
+    return saved
@@ -0,0 +1,392 @@
+"""
+Batch validation and repair of canonical layer geometry.
+
+CanonicalLayoutGenerator._validate_design checks one design at a time,
+layer by layer. Revalidating a campaign or every stored design after a
+constraint change means thousands of designs, so GeometryValidator loads
+the layers of all of them into NumPy column arrays and runs each check
+over every layer at once:
+    - boxes are kept inside the canvas, taking rotation and origin into
+      account (the rotated bounding box is what must fit)
+    - text is kept inside the safe zone from DesignConstraints
+    - text below min_font_size is raised to it
+    - overlapping content layers (text and non-background images) are
+      reported; they are not moved, since overlap is a layout decision
+Fixes are written back to the layer models in one pass at the end.
+
+Reading the models into columns costs about as much as one per-layer
+Python pass, so the gain is in everything after it: the checks themselves,
+the pairwise overlap test, and revalidating loaded columns under other
+constraints (see misc_tests/benchmark_geometry_validator.py).
+"""
+
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.core.logging import get_logger
+from app.schemas.canonical_design import (
+    CanonicalDesign,
+    DesignConstraints,
+    ImageRole,
+    Layer,
+    LayerType,
+)
+
+logger = get_logger(__name__)
+
+# An image covering this fraction of both canvas dimensions is a background
+BACKGROUND_COVERAGE = 0.9
+
+# Numerical slack so boxes placed exactly on an edge are not reported
+_EPSILON = 0.01
+
+# Upper bound on cells in one pairwise overlap comparison
+_OVERLAP_CELLS = 4_000_000
+
+# Layer kinds in the column table
+_OTHER, _TEXT, _IMAGE = 0.0, 1.0, 2.0
+
+_GEOMETRY = attrgetter("x", "y", "width", "height", "rotation")
+_ORIGIN_X = {"left": 0.0, "center": 0.5, "right": 1.0}
+_ORIGIN_Y = {"top": 0.0, "center": 0.5, "bottom": 1.0}
+
+
+class LayerColumns:
+    """
+    Layer geometry of many designs as parallel arrays, one row per layer.
+
+    Reading the models is the only per-layer Python work, so a loaded
+    LayerColumns can be validated again (e.g. under new constraints) without
+    reading them again; repairs update both the arrays and the models.
+    """
+
+    def __init__(self, designs: Sequence[CanonicalDesign]):
+        self.design_ids = [design.id for design in designs]
+        self.layers: List[Layer] = []
+        # One flat list, 10 values per layer: converting it is much cheaper
+        # than converting a list of tuples
+        values: List[float] = []
+        canvas: List[Tuple[float, float, float, float]] = []
+        layers, extend = self.layers, values.extend
+        # Locals: this loop runs once per layer
+        text, image, group = LayerType.TEXT, LayerType.IMAGE, LayerType.GROUP
+        background, geometry = ImageRole.BACKGROUND, _GEOMETRY
+        origin_x, origin_y = _ORIGIN_X, _ORIGIN_Y
+        for index, design in enumerate(designs):
+            canvas_w, canvas_h = design.canvas.width, design.canvas.height
+            constraints = design.constraints
+            canvas.append((
+                canvas_w, canvas_h,
+                min(canvas_w, canvas_h) * constraints.safe_zone_margin,
+                constraints.min_font_size,
+            ))
+            for layer in design.layers:
+                kind = layer.type
+                if kind is group:
+                    # Group boxes follow their children
+                    continue
+                p = layer.position
+                if kind is text:
+                    code, font = _TEXT, layer.text.font_size
+                elif kind is image and layer.image.role is not background:
+                    code, font = _IMAGE, 0.0
+                else:
+                    code, font = _OTHER, 0.0
+                layers.append(layer)
+                extend(
+                    (index, code, font, origin_x[p.origin_x], origin_y[p.origin_y])
+                    + geometry(p)
+                )
+
+        self.layer_ids = [layer.id for layer in layers]
+        table = np.array(values, dtype=np.float64).reshape(-1, 10)
+        self.design = table[:, 0].astype(np.intp)
+        kinds, self.font = table[:, 1], table[:, 2].copy()
+        self.origin_x, self.origin_y = table[:, 3], table[:, 4]
+        self.x, self.y, self.w, self.h, self.rotation = (table[:, i].copy() for i in range(5, 10))
+        per_design = np.array(canvas, dtype=np.float64).reshape(-1, 4)[self.design]
+        self.canvas_w, self.canvas_h = per_design[:, 0], per_design[:, 1]
+        self.inset, self.min_font = per_design[:, 2], per_design[:, 3]
+        self.is_text = kinds == _TEXT
+        # Images covering the canvas are backgrounds too
+        covers = (self.w >= self.canvas_w * BACKGROUND_COVERAGE) & (
+            self.h >= self.canvas_h * BACKGROUND_COVERAGE
+        )
+        self.is_content = self.is_text | ((kinds == _IMAGE) & ~covers)
+
+    def __len__(self) -> int:
+        return len(self.layers)
+
+    def limits(
+        self, constraints: Optional[DesignConstraints] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Safe zone inset and minimum font size per row, from constraints if given."""
+        if constraints is None:
+            return self.inset, self.min_font
+        inset = np.minimum(self.canvas_w, self.canvas_h) * constraints.safe_zone_margin
+        return inset, np.full(len(self), float(constraints.min_font_size))
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Axis-aligned bounds (left, top, right, bottom) of the rotated boxes."""
+        theta = np.radians(self.rotation)
+        cos, sin = np.abs(np.cos(theta)), np.abs(np.sin(theta))
+        # Half extents of the rotated box
+        half_w = (self.w * cos + self.h * sin) / 2
+        half_h = (self.w * sin + self.h * cos) / 2
+        # The box rotates about its origin point, which sits at (x, y)
+        offset_x = (0.5 - self.origin_x) * self.w
+        offset_y = (0.5 - self.origin_y) * self.h
+        center_x = self.x + offset_x * np.cos(theta) - offset_y * np.sin(theta)
+        center_y = self.y + offset_x * np.sin(theta) + offset_y * np.cos(theta)
+        return center_x - half_w, center_y - half_h, center_x + half_w, center_y + half_h
+
+
+class GeometryValidator:
+    """
+    Vectorized geometry checks over many canonical designs.
+
+    Example:
+        reports = geometry_validator.validate(designs)             # check and fix
+        reports = geometry_validator.validate(designs, fix=False)  # report only
+
+        # Try several constraint sets, reading the models once
+        columns = geometry_validator.load(designs)
+        for margin in (0.04, 0.05, 0.06):
+            geometry_validator.validate(
+                columns, fix=False, constraints=DesignConstraints(safe_zone_margin=margin)
+            )
+    """
+
+    def load(self, designs: Sequence[CanonicalDesign]) -> LayerColumns:
+        """Read the layer geometry of designs into columns for repeated validation."""
+        return LayerColumns(designs)
+
+    def validate(
+        self,
+        designs: Union[Sequence[CanonicalDesign], LayerColumns],
+        fix: bool = True,
+        constraints: Optional[DesignConstraints] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Check (and optionally repair) the layer geometry of designs.
+
+        Args:
+            designs: Designs to check, or columns from load()
+            fix: Write repaired positions and font sizes back to the layers
+            constraints: Apply these to every design instead of each
+                design's own (e.g. to revalidate after a constraint change)
+
+        Returns:
+            One report per design, in order, with the ids of layers that were
+            out_of_bounds, outside_safe_zone (text), rotation_out_of_bounds
+            (only their rotated box left the canvas), font_too_small and
+            unfixable (rotated box larger than the canvas), plus overlaps as
+            (layer_id, layer_id) pairs of content layers
+        """
+        cols = designs if isinstance(designs, LayerColumns) else LayerColumns(designs)
+        reports = [
+            {
+                "design_id": design_id,
+                "out_of_bounds": [],
+                "outside_safe_zone": [],
+                "rotation_out_of_bounds": [],
+                "font_too_small": [],
+                "unfixable": [],
+                "overlaps": [],
+            }
+            for design_id in cols.design_ids
+        ]
+        if not len(cols):
+            return reports
+        inset, min_font = cols.limits(constraints)
+
+        # Target area per layer: the safe zone for text, the canvas otherwise
+        area_left = np.where(cols.is_text, inset, 0.0)
+        area_top = area_left
+        area_right = cols.canvas_w - area_left
+        area_bottom = cols.canvas_h - area_left
+
+        # -- detect -----------------------------------------------------------
+        left, top, right, bottom = cols.bounds()
+        outside_canvas = (
+            (left < -_EPSILON) | (top < -_EPSILON)
+            | (right > cols.canvas_w + _EPSILON) | (bottom > cols.canvas_h + _EPSILON)
+        )
+        outside_area = (
+            (left < area_left - _EPSILON) | (top < area_top - _EPSILON)
+            | (right > area_right + _EPSILON) | (bottom > area_bottom + _EPSILON)
+        )
+        rotated = (cols.rotation % 360) != 0
+        # Would fit unrotated, but the rotated box does not
+        unrotated_inside = (
+            (cols.x - cols.origin_x * cols.w >= -_EPSILON)
+            & (cols.y - cols.origin_y * cols.h >= -_EPSILON)
+            & (cols.x + (1 - cols.origin_x) * cols.w <= cols.canvas_w + _EPSILON)
+            & (cols.y + (1 - cols.origin_y) * cols.h <= cols.canvas_h + _EPSILON)
+        )
+        rotation_out = rotated & outside_canvas & unrotated_inside
+        small_font = cols.is_text & (cols.font < min_font)
+
+        # -- repair -----------------------------------------------------------
+        unfixable = np.zeros(len(cols), dtype=bool)
+        if fix:
+            unfixable = self._repair(
+                cols, area_left, area_top, area_right, area_bottom, outside_area, rotated
+            )
+            cols.font = np.where(small_font, min_font, cols.font)
+            self._write_back(cols, outside_area | small_font)
+            left, top, right, bottom = cols.bounds()
+        overlaps = self._overlaps(cols, left, top, right, bottom)
+
+        # -- report -----------------------------------------------------------
+        issues = {
+            "out_of_bounds": outside_canvas,
+            "outside_safe_zone": outside_area & ~outside_canvas & cols.is_text,
+            "rotation_out_of_bounds": rotation_out,
+            "font_too_small": small_font,
+            "unfixable": unfixable,
+        }
+        ids = cols.layer_ids
+        for key, mask in issues.items():
+            rows = np.flatnonzero(mask)
+            for design, row in zip(cols.design[rows].tolist(), rows.tolist()):
+                reports[design][key].append(ids[row])
+        first, second = overlaps
+        for design, a, b in zip(cols.design[first].tolist(), first.tolist(), second.tolist()):
+            reports[design]["overlaps"].append((ids[a], ids[b]))
+
+        flagged = np.zeros(len(reports), dtype=bool)
+        flagged[cols.design[np.logical_or.reduce(list(issues.values()))]] = True
+        logger.info(
+            f"Validated {len(cols)} layers in {len(reports)} designs: "
+            f"{int(flagged.sum())} with issues, {len(first)} overlaps"
+        )
+        return reports
+
+    @staticmethod
+    def _overlaps(
+        cols: LayerColumns,
+        left: np.ndarray,
+        top: np.ndarray,
+        right: np.ndarray,
+        bottom: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Row pairs of content layers in the same design whose boxes intersect."""
+        rows = np.flatnonzero(cols.is_content)
+        pairs: List[Tuple[np.ndarray, np.ndarray]] = [
+            (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+        ]
+        # Lay each design's content layers out as one row of a (designs, slots)
+        # grid, so all pairs of a design compare at once; designs are taken in
+        # chunks of similar size to bound the (designs, slots, slots) arrays
+        design = cols.design[rows]
+        starts = np.flatnonzero(np.r_[True, design[1:] != design[:-1]])
+        counts = np.diff(np.r_[starts, len(rows)])
+        order = np.argsort(-counts, kind="stable")
+        position = 0
+        while position < len(order):
+            slots = int(counts[order[position]])
+            if slots < 2:
+                break
+            chunk = order[position:position + max(1, _OVERLAP_CELLS // (slots * slots))]
+            position += len(chunk)
+            # Scatter each design's rows into its grid row
+            sizes = counts[chunk]
+            grid = np.full((len(chunk), slots), -1, dtype=np.intp)
+            grid_row = np.repeat(np.arange(len(chunk)), sizes)
+            slot = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+            grid[grid_row, slot] = rows[np.repeat(starts[chunk], sizes) + slot]
+            pairs.append(GeometryValidator._grid_overlaps(grid, left, top, right, bottom))
+        return np.concatenate([a for a, _ in pairs]), np.concatenate([b for _, b in pairs])
+
+    @staticmethod
+    def _grid_overlaps(
+        grid: np.ndarray,
+        left: np.ndarray,
+        top: np.ndarray,
+        right: np.ndarray,
+        bottom: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Intersecting row pairs within each row of grid (-1 marks empty slots)."""
+        valid = grid >= 0
+        safe = np.where(valid, grid, 0)
+        l, t, r, b = left[safe], top[safe], right[safe], bottom[safe]
+        hit = (
+            (l[:, :, None] < r[:, None, :] - _EPSILON)
+            & (l[:, None, :] < r[:, :, None] - _EPSILON)
+            & (t[:, :, None] < b[:, None, :] - _EPSILON)
+            & (t[:, None, :] < b[:, :, None] - _EPSILON)
+            & valid[:, :, None] & valid[:, None, :]
+        )
+        hit &= np.triu(np.ones(hit.shape[1:], dtype=bool), k=1)
+        d, i, j = np.nonzero(hit)
+        return grid[d, i], grid[d, j]
+
+    @staticmethod
+    def _repair(
+        cols: LayerColumns,
+        area_left: np.ndarray,
+        area_top: np.ndarray,
+        area_right: np.ndarray,
+        area_bottom: np.ndarray,
+        outside: np.ndarray,
+        rotated: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Move (and if needed shrink) boxes into their target area.
+
+        Returns:
+            Mask of layers whose rotated box still does not fit
+        """
+        # Unrotated boxes larger than their area are shrunk to it
+        shrink = outside & ~rotated
+        cols.w = np.where(shrink, np.minimum(cols.w, area_right - area_left), cols.w)
+        cols.h = np.where(shrink, np.minimum(cols.h, area_bottom - area_top), cols.h)
+
+        left, top, right, bottom = cols.bounds()
+        dx = GeometryValidator._shift(left, right, area_left, area_right)
+        dy = GeometryValidator._shift(top, bottom, area_top, area_bottom)
+        cols.x = np.where(outside, cols.x + dx, cols.x)
+        cols.y = np.where(outside, cols.y + dy, cols.y)
+
+        too_big = ((right - left) > (area_right - area_left) + _EPSILON) | (
+            (bottom - top) > (area_bottom - area_top) + _EPSILON
+        )
+        return outside & too_big
+
+    @staticmethod
+    def _shift(
+        start: np.ndarray, end: np.ndarray, area_start: np.ndarray, area_end: np.ndarray
+    ) -> np.ndarray:
+        """Smallest move along one axis that puts [start, end] inside the area."""
+        low, high = area_start - start, area_end - end
+        # Boxes larger than the area are centered on it
+        return np.where(low <= high, np.clip(0.0, low, high), (low + high) / 2)
+
+    @staticmethod
+    def _write_back(cols: LayerColumns, changed: np.ndarray) -> None:
+        """Copy repaired values onto the layer models, touching changed rows only."""
+        rows = np.flatnonzero(changed)
+        values = zip(
+            rows.tolist(),
+            np.round(cols.x[rows], 2).tolist(),
+            np.round(cols.y[rows], 2).tolist(),
+            np.round(cols.w[rows], 2).tolist(),
+            np.round(cols.h[rows], 2).tolist(),
+            cols.font[rows].tolist(),
+            cols.is_text[rows].tolist(),
+        )
+        layers = cols.layers
+        for row, x, y, width, height, font, is_text in values:
+            position = layers[row].position
+            position.x = x
+            position.y = y
+            position.width = width
+            position.height = height
+            if is_text:
+                layers[row].text.font_size = font
+
+
+geometry_validator = GeometryValidator()
@@ -0,0 +1,746 @@
+"""
+Durable background job queue with a bounded asyncio worker pool.
+
+Long generations run as jobs instead of inside the HTTP request: the API
+enqueues a job and returns its id, workers run it and record progress
+events, and clients poll the job or follow its events over SSE.
+
+Jobs and their events are stored in SQLite (JOBS_DB_PATH), so queued work
+survives restarts. Several processes may share the file: a job is claimed
+inside an IMMEDIATE transaction and held by a lease that its worker renews
+while running. A job whose worker died is picked up again once the lease
+expires, until JOBS_MAX_ATTEMPTS is reached; a worker that finds its lease
+taken over stops running the job. Handlers must therefore tolerate running
+again after a partial attempt (job["attempts"] counts the runs).
+
+Claims are fair across users: the next job comes from the user with the
+fewest running jobs, then the one served least recently, then the oldest
+job, so one user's burst cannot starve everybody else.
+
+Workers run in the API process (JOBS_WORKERS) and/or in separate worker
+processes started with ``python -m app.worker``.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import suppress
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import TooManyRequestsError
+from app.core.logging import get_logger
+from app.db.executor import BlockingIOExecutor
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Events that end a job's event stream
+TERMINAL_EVENTS = ("done", "error")
+
+# Fairness bucket shared by all anonymous jobs
+ANONYMOUS = "anonymous"
+
+Emit = Callable[[str, Any], Awaitable[None]]
+Handler = Callable[[Dict[str, Any], Emit], Awaitable[Any]]
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class JobStore:
+    """
+    SQLite table of jobs and their progress events.
+
+    All methods are blocking; JobQueue calls them on its own single
+    thread executor.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # timeout: how long a write waits for another process's transaction
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " id TEXT NOT NULL UNIQUE,"
+            " kind TEXT NOT NULL,"
+            " user_id TEXT,"
+            " user_key TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " stage TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker_id TEXT,"
+            " lease_expires_at REAL,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL);"
+            "CREATE INDEX IF NOT EXISTS jobs_status_user ON jobs (status, user_key);"
+            "CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at);"
+            "CREATE TABLE IF NOT EXISTS job_users ("
+            " user_key TEXT PRIMARY KEY,"
+            " last_claimed_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " job_id TEXT NOT NULL,"
+            " event TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq);"
+        )
+
+    def _add_event(self, job_id: str, event: str, data: Any, now: float) -> int:
+        cursor = self._conn.execute(
+            "INSERT INTO job_events (job_id, event, data, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, event, json.dumps(data, default=str), now),
+        )
+        return cursor.lastrowid
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        user_id: Optional[str],
+        max_queued: int,
+        max_queued_per_user: int,
+    ) -> Dict[str, Any]:
+        """
+        Add a job to the queue.
+
+        Raises:
+            TooManyRequestsError: If the queue or the user's share of it is full
+        """
+        job_id = uuid.uuid4().hex
+        user_key = user_id or ANONYMOUS
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                queued, user_queued = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(user_key = ?), 0) FROM jobs WHERE status = ?",
+                    (user_key, QUEUED),
+                ).fetchone()
+                if queued >= max_queued:
+                    raise TooManyRequestsError("Job queue is full, try again later")
+                if user_queued >= max_queued_per_user:
+                    raise TooManyRequestsError(
+                        f"Too many queued jobs (max {max_queued_per_user}), "
+                        "wait for some to finish"
+                    )
+                self._conn.execute(
+                    "INSERT INTO jobs (id, kind, user_id, user_key, payload, status, stage, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, user_id, user_key, json.dumps(payload, default=str),
+                     QUEUED, QUEUED, now),
+                )
+                self._add_event(job_id, QUEUED, {"id": job_id}, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._get(job_id)
+
+    def claim(self, worker_id: str, lease: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """
+        Take the next job fairly and lease it to worker_id.
+
+        Running jobs whose lease expired (their worker died) are re-queued
+        first, or failed if they have used up their attempts.
+
+        Returns:
+            The claimed job with its payload, or None if nothing is queued
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._recover_expired(now, max_attempts)
+                row = self._conn.execute(
+                    "SELECT j.id, j.user_key FROM jobs j"
+                    " LEFT JOIN job_users u ON u.user_key = j.user_key"
+                    " WHERE j.status = ?"
+                    " ORDER BY"
+                    "  (SELECT COUNT(*) FROM jobs r WHERE r.status = ? AND r.user_key = j.user_key),"
+                    "  COALESCE(u.last_claimed_at, 0),"
+                    "  j.seq"
+                    " LIMIT 1",
+                    (QUEUED, RUNNING),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job_id, user_key = row
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, attempts = attempts + 1, worker_id = ?,"
+                    " lease_expires_at = ?, started_at = ? WHERE id = ?",
+                    (RUNNING, RUNNING, worker_id, now + lease, now, job_id),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO job_users (user_key, last_claimed_at) VALUES (?, ?)",
+                    (user_key, now),
+                )
+                job = self._get(job_id, payload=True)
+                self._add_event(job_id, "started", {"attempt": job["attempts"]}, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def _recover_expired(self, now: float, max_attempts: int) -> None:
+        expired = self._conn.execute(
+            "SELECT id, attempts FROM jobs WHERE status = ? AND lease_expires_at < ?",
+            (RUNNING, now),
+        ).fetchall()
+        for job_id, attempts in expired:
+            if attempts >= max_attempts:
+                error = "Worker stopped responding"
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, error = ?, worker_id = NULL,"
+                    " finished_at = ? WHERE id = ?",
+                    (FAILED, FAILED, error, now, job_id),
+                )
+                self._add_event(job_id, "error", {"error": "JOB_LOST", "message": error}, now)
+                logger.warning(f"Job {job_id} failed: lease expired after {attempts} attempts")
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, worker_id = NULL WHERE id = ?",
+                    (QUEUED, QUEUED, job_id),
+                )
+                self._add_event(job_id, QUEUED, {"id": job_id, "retry": True}, now)
+                logger.warning(f"Re-queued job {job_id}: lease expired")
+
+    def renew(self, job_id: str, worker_id: str, lease: float) -> bool:
+        """Extend a running job's lease; False if the worker no longer holds it."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (time.time() + lease, job_id, worker_id, RUNNING),
+            )
+            return cursor.rowcount == 1
+
+    def add_event(self, job_id: str, event: str, data: Any) -> int:
+        """Record a progress event; it also becomes the job's current stage."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                seq = self._add_event(job_id, event, data, now)
+                self._conn.execute("UPDATE jobs SET stage = ? WHERE id = ?", (event, job_id))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return seq
+
+    def finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        result: Any = None,
+        error: Optional[Tuple[str, str]] = None,
+    ) -> bool:
+        """
+        Mark a job succeeded with result, or failed with error (code, message).
+
+        Returns:
+            False if the worker lost the job's lease in the meantime
+        """
+        now = time.time()
+        status = FAILED if error else SUCCEEDED
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, result = ?, error = ?,"
+                    " worker_id = NULL, lease_expires_at = NULL, finished_at = ?"
+                    " WHERE id = ? AND worker_id = ? AND status = ?",
+                    (status, status, None if error else json.dumps(result, default=str),
+                     error[1] if error else None, now, job_id, worker_id, RUNNING),
+                )
+                if cursor.rowcount == 1:
+                    if error:
+                        self._add_event(job_id, "error", {"error": error[0], "message": error[1]}, now)
+                    else:
+                        self._add_event(job_id, "done", {"id": job_id, "result": result}, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, worker_id: str) -> None:
+        """Put an interrupted job back in the queue without using up an attempt."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, attempts = attempts - 1,"
+                    " worker_id = NULL, lease_expires_at = NULL"
+                    " WHERE id = ? AND worker_id = ? AND status = ?",
+                    (QUEUED, QUEUED, job_id, worker_id, RUNNING),
+                )
+                if cursor.rowcount == 1:
+                    self._add_event(job_id, QUEUED, {"id": job_id, "retry": True}, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _get(self, job_id: str, payload: bool = False) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT seq, id, kind, user_id, status, stage, result, error, attempts,"
+            " created_at, started_at, finished_at, payload FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = {
+            "id": row[1],
+            "kind": row[2],
+            "user_id": row[3],
+            "status": row[4],
+            "stage": row[5],
+            "result": json.loads(row[6]) if row[6] is not None else None,
+            "error": row[7],
+            "attempts": row[8],
+            "created_at": _iso(row[9]),
+            "started_at": _iso(row[10]),
+            "finished_at": _iso(row[11]),
+        }
+        if payload:
+            job["payload"] = json.loads(row[12])
+        if job["status"] == QUEUED:
+            # Ahead in arrival order; fair scheduling may reorder across users
+            job["queued_ahead"] = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND seq < ?", (QUEUED, row[0])
+            ).fetchone()[0]
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job (without its payload), or None if unknown."""
+        with self._lock:
+            return self._get(job_id)
+
+    def events(self, job_id: str, after: int = 0) -> Tuple[Optional[str], List[Tuple[int, str, Any]]]:
+        """
+        Return the job's status and its events with seq greater than after.
+
+        Returns:
+            (status or None if the job is unknown, [(seq, event, data), ...])
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None, []
+            rows = self._conn.execute(
+                "SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after),
+            ).fetchall()
+        return row[0], [(seq, event, json.loads(data)) for seq, event, data in rows]
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs (and their events) finished before older_than."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM job_events WHERE job_id IN"
+                    " (SELECT id FROM jobs WHERE finished_at < ?)",
+                    (older_than,),
+                )
+                deleted = self._conn.execute(
+                    "DELETE FROM jobs WHERE finished_at < ?", (older_than,)
+                ).rowcount
+                self._conn.execute(
+                    "DELETE FROM job_users WHERE user_key NOT IN (SELECT user_key FROM jobs)"
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return deleted
+
+    def depth(self) -> Dict[str, Any]:
+        """Queue depth across every process sharing the database."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall())
+            users, max_per_user, oldest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(n), 0), MIN(oldest) FROM"
+                " (SELECT COUNT(*) AS n, MIN(created_at) AS oldest"
+                "  FROM jobs WHERE status = ? GROUP BY user_key)",
+                (QUEUED,),
+            ).fetchone()
+        return {
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "succeeded": counts.get(SUCCEEDED, 0),
+            "failed": counts.get(FAILED, 0),
+            "users_waiting": users,
+            "max_queued_per_user": max_per_user,
+            "oldest_queued_age_s": round(now - oldest, 3) if oldest is not None else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    Job queue with handlers by kind and a bounded pool of asyncio workers.
+
+    Example:
+        @job_queue.handler("layout.generate")
+        async def generate(job, emit):
+            await emit("brief", brief)
+            return design
+
+        job = await job_queue.submit("layout.generate", {"prompt": "..."}, user_id)
+        async for seq, event, data in job_queue.follow(job["id"]):
+            ...
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int,
+        lease: float,
+        max_attempts: int,
+        timeout: float,
+        poll_interval: float,
+        retention: float,
+        max_queued: int,
+        max_queued_per_user: int,
+    ):
+        self.path = path
+        self.workers = workers
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self._handlers: Dict[str, Handler] = {}
+        self._store: Optional[JobStore] = None
+        self._store_lock = threading.Lock()
+        # One thread: SQLite calls stay off the event loop and never contend in-process
+        self._io = BlockingIOExecutor(max_workers=1, name="job-store")
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._stopping = False
+        self._node = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._last_purge = 0.0
+        self._stats_lock = threading.Lock()
+        self.active = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.wait_time_total = 0.0
+        self.run_time_total = 0.0
+
+    @property
+    def store(self) -> JobStore:
+        """The job database, opened on first use."""
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = JobStore(self.path)
+        return self._store
+
+    def handler(self, kind: str) -> Callable[[Handler], Handler]:
+        """
+        Register the coroutine that runs jobs of one kind.
+
+        The handler is called as handler(job, emit) with the job (including
+        its payload) and an async emit(event, data) that records a progress
+        event; its return value becomes the job's result.
+        """
+        def register(func: Handler) -> Handler:
+            self._handlers[kind] = func
+            return func
+        return register
+
+    async def submit(self, kind: str, payload: Dict[str, Any], user_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Enqueue a job.
+
+        Args:
+            kind: Registered handler kind
+            payload: JSON-serializable job input
+            user_id: Owner, or None for anonymous jobs
+
+        Returns:
+            The queued job
+
+        Raises:
+            TooManyRequestsError: If the queue or the user's share of it is full
+        """
+        job = await self._io.run(
+            self.store.enqueue, kind, payload, user_id, self.max_queued, self.max_queued_per_user
+        )
+        with self._stats_lock:
+            self.submitted += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's current state, or None if unknown."""
+        return await self._io.run(self.store.get, job_id)
+
+    async def follow(self, job_id: str, after: int = 0) -> AsyncIterator[Tuple[int, str, Any]]:
+        """
+        Yield a job's events after seq, then new ones until it finishes.
+
+        Events from workers in this process arrive immediately; events from
+        other processes are picked up every JOBS_POLL_INTERVAL.
+        """
+        waiter = asyncio.Event()
+        self._waiters.setdefault(job_id, set()).add(waiter)
+        try:
+            while True:
+                waiter.clear()
+                status, events = await self._io.run(self.store.events, job_id, after)
+                if status is None:
+                    return
+                for seq, event, data in events:
+                    after = seq
+                    yield seq, event, data
+                    if event in TERMINAL_EVENTS:
+                        return
+                if status in (SUCCEEDED, FAILED):
+                    # Resumed after the final event
+                    return
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(waiter.wait(), self.poll_interval)
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[job_id]
+
+    def _notify(self, job_id: str) -> None:
+        for waiter in self._waiters.get(job_id, ()):
+            waiter.set()
+
+    # -- workers --------------------------------------------------------------
+
+    async def start(self, workers: Optional[int] = None) -> None:
+        """Start the worker pool (idempotent); workers=0 only serves the API."""
+        count = self.workers if workers is None else workers
+        if self._tasks or count <= 0:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._io.start()
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self._node}-{i}"), name=f"job-worker-{i}")
+            for i in range(count)
+        ]
+        logger.info(f"Started {count} job workers on {self.path}")
+
+    async def stop(self, grace: float = 10.0) -> None:
+        """
+        Stop the workers, letting running jobs finish for up to grace seconds.
+
+        Jobs still running afterwards are put back in the queue.
+        """
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        tasks, self._tasks = self._tasks, []
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.info("Stopped job workers")
+
+    def close(self) -> None:
+        """Release the store and its thread."""
+        self._io.shutdown()
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def run_forever(self, workers: Optional[int] = None) -> None:
+        """Run the worker pool until cancelled (for dedicated worker processes)."""
+        await self.start(workers)
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def _work(self, worker_id: str) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                job = await self._io.run(self.store.claim, worker_id, self.lease, self.max_attempts)
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} could not claim a job: {e}")
+                job = None
+            if job is None:
+                await self._idle()
+                continue
+            await self._execute(job, worker_id)
+
+    async def _idle(self) -> None:
+        now = time.time()
+        if now - self._last_purge > 600:
+            self._last_purge = now
+            try:
+                purged = await self._io.run(self.store.purge, now - self.retention)
+                if purged:
+                    logger.info(f"Purged {purged} finished jobs")
+            except Exception as e:
+                logger.warning(f"Could not purge finished jobs: {e}")
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+
+    async def _execute(self, job: Dict[str, Any], worker_id: str) -> None:
+        job_id = job["id"]
+        started = time.time()
+        waited = max(0.0, started - datetime.fromisoformat(job["created_at"]).timestamp())
+        with self._stats_lock:
+            self.active += 1
+
+        async def emit(event: str, data: Any) -> None:
+            await self._io.run(self.store.add_event, job_id, event, data)
+            self._notify(job_id)
+
+        self._notify(job_id)
+        result, error = None, None
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            error = ("UNKNOWN_JOB", f"No handler for job kind '{job['kind']}'")
+            run = None
+        else:
+            run = asyncio.create_task(asyncio.wait_for(handler(job, emit), self.timeout))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, worker_id, run))
+        try:
+            if run is not None:
+                result = await run
+        except asyncio.CancelledError:
+            heartbeat.cancel()
+            if asyncio.current_task().cancelling():
+                # Shutting down: hand the job to the next worker
+                await self._io.run(self.store.release, job_id, worker_id)
+                self._notify(job_id)
+                with self._stats_lock:
+                    self.active -= 1
+                raise
+            if self._lease_lost(heartbeat):
+                # Another worker has the job now; its outcome is theirs to record
+                logger.warning(f"Stopped job {job_id}: worker {worker_id} lost its lease")
+                with self._stats_lock:
+                    self.active -= 1
+                return
+            # The handler cancelled itself; the worker carries on
+            error = ("JOB_FAILED", "Job was cancelled")
+        except asyncio.TimeoutError:
+            error = ("JOB_TIMEOUT", f"Job did not finish within {self.timeout:g} seconds")
+        except Exception as e:
+            error = (getattr(e, "error_code", "JOB_FAILED"), getattr(e, "message", None) or str(e))
+        finally:
+            heartbeat.cancel()
+
+        if error:
+            logger.error(f"Job {job_id} ({job['kind']}) failed: {error[1]}")
+        try:
+            held = await self._io.run(self.store.finish, job_id, worker_id, result, error)
+            if not held:
+                logger.warning(f"Job {job_id} finished after its lease was lost; result dropped")
+        except Exception as e:
+            logger.error(f"Could not record the outcome of job {job_id}: {e}")
+        self._notify(job_id)
+        with self._stats_lock:
+            self.active -= 1
+            self.wait_time_total += waited
+            self.run_time_total += time.time() - started
+            if error:
+                self.failed += 1
+            else:
+                self.succeeded += 1
+
+    async def _heartbeat(self, job_id: str, worker_id: str, run: Optional[asyncio.Task]) -> bool:
+        """Renew the job's lease until cancelled; if it is lost, cancel run and return True."""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not await self._io.run(self.store.renew, job_id, worker_id, self.lease):
+                    logger.warning(f"Worker {worker_id} lost the lease on job {job_id}")
+                    if run is not None:
+                        run.cancel()
+                    return True
+            except Exception as e:
+                logger.warning(f"Could not renew the lease on job {job_id}: {e}")
+
+    @staticmethod
+    def _lease_lost(heartbeat: asyncio.Task) -> bool:
+        return heartbeat.done() and not heartbeat.cancelled() and heartbeat.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth plus this process's worker counters, for health checks."""
+        try:
+            depth = self.store.depth()
+        except sqlite3.Error as e:
+            depth = {"error": str(e)}
+        with self._stats_lock:
+            finished = self.succeeded + self.failed
+            return {
+                **depth,
+                "workers": len(self._tasks),
+                "active": self.active,
+                "submitted": self.submitted,
+                "completed": self.succeeded,
+                "errors": self.failed,
+                "wait_time_avg_ms": round(
+                    self.wait_time_total / finished * 1000, 3
+                ) if finished else 0.0,
+                "run_time_avg_ms": round(
+                    self.run_time_total / finished * 1000, 3
+                ) if finished else 0.0,
+            }
+
+
+# Singleton queue for background generations
+job_queue = JobQueue(
+    path=settings.JOBS_DB_PATH,
+    workers=settings.JOBS_WORKERS,
+    lease=settings.JOBS_LEASE_SECONDS,
+    max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    timeout=settings.JOBS_TIMEOUT,
+    poll_interval=settings.JOBS_POLL_INTERVAL,
+    retention=settings.JOBS_RETENTION,
+    max_queued=settings.JOBS_MAX_QUEUED,
+    max_queued_per_user=settings.JOBS_MAX_QUEUED_PER_USER,
+)
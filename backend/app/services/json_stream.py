@@ -0,0 +1,274 @@
+"""
+Incremental parsing of streamed layout JSON.
+
+Gemini streams a design as raw JSON text in arbitrary chunks, e.g.
+``{"objects":[{...},{...``. To render layers before the model finishes,
+ArrayElementStream tracks just enough JSON structure (strings, escapes,
+nesting, top-level keys) to recognize when an element of a top-level array
+such as ``objects`` (Fabric.js) or ``layers`` (CanonicalDesign) closes, and
+parses only that element. Each character is scanned once, so the cost per
+chunk is proportional to the chunk, not to everything received so far.
+
+LayoutElementStream adds validation against the Fabric or canonical layer
+models and an optional per-element repair step.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.core.logging import get_logger
+from app.schemas.ai_models import FabricCircleObject, FabricRectObject, FabricTextObject
+from app.schemas.canonical_design import Layer
+
+logger = get_logger(__name__)
+
+# Fabric.js object types and the models that validate them
+FABRIC_OBJECT_MODELS: Dict[str, Type[BaseModel]] = {
+    "text": FabricTextObject,
+    "textbox": FabricTextObject,
+    "i-text": FabricTextObject,
+    "rect": FabricRectObject,
+    "circle": FabricCircleObject,
+}
+
+_layer_adapter: TypeAdapter = TypeAdapter(Layer)
+
+
+class ArrayElementStream:
+    """
+    Yield completed elements of a top-level array while JSON text arrives.
+
+    Only object (``{...}``) and array elements are emitted; scalars are
+    skipped. Malformed elements are skipped rather than raised, since the
+    full document is parsed once the stream ends. Each element comes with
+    its position in the array, which counts skipped elements too.
+
+    Example:
+        stream = ArrayElementStream("objects")
+        for chunk in chunks:
+            for index, obj in stream.feed(chunk):
+                ...
+        design = json.loads(stream.text)
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self._chunks: List[str] = []
+        self._text: Optional[str] = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # Pieces of the string token or element currently being read
+        self._string: List[str] = []
+        self._element: List[str] = []
+        self._in_element = False
+        self._capturing = False
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        # Position in the target array of the next / current element
+        self._position = 0
+        self._element_position = 0
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        if self._text is None:
+            self._text = "".join(self._chunks)
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[int, Any]]:
+        """
+        Consume a chunk of JSON text.
+
+        Returns:
+            (position in the array, element) for each element of the target
+            array completed by this chunk, in order
+        """
+        if not chunk:
+            return []
+        self._chunks.append(chunk)
+        self._text = None
+
+        completed: List[Tuple[int, Any]] = []
+        # Start of the unread part of the current string/element in this chunk
+        string_from = 0 if self._capturing else None
+        element_from = 0 if self._in_element else None
+
+        for pos, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._capturing:
+                        self._string.append(chunk[string_from:pos])
+                        self._last_string = "".join(self._string)
+                        self._string.clear()
+                        self._capturing = False
+                        string_from = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._capturing = True
+                    string_from = pos + 1
+            elif ch == ":" and self._depth == 1:
+                self._current_key = self._last_string
+            elif ch in "{[":
+                if self._depth == self._array_depth and not self._in_element:
+                    self._in_element = True
+                    self._element_position = self._position
+                    element_from = pos
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._current_key == self.key and not self.done:
+                    self._array_depth = 2
+            elif ch in "}]":
+                self._depth -= 1
+                if self._array_depth is not None:
+                    if self._depth == self._array_depth and self._in_element:
+                        self._element.append(chunk[element_from:pos + 1])
+                        element = self._parse("".join(self._element))
+                        if element is not None:
+                            completed.append((self._element_position, element))
+                        self._element.clear()
+                        self._in_element = False
+                        element_from = None
+                    elif self._depth < self._array_depth:
+                        self._array_depth = None
+                        self.done = True
+            elif ch == "," and self._depth == 1:
+                self._current_key = None
+            elif ch == "," and self._depth == self._array_depth:
+                self._position += 1
+
+        # Carry unfinished tokens over to the next chunk
+        if string_from is not None:
+            self._string.append(chunk[string_from:])
+        if element_from is not None:
+            self._element.append(chunk[element_from:])
+        return completed
+
+    @staticmethod
+    def _parse(raw: str) -> Optional[Any]:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+
+class LayoutElementStream:
+    """
+    Validated, repaired layout elements from a streamed design.
+
+    Each completed element of the target array is validated, then repaired
+    (e.g. coordinates clamped to the canvas) before it is emitted. Elements
+    that fail validation are recorded in ``rejected`` instead of emitted.
+
+    Example:
+        stream = fabric_object_stream(repair=fix_coordinates)
+        for chunk in chunks:
+            for index, obj in stream.feed(chunk):
+                render(index, obj)
+    """
+
+    def __init__(
+        self,
+        key: str,
+        validate: Callable[[Dict[str, Any]], Dict[str, Any]],
+        repair: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ):
+        """
+        Args:
+            key: Top-level array to read ("objects" or "layers")
+            validate: Returns the validated element or raises ValueError
+            repair: Optional fix-up applied to each valid element
+        """
+        self.key = key
+        self.validate = validate
+        self.repair = repair
+        self.elements = ArrayElementStream(key)
+        self.rejected: List[Tuple[int, str]] = []
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return self.elements.text
+
+    @property
+    def done(self) -> bool:
+        """Whether the target array has closed."""
+        return self.elements.done
+
+    def feed(self, chunk: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Consume a chunk of JSON text.
+
+        Returns:
+            (index in the array, element) for each valid element completed
+            by this chunk
+        """
+        ready: List[Tuple[int, Dict[str, Any]]] = []
+        for index, element in self.elements.feed(chunk):
+            try:
+                if not isinstance(element, dict):
+                    raise ValueError(f"Expected an object, got {type(element).__name__}")
+                element = self.validate(element)
+            except ValueError as e:
+                # pydantic's ValidationError is a ValueError
+                self.rejected.append((index, str(e)))
+                logger.debug(f"Rejected streamed {self.key}[{index}]: {e}")
+                continue
+            if self.repair is not None:
+                element = self.repair(element)
+            ready.append((index, element))
+        return ready
+
+
+def validate_fabric_object(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a Fabric.js object against its type's model.
+
+    Fields the model does not know about are kept; missing optional fields
+    get the model defaults.
+
+    Raises:
+        ValueError: Unknown type or invalid fields
+    """
+    model = FABRIC_OBJECT_MODELS.get(obj.get("type", ""))
+    if model is None:
+        raise ValueError(f"Unsupported Fabric object type: {obj.get('type')!r}")
+    return {**obj, **model.model_validate(obj).model_dump()}
+
+
+def validate_canonical_layer(layer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a canonical layer (text, image, shape or group).
+
+    Raises:
+        ValueError: Invalid layer
+    """
+    try:
+        return _layer_adapter.validate_python(layer).model_dump(mode="json")
+    except ValidationError as e:
+        raise ValueError(str(e)) from e
+
+
+def fabric_object_stream(
+    repair: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> LayoutElementStream:
+    """Stream of validated objects from a Fabric.js design."""
+    return LayoutElementStream("objects", validate_fabric_object, repair)
+
+
+def canonical_layer_stream(
+    repair: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> LayoutElementStream:
+    """Stream of validated layers from a CanonicalDesign."""
+    return LayoutElementStream("layers", validate_canonical_layer, repair)
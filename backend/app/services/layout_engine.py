@@ -0,0 +1,587 @@
+"""
+Deterministic, rule-based layout engine.
+
+Turns a DesignBrief into a Fabric.js design without calling a model, in
+well under a millisecond. It is the fallback whenever Gemini is skipped or
+fails, and the whole pipeline of the "instant" generation mode.
+
+Layouts are built from a few rules rather than stored templates:
+    - the canvas comes from get_fabric_canvas_dimensions(format), with a
+      safe zone of SAFE_ZONE of the short side kept clear of text
+    - each layout_style has a template: text alignment, fonts, type scale,
+      background and decorative shapes anchored on rule-of-thirds lines
+    - text sizes follow a modular scale from the canvas size and shrink
+      until the text wraps into the lines allowed for it
+    - text colors are checked against what they sit on and replaced by
+      black or white below a 4.5:1 contrast ratio
+"""
+
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.schemas.ai_models import get_fabric_canvas_dimensions
+
+FABRIC_VERSION = "5.3.0"
+
+# Safe zone margin as a fraction of the canvas' short side
+SAFE_ZONE = 0.06
+
+# Minimum font sizes from the ad-creative constraints
+MIN_HEADLINE_SIZE = 24
+MIN_BODY_SIZE = 14
+
+LINE_HEIGHT = 1.16
+
+DEFAULT_COLORS = {"primary": "#3b82f6", "secondary": "#1e293b", "accent": "#64748b"}
+
+# visual_focus words that call for space reserved for an image
+MEDIA_FOCUS = ("product", "image", "imagery", "photo", "person", "people", "model", "food")
+
+_HEX_COLOR = re.compile(r"^#(?:[0-9a-fA-F]{3}){1,2}$")
+
+# Average glyph width as a fraction of the font size, by font weight
+_CHAR_WIDTH = {"normal": 0.5, "bold": 0.56}
+
+# Per layout_style: fonts, headline size (fraction of the short side),
+# subheadline/headline ratio, alignment, line limits and case
+STYLES: Dict[str, Dict[str, Any]] = {
+    "modern": {
+        "font": "Helvetica", "weight": "bold", "scale": 0.09, "ratio": 0.45,
+        "align": "left", "lines": 3, "upper": False,
+    },
+    "minimal": {
+        "font": "Arial", "weight": "normal", "scale": 0.07, "ratio": 0.5,
+        "align": "center", "lines": 2, "upper": False,
+    },
+    "bold": {
+        "font": "Impact", "weight": "bold", "scale": 0.12, "ratio": 0.38,
+        "align": "center", "lines": 3, "upper": True,
+    },
+    "elegant": {
+        "font": "Georgia", "weight": "normal", "scale": 0.08, "ratio": 0.5,
+        "align": "center", "lines": 3, "upper": False,
+    },
+    "playful": {
+        "font": "Trebuchet MS", "weight": "bold", "scale": 0.095, "ratio": 0.45,
+        "align": "center", "lines": 3, "upper": False,
+    },
+}
+
+# Unknown styles are matched by keyword, then fall back to modern
+_STYLE_SYNONYMS = {
+    "clean": "minimal", "simple": "minimal", "minimalist": "minimal",
+    "luxury": "elegant", "classic": "elegant", "sophisticated": "elegant", "premium": "elegant",
+    "fun": "playful", "vibrant": "playful", "colorful": "playful", "colourful": "playful",
+    "loud": "bold", "strong": "bold", "impactful": "bold", "energetic": "bold",
+    "contemporary": "modern", "sleek": "modern", "corporate": "modern", "professional": "modern",
+}
+
+
+def resolve_style(layout_style: Optional[str]) -> str:
+    """Map a free-form layout_style ("Modern & minimal") to a template name."""
+    words = re.findall(r"[a-z]+", (layout_style or "").lower())
+    for word in words:
+        if word in STYLES:
+            return word
+    for word in words:
+        if word in _STYLE_SYNONYMS:
+            return _STYLE_SYNONYMS[word]
+    return "modern"
+
+
+# ============================================================================
+# COLOR
+# ============================================================================
+
+def _hex(color: Any, default: str) -> str:
+    if isinstance(color, str) and _HEX_COLOR.match(color.strip()):
+        color = color.strip()
+        if len(color) == 4:
+            color = "#" + "".join(c * 2 for c in color[1:])
+        return color.lower()
+    return default
+
+
+def _luminance(color: str) -> float:
+    channels = []
+    for i in (1, 3, 5):
+        c = int(color[i:i + 2], 16) / 255
+        channels.append(c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4)
+    return 0.2126 * channels[0] + 0.7152 * channels[1] + 0.0722 * channels[2]
+
+
+def contrast_ratio(a: str, b: str) -> float:
+    """WCAG contrast ratio between two #rrggbb colors."""
+    la, lb = _luminance(a), _luminance(b)
+    return (max(la, lb) + 0.05) / (min(la, lb) + 0.05)
+
+
+def _readable(color: str, backgrounds: List[str], minimum: float = 4.5) -> str:
+    """color if it reads on every background, else near-black or white."""
+    if min(contrast_ratio(color, bg) for bg in backgrounds) >= minimum:
+        return color
+    dark, light = "#111111", "#ffffff"
+    dark_worst = min(contrast_ratio(dark, bg) for bg in backgrounds)
+    light_worst = min(contrast_ratio(light, bg) for bg in backgrounds)
+    return dark if dark_worst >= light_worst else light
+
+
+def _tint(color: str, amount: float) -> str:
+    """Mix color with white (amount 0..1 of white)."""
+    rgb = [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(c + (255 - c) * amount):02x}" for c in rgb)
+
+
+# ============================================================================
+# TEXT
+# ============================================================================
+
+def _wrap_lines(text: str, font_size: float, width: float, weight: str) -> int:
+    """Lines text wraps into at font_size in a box width pixels wide."""
+    char_width = font_size * _CHAR_WIDTH[weight]
+    max_chars = max(1, int(width / char_width))
+    lines, used = 1, 0
+    for word in text.split():
+        length = len(word)
+        if used == 0:
+            used = length
+        elif used + 1 + length <= max_chars:
+            used += 1 + length
+        else:
+            lines += 1
+            used = length
+        # Words longer than a line break mid-word
+        while used > max_chars:
+            lines += 1
+            used -= max_chars
+    return lines
+
+
+def _fit_text(
+    text: str,
+    font_size: float,
+    width: float,
+    max_lines: int,
+    min_size: float,
+    weight: str,
+) -> Tuple[int, int]:
+    """Shrink font_size until text fits in max_lines; returns (size, lines)."""
+    size = max(font_size, min_size)
+    lines = _wrap_lines(text, size, width, weight)
+    while lines > max_lines and size > min_size:
+        size = max(min_size, size * 0.9)
+        lines = _wrap_lines(text, size, width, weight)
+    return round(size), lines
+
+
+def _text(
+    text: str,
+    left: float,
+    top: float,
+    width: float,
+    font_size: int,
+    lines: int,
+    font: str,
+    weight: str,
+    fill: str,
+    align: str,
+) -> Dict[str, Any]:
+    return {
+        "type": "textbox",
+        "left": round(left),
+        "top": round(top),
+        "width": round(width),
+        "height": round(lines * font_size * LINE_HEIGHT),
+        "text": text,
+        "fontSize": font_size,
+        "fontFamily": font,
+        "fontWeight": weight,
+        "lineHeight": LINE_HEIGHT,
+        "fill": fill,
+        "textAlign": align,
+        "originX": "left",
+        "originY": "top",
+        "angle": 0,
+        "opacity": 1,
+    }
+
+
+# ============================================================================
+# SHAPES
+# ============================================================================
+
+def _rect(
+    left: float,
+    top: float,
+    width: float,
+    height: float,
+    fill: str,
+    radius: float = 0,
+    opacity: float = 1,
+    stroke: Optional[str] = None,
+    stroke_width: float = 0,
+    angle: float = 0,
+) -> Dict[str, Any]:
+    return {
+        "type": "rect",
+        "left": round(left),
+        "top": round(top),
+        "width": round(width),
+        "height": round(height),
+        "fill": fill,
+        "stroke": stroke,
+        "strokeWidth": stroke_width,
+        "angle": angle,
+        "opacity": opacity,
+        "rx": round(radius),
+        "ry": round(radius),
+    }
+
+
+def _circle(cx: float, cy: float, radius: float, fill: str, opacity: float = 1) -> Dict[str, Any]:
+    return {
+        "type": "circle",
+        "left": round(cx - radius),
+        "top": round(cy - radius),
+        "radius": round(radius),
+        "fill": fill,
+        "stroke": None,
+        "strokeWidth": 0,
+        "angle": 0,
+        "opacity": opacity,
+    }
+
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+#
+# A template receives the layout frame (canvas, safe zone, thirds, colors)
+# and returns (background color, decorative shapes, colors the text may sit
+# on, text region). The engine then places the text inside the region.
+
+Frame = Dict[str, Any]
+Region = Tuple[float, float, float, float]  # left, top, width, height
+TemplateResult = Tuple[str, List[Dict[str, Any]], List[str], Region]
+Template = Callable[[Frame], TemplateResult]
+
+
+def _modern(f: Frame) -> TemplateResult:
+    w, h, m, c = f["width"], f["height"], f["margin"], f["colors"]
+    background = "#ffffff"
+    if f["orientation"] == "landscape":
+        # Color block over the right third, accent dot on its edge
+        shapes = [
+            _rect(f["x2"], 0, w - f["x2"], h, c["primary"]),
+            _circle(f["x2"], f["y2"], m * 0.9, c["accent"]),
+        ]
+        region = (m, m, f["x2"] - 2 * m, h - 2 * m)
+    else:
+        # Color band under the lower third line, accent bar above the text
+        shapes = [
+            _rect(0, f["y2"], w, h - f["y2"], c["primary"]),
+            _rect(m, m, w * 0.18, max(6, m * 0.15), c["accent"]),
+        ]
+        region = (m, m * 1.6, w - 2 * m, f["y2"] - m * 2.2)
+    return background, shapes, [background], region
+
+
+def _minimal(f: Frame) -> TemplateResult:
+    w, h, m, c = f["width"], f["height"], f["margin"], f["colors"]
+    background = "#fafafa"
+    rule = max(2, round(min(w, h) * 0.004))
+    shapes = [_rect(w / 2 - w * 0.06, f["y2"], w * 0.12, rule, c["accent"])]
+    region = (m * 1.5, f["y1"] - m, w - 3 * m, f["y2"] - f["y1"])
+    return background, shapes, [background], region
+
+
+def _bold(f: Frame) -> TemplateResult:
+    w, h, m, c = f["width"], f["height"], f["margin"], f["colors"]
+    background = c["primary"]
+    short = min(w, h)
+    radius = short * 0.3
+    shapes = [
+        # Oversized accent circle around the top-right thirds point, kept
+        # inside the canvas so mirrored variants stay in bounds too
+        _circle(min(f["x2"] + short * 0.1, w - radius), max(f["y1"] - short * 0.05, radius),
+                radius, c["accent"], 0.85),
+        _rect(0, h - m * 0.5, w, m * 0.5, c["secondary"]),
+    ]
+    region = (m, m, w - 2 * m, h - 2.5 * m)
+    return background, shapes, [background, c["accent"]], region
+
+
+def _elegant(f: Frame) -> TemplateResult:
+    w, h, m, c = f["width"], f["height"], f["margin"], f["colors"]
+    background = "#faf7f2"
+    border = max(2, round(min(w, h) * 0.003))
+    shapes = [
+        # Thin frame inside the safe zone and a short rule under the text
+        _rect(m * 0.6, m * 0.6, w - m * 1.2, h - m * 1.2, "transparent",
+              stroke=c["accent"], stroke_width=border),
+        _rect(w / 2 - w * 0.04, f["y2"] + m * 0.3, w * 0.08, border, c["accent"]),
+    ]
+    region = (m * 1.6, f["y1"] - m * 0.5, w - 3.2 * m, f["y2"] - f["y1"] + m * 0.5)
+    return background, shapes, [background], region
+
+
+def _playful(f: Frame) -> TemplateResult:
+    w, h, m, c = f["width"], f["height"], f["margin"], f["colors"]
+    background = _tint(c["primary"], 0.85)
+    short = min(w, h)
+    shapes = [
+        _circle(f["x1"] * 0.5, f["y1"] * 0.6, short * 0.12, c["primary"], 0.9),
+        _circle(w - f["x1"] * 0.4, f["y2"], short * 0.09, c["accent"], 0.9),
+        _rect(f["x2"] - short * 0.05, h - m - short * 0.12, short * 0.14, short * 0.14,
+              c["secondary"], radius=short * 0.03, opacity=0.85, angle=12),
+    ]
+    region = (m * 1.5, f["y1"] - m * 0.5, w - 3 * m, f["y2"] - f["y1"] + m)
+    return background, shapes, [background, c["primary"], c["accent"]], region
+
+
+TEMPLATES: Dict[str, Template] = {
+    "modern": _modern,
+    "minimal": _minimal,
+    "bold": _bold,
+    "elegant": _elegant,
+    "playful": _playful,
+}
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+
+class LayoutEngine:
+    """
+    Rule-based DesignBrief to Fabric.js layout.
+
+    Example:
+        design = layout_engine.layout(brief)
+        designs = layout_engine.layout_many(briefs)
+        alternatives = [layout_engine.layout(brief, variant=i) for i in range(4)]
+    """
+
+    def layout(self, brief: Dict[str, Any], variant: int = 0) -> Dict[str, Any]:
+        """
+        Build a Fabric.js design for a brief.
+
+        Args:
+            brief: Design brief (headline, subheadline, layout_style,
+                color_scheme, visual_focus, format); missing fields get defaults
+            variant: Alternative arrangement; odd variants are mirrored and
+                variants 2-3 swap the primary and accent colors
+
+        Returns:
+            Fabric.js compatible design JSON
+        """
+        dimensions = get_fabric_canvas_dimensions(brief.get("format") or "instagram_post")
+        width, height = dimensions["width"], dimensions["height"]
+        style_name = resolve_style(brief.get("layout_style"))
+        style = STYLES[style_name]
+
+        scheme = brief.get("color_scheme") or {}
+        colors = {role: _hex(scheme.get(role), default) for role, default in DEFAULT_COLORS.items()}
+        if variant % 4 >= 2:
+            colors["primary"], colors["accent"] = colors["accent"], colors["primary"]
+
+        ratio = width / height
+        orientation = "landscape" if ratio >= 1.4 else "portrait" if ratio <= 0.75 else "square"
+        margin = round(min(width, height) * SAFE_ZONE)
+        frame = {
+            "width": width, "height": height, "margin": margin, "orientation": orientation,
+            "x1": width / 3, "x2": width * 2 / 3, "y1": height / 3, "y2": height * 2 / 3,
+            "colors": colors,
+        }
+
+        background, shapes, text_backgrounds, region = TEMPLATES[style_name](frame)
+
+        focus = " ".join(brief.get("visual_focus") or []).lower()
+        objects = list(shapes)
+        if any(word in focus for word in MEDIA_FOCUS):
+            region, media = self._split_for_media(region, orientation, margin)
+            # Placeholder where the product or photo goes
+            objects.append(_rect(*media, _tint(colors["secondary"], 0.9),
+                                 radius=margin * 0.3, opacity=0.9))
+
+        text_scale = 1.15 if "text" in focus or "typography" in focus else 1.0
+        objects.extend(self._text_block(brief, style, region, width, height,
+                                        text_scale, colors, text_backgrounds))
+
+        if variant % 2:
+            objects = [self._mirror(obj, width) for obj in objects]
+
+        return {
+            "version": FABRIC_VERSION,
+            "objects": objects,
+            "background": background,
+            "width": width,
+            "height": height,
+        }
+
+    def layout_many(self, briefs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Lay out many briefs (e.g. in batch jobs)."""
+        return [self.layout(brief) for brief in briefs]
+
+    @staticmethod
+    def _split_for_media(region: Region, orientation: str, margin: float) -> Tuple[Region, Region]:
+        """Split a text region into (text, media) halves."""
+        left, top, width, height = region
+        if orientation == "landscape":
+            text_width = width * 0.58
+            media = (left + text_width + margin, top, width - text_width - margin, height)
+            return (left, top, text_width, height), media
+        text_height = height * (0.45 if orientation == "portrait" else 0.5)
+        media = (left, top + text_height + margin * 0.5, width, height - text_height - margin * 0.5)
+        return (left, top, width, text_height), media
+
+    @staticmethod
+    def _text_block(
+        brief: Dict[str, Any],
+        style: Dict[str, Any],
+        region: Region,
+        width: int,
+        height: int,
+        text_scale: float,
+        colors: Dict[str, str],
+        text_backgrounds: List[str],
+    ) -> List[Dict[str, Any]]:
+        """Headline and subheadline fitted into region and centered in it vertically."""
+        left, top, box_width, box_height = region
+        headline = str(brief.get("headline") or "").strip() or "Your Headline Here"
+        subheadline = str(brief.get("subheadline") or "").strip()
+        if style["upper"]:
+            headline = headline.upper()
+
+        short = min(width, height)
+        start_size = short * style["scale"] * text_scale
+        while True:
+            headline_size, headline_lines = _fit_text(
+                headline, start_size, box_width,
+                style["lines"], MIN_HEADLINE_SIZE, style["weight"],
+            )
+            headline_height = headline_lines * headline_size * LINE_HEIGHT
+
+            sub_size = sub_lines = 0
+            gap = 0.0
+            if subheadline:
+                sub_size, sub_lines = _fit_text(
+                    subheadline, max(MIN_BODY_SIZE, headline_size * style["ratio"]), box_width,
+                    3, MIN_BODY_SIZE, "normal",
+                )
+                gap = headline_size * 0.5
+            total = headline_height + gap + sub_lines * sub_size * LINE_HEIGHT
+            # Too tall for the region: step the type scale down
+            if total <= box_height or headline_size <= MIN_HEADLINE_SIZE:
+                break
+            start_size = headline_size * 0.9
+
+        # Center the block in the region, but never above its top
+        y = top + max(0.0, (box_height - total) / 2)
+        headline_fill = _readable(colors["secondary"], text_backgrounds)
+        objects = [_text(headline, left, y, box_width, headline_size, headline_lines,
+                         style["font"], style["weight"], headline_fill, style["align"])]
+        if subheadline:
+            sub_fill = _readable(colors["accent"], text_backgrounds)
+            objects.append(_text(subheadline, left, y + headline_height + gap, box_width,
+                                 sub_size, sub_lines, style["font"], "normal", sub_fill,
+                                 style["align"]))
+        return objects
+
+    @staticmethod
+    def _mirror(obj: Dict[str, Any], width: int) -> Dict[str, Any]:
+        """Flip an object horizontally across the canvas."""
+        extent = obj["radius"] * 2 if obj["type"] == "circle" else obj["width"]
+        obj["left"] = round(width - obj["left"] - extent)
+        if obj.get("angle"):
+            obj["angle"] = -obj["angle"]
+        align = obj.get("textAlign")
+        if align in ("left", "right"):
+            obj["textAlign"] = "right" if align == "left" else "left"
+        return obj
+
+
+layout_engine = LayoutEngine()
+
+
+# ============================================================================
+# INSTANT BRIEFS
+# ============================================================================
+
+_STYLE_PALETTES = {
+    "modern": {"primary": "#2563eb", "secondary": "#0f172a", "accent": "#f59e0b"},
+    "minimal": {"primary": "#e5e7eb", "secondary": "#111827", "accent": "#6b7280"},
+    "bold": {"primary": "#dc2626", "secondary": "#111111", "accent": "#facc15"},
+    "elegant": {"primary": "#1f2937", "secondary": "#1c1917", "accent": "#b08d57"},
+    "playful": {"primary": "#ec4899", "secondary": "#312e81", "accent": "#22d3ee"},
+}
+
+_CLAUSE_BREAK = re.compile(r"[.!?;:\n]|\s[-–—]\s")
+# Request phrasing that is not ad copy: "please create", "can you make me", ...
+_REQUEST_LEAD_IN = re.compile(
+    r"^(?:please\s+|(?:can|could|would|will)\s+you\s+|i\s+(?:want|need|would\s+like)(?:\s+to)?\s+"
+    r"|help\s+me\s+(?:to\s+)?)*"
+    r"(?:create|make|design|generate|build|produce|draft|write|give)\b\s*(?:me\s+|us\s+)?",
+    re.IGNORECASE,
+)
+_MEDIUMS = (
+    r"(?:post|ad|advert|advertisement|banner|flyer|poster|story|graphic|creative|design|image|"
+    r"thumbnail|cover|header|promo)s?"
+)
+# "a bold instagram post for", "an ad about", "a banner with the text", ...
+_MEDIUM_PHRASE = re.compile(
+    r"^(?:(?:a|an|the|some)\s+)?(?:[\w'&-]+\s+){0,4}?" + _MEDIUMS +
+    r"(?:\s+design)?"
+    r"(?:\s+(?:with\s+(?:the\s+)?(?:text|words|headline)|that\s+says|saying|for|about|announcing"
+    r"|promoting|advertising|on|of|with))?(?=\s|$)\s*",
+    re.IGNORECASE,
+)
+_LEADING_ARTICLE = re.compile(r"^(?:a|an|the)\s+", re.IGNORECASE)
+# "summer sale poster design" -> "summer sale"
+_TRAILING_MEDIUM = re.compile(r"\s+" + _MEDIUMS + r"\s+design$", re.IGNORECASE)
+
+
+def _strip_request_phrasing(clause: str) -> str:
+    """
+    Drop the request around the ad copy, e.g. "Create an Instagram post for
+    our summer sale" -> "our summer sale", "Summer sale poster design" ->
+    "Summer sale". Empty when the clause is only a request ("Design a
+    poster").
+    """
+    lead_in = _REQUEST_LEAD_IN.match(clause)
+    rest = clause[lead_in.end():] if lead_in else clause
+    medium = _MEDIUM_PHRASE.match(rest)
+    if medium is not None and (lead_in is not None or _LEADING_ARTICLE.match(rest)):
+        rest = _LEADING_ARTICLE.sub("", rest[medium.end():], count=1)
+    # Otherwise there is no "<article> ... post for" to drop: the copy is as written
+    return _TRAILING_MEDIUM.sub("", rest)
+
+
+def brief_from_prompt(prompt: str, format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Derive a design brief from a prompt without a model.
+
+    The first clause, up to six words, becomes the headline; up to twelve
+    following words become the subheadline. Request phrasing such as
+    "create an Instagram post for" is left out of the headline. The style
+    is taken from style words in the prompt and the palette from the style.
+    """
+    text = unicodedata.normalize("NFKC", prompt).strip()
+    clauses = [c.strip(" ,") for c in _CLAUSE_BREAK.split(text) if c.strip(" ,")]
+    words: List[str] = []
+    while clauses and not words:
+        # A clause that was only the request ("Design a poster.") gives no copy
+        words = _strip_request_phrasing(clauses.pop(0)).split()
+    headline_words, rest = words[:6], words[6:]
+    rest += " ".join(clauses).split()
+
+    style = resolve_style(prompt)
+    return {
+        "headline": " ".join(headline_words).title() if headline_words else "Your Headline Here",
+        "subheadline": " ".join(rest[:12]) or None,
+        "visual_focus": ["text"],
+        "layout_style": style,
+        "color_scheme": dict(_STYLE_PALETTES[style]),
+        "format": format or "instagram_post",
+    }
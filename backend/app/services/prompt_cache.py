@@ -0,0 +1,272 @@
+"""
+Provider-side caching of static prompt prefixes.
+
+The ad-creative system prompt is several KB of text that is identical on
+every request. PromptCache registers it once with the provider (Gemini
+cached content) and hands out the cache name, so each request sends only
+its own sections. The entry is refreshed before its TTL runs out and
+recreated if it disappears; whenever no handle is available, callers send
+the full prompt instead.
+
+Providers are pluggable: LocalPromptCacheProvider stands in for Gemini in
+tests and local development.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.gemini_client import GeminiClientPool, gemini_client_pool
+
+logger = get_logger(__name__)
+
+
+class PromptCacheProvider(Protocol):
+    """Storage for cached prompt prefixes (e.g. Gemini cached content)."""
+
+    async def create(self, model: str, content: str, ttl: float, display_name: str) -> str:
+        """Register content for model and return the cache name."""
+        ...
+
+    async def refresh(self, name: str, ttl: float) -> None:
+        """Extend the entry's lifetime to ttl seconds from now."""
+        ...
+
+    async def delete(self, name: str) -> None:
+        """Remove the entry."""
+        ...
+
+
+class GeminiPromptCacheProvider:
+    """Gemini context caching: the prefix is stored as a system instruction."""
+
+    def __init__(self, clients: Optional[GeminiClientPool] = None):
+        self.clients = clients or gemini_client_pool
+
+    async def create(self, model: str, content: str, ttl: float, display_name: str) -> str:
+        cached = await self.clients.client.aio.caches.create(
+            model=model,
+            config={
+                "system_instruction": content,
+                "ttl": f"{int(ttl)}s",
+                "display_name": display_name,
+            },
+        )
+        return cached.name
+
+    async def refresh(self, name: str, ttl: float) -> None:
+        await self.clients.client.aio.caches.update(name=name, config={"ttl": f"{int(ttl)}s"})
+
+    async def delete(self, name: str) -> None:
+        await self.clients.client.aio.caches.delete(name=name)
+
+
+class LocalPromptCacheProvider:
+    """
+    In-process stand-in for a provider cache, for tests and local runs.
+
+    Example:
+        provider = LocalPromptCacheProvider()
+        cache = PromptCache(provider, model="m", content=prefix, display_name="t")
+        name = await cache.handle()
+        provider.content(name)  # prefix
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, str, float]] = {}
+
+    async def create(self, model: str, content: str, ttl: float, display_name: str) -> str:
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        self._entries[name] = (model, content, time.monotonic() + ttl)
+        return name
+
+    async def refresh(self, name: str, ttl: float) -> None:
+        model, content, _ = self._lookup(name)
+        self._entries[name] = (model, content, time.monotonic() + ttl)
+
+    async def delete(self, name: str) -> None:
+        self._entries.pop(name, None)
+
+    def content(self, name: str) -> str:
+        """Cached text for name; raises KeyError if missing or expired."""
+        return self._lookup(name)[1]
+
+    def _lookup(self, name: str) -> Tuple[str, str, float]:
+        entry = self._entries.get(name)
+        if entry is None or entry[2] <= time.monotonic():
+            self._entries.pop(name, None)
+            raise KeyError(f"Cached content {name} not found")
+        return entry
+
+
+class PromptCache:
+    """
+    One static prompt prefix kept registered with a provider.
+
+    handle() returns the current cache name, creating or refreshing the
+    entry as needed, or None when the provider cannot be used right now.
+    After a failed create, no new attempt is made for retry_after seconds,
+    so an unsupported model or a prefix below the provider's minimum size
+    does not add a failing round trip to every request.
+    """
+
+    def __init__(
+        self,
+        provider: PromptCacheProvider,
+        model: str,
+        content: str,
+        display_name: str,
+        ttl: float = 3600,
+        refresh_margin: float = 300,
+        retry_after: float = 300,
+        timeout: float = 10,
+    ):
+        """
+        Args:
+            provider: Where the prefix is stored
+            model: Model the cached content is created for
+            content: Static prompt prefix
+            display_name: Label for the entry at the provider
+            ttl: Lifetime of the entry in seconds
+            refresh_margin: Refresh when less than this many seconds remain
+            retry_after: Seconds to wait after a failed create before retrying
+            timeout: Timeout for each provider call
+        """
+        self.provider = provider
+        self.model = model
+        self.content = content
+        self.display_name = display_name
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl / 2)
+        self.retry_after = retry_after
+        self.timeout = timeout
+        self._name: Optional[str] = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.creates = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    async def handle(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Name of the live cache entry, or None to send the full prompt.
+
+        Never raises: provider errors are logged and reported as None.
+
+        Args:
+            timeout: Most seconds to spend here, including waiting for a
+                create or refresh started by another request (default and
+                upper bound: the provider call timeout)
+        """
+        if self._name is not None and time.monotonic() < self._expires_at - self.refresh_margin:
+            self.hits += 1
+            return self._name
+
+        limit = self.timeout if timeout is None else min(timeout, self.timeout)
+        try:
+            async with asyncio.timeout(limit), self._lock:
+                now = time.monotonic()
+                if self._name is not None and now < self._expires_at - self.refresh_margin:
+                    self.hits += 1
+                    return self._name
+                if self._name is not None and now >= self._expires_at:
+                    # Already expired at the provider
+                    self._name = None
+                if self._name is not None:
+                    await self._refresh()
+                if self._name is None and now >= self._retry_at:
+                    await self._create()
+        except TimeoutError:
+            # Out of time for this request; the next one tries again
+            logger.warning(f"No cached prompt '{self.display_name}' within {limit:.1f}s")
+
+        if self._name is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._name
+
+    async def _create(self) -> None:
+        try:
+            name = await asyncio.wait_for(
+                self.provider.create(self.model, self.content, self.ttl, self.display_name),
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            self.failures += 1
+            self._retry_at = time.monotonic() + self.retry_after
+            logger.warning(
+                f"Could not cache prompt prefix '{self.display_name}', "
+                f"sending full prompts for {self.retry_after}s: {type(e).__name__}: {e}"
+            )
+            return
+        self.creates += 1
+        self._name = name
+        self._expires_at = time.monotonic() + self.ttl
+        logger.info(f"Cached prompt prefix '{self.display_name}' as {name}")
+
+    async def _refresh(self) -> None:
+        try:
+            await asyncio.wait_for(self.provider.refresh(self._name, self.ttl), timeout=self.timeout)
+        except Exception as e:
+            # Gone or unreachable: recreate it rather than trust the old name
+            logger.warning(f"Could not refresh cached prompt {self._name}: {type(e).__name__}: {e}")
+            self._name = None
+            return
+        self.refreshes += 1
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self, name: str) -> None:
+        """Forget name after the provider rejected it; the next handle() recreates it."""
+        if self._name == name:
+            logger.warning(f"Cached prompt {name} rejected by provider, recreating on next use")
+            self._name = None
+
+    async def close(self) -> None:
+        """Delete the entry at the provider (best effort)."""
+        name, self._name = self._name, None
+        if name is None:
+            return
+        try:
+            await asyncio.wait_for(self.provider.delete(name), timeout=self.timeout)
+            logger.info(f"Deleted cached prompt {name}")
+        except Exception as e:
+            logger.warning(f"Could not delete cached prompt {name}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache use."""
+        return {
+            "active": self._name is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "creates": self.creates,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
+
+
+def is_cache_rejected_error(error: BaseException) -> bool:
+    """Whether a generation error means the cached content name is no longer valid."""
+    code = getattr(error, "code", None)
+    return code in (400, 403, 404) and "cache" in str(error).lower()
+
+
+def create_prompt_cache(content: str, display_name: str) -> Optional[PromptCache]:
+    """Build a Gemini-backed PromptCache, or None if GEMINI_PROMPT_CACHE is off."""
+    if not settings.GEMINI_PROMPT_CACHE or not gemini_client_pool.is_configured:
+        return None
+    return PromptCache(
+        GeminiPromptCacheProvider(gemini_client_pool),
+        model=settings.GEMINI_MODEL_NAME,
+        content=content,
+        display_name=display_name,
+        ttl=settings.GEMINI_PROMPT_CACHE_TTL,
+        refresh_margin=settings.GEMINI_PROMPT_CACHE_REFRESH_MARGIN,
+        timeout=settings.GEMINI_TIMEOUT,
+    )
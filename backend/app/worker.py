@@ -0,0 +1,52 @@
+"""
+Dedicated background job worker process.
+
+Runs queued jobs (e.g. POST /ai/layout/jobs generations) outside the API
+processes, sharing their SQLite job queue (JOBS_DB_PATH) on the same host.
+Start as many as needed; with JOBS_WORKERS=0 the API only queues jobs.
+
+Usage:
+    cd backend
+    uv run python -m app.worker [workers]
+"""
+
+import asyncio
+import sys
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.executor import db_executor
+from app.db.repositories import brand_repository
+from app.db.supabase import supabase_pool
+from app.services.canonical_layout_generator import canonical_layout_generator
+from app.services.gemini_client import gemini_client_pool
+from app.services.job_queue import job_queue
+
+# Registers the job handlers
+import app.services.generation_jobs  # noqa: F401
+
+
+async def main(workers: int) -> None:
+    if settings.SUPABASE_URL and settings.SUPABASE_KEY:
+        supabase_pool.open()
+    else:
+        logger.warning("Supabase not configured, skipping client pool setup")
+    db_executor.start()
+    try:
+        await job_queue.run_forever(workers)
+    finally:
+        await brand_repository.close()
+        await canonical_layout_generator.close()
+        await gemini_client_pool.close()
+        job_queue.close()
+        db_executor.shutdown()
+        supabase_pool.close()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else max(settings.JOBS_WORKERS, 1)
+    logger.info(f"Starting job worker with {count} workers")
+    try:
+        asyncio.run(main(count))
+    except KeyboardInterrupt:
+        logger.info("Job worker stopped")
@@ -0,0 +1,109 @@
+"""
+Benchmark the Canonical <-> Fabric.js converter on a large design.
+
+Builds one CanonicalDesign with many layers (text, images, every shape
+type and groups), converts it both ways and checks that the round trip
+gives back the same layers.
+
+Usage:
+    cd backend
+    uv run python misc_tests/benchmark_fabric_converter.py [layers]
+"""
+
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.schemas.canonical_design import CanonicalDesign
+from app.services.fabric_converter import fabric_converter
+
+SHAPES = ("rectangle", "circle", "ellipse", "line", "polygon")
+
+
+def make_design(count: int, rng: random.Random) -> CanonicalDesign:
+    """A 1080x1080 design with count layers; every tenth layer groups the next two."""
+    layers = []
+    z = 0
+    while len(layers) < count:
+        position = {
+            "x": rng.uniform(0, 900), "y": rng.uniform(0, 900),
+            "width": rng.uniform(20, 400), "height": rng.uniform(20, 300),
+            "rotation": rng.choice((0, 0, 15)), "z_index": z,
+        }
+        layer = {"id": f"layer_{z}", "name": f"Layer {z}", "position": position}
+        kind = z % 10
+        if kind == 0 and len(layers) + 3 <= count:
+            layer.update(type="group", children=[f"layer_{z + 1}", f"layer_{z + 2}"])
+        elif kind in (1, 4, 7):
+            layer.update(type="text", text={
+                "content": "Sample text", "font_family": "Inter",
+                "font_size": rng.uniform(12, 96), "letter_spacing": rng.choice((0, 1.5)),
+                "color": "#111111",
+            }, effects={"opacity": 0.9, "shadow": {
+                "offset_x": 2, "offset_y": 2, "blur": 4, "color": "#000000", "opacity": 0.4,
+            }})
+        elif kind in (2, 5):
+            layer.update(type="image", image={
+                "role": "product", "url": f"https://cdn.example.com/{z}.png", "fit": "cover",
+            })
+        else:
+            layer.update(type="shape", shape={
+                "shape_type": SHAPES[z % len(SHAPES)], "fill": "#3b82f6", "border_radius": 4,
+            })
+        layers.append(layer)
+        z += 1
+    return CanonicalDesign.model_validate({
+        "id": "benchmark", "owner_id": "benchmark", "title": "Benchmark",
+        "format": "instagram_post", "canvas": {"width": 1080, "height": 1080},
+        "background": {"type": "color", "color": "#ffffff"},
+        "metadata": {"source": "manual"}, "layers": layers,
+    })
+
+
+def same(a, b) -> bool:
+    """Deep equality, with floats compared to 1e-9 (group members are offset and back)."""
+    if isinstance(a, float) or isinstance(b, float):
+        return isinstance(a, (int, float)) and isinstance(b, (int, float)) and math.isclose(
+            a, b, rel_tol=1e-9, abs_tol=1e-9
+        )
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def best_of(label: str, func, runs: int = 5):
+    times = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    print(f"  {label:<44} {min(times) * 1000:>8.1f} ms")
+    return result, min(times)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    design = make_design(count, random.Random(7))
+    as_dict = design.model_dump(mode="json")
+    print(f"{len(design.layers)} layers")
+
+    fabric, _ = best_of("to_fabric (CanonicalDesign)", lambda: fabric_converter.to_fabric(design))
+    best_of("to_fabric (canonical dict)", lambda: fabric_converter.to_fabric(as_dict))
+    best_of("to_canonical_dict", lambda: fabric_converter.to_canonical_dict(fabric))
+    back, _ = best_of("to_canonical (validated once)", lambda: fabric_converter.to_canonical(fabric))
+
+    original = {layer["id"]: layer for layer in as_dict["layers"]}
+    restored = {layer["id"]: layer for layer in back.model_dump(mode="json")["layers"]}
+    print(f"\n  round trip identical: {same(original, restored)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark batch geometry validation against the per-object loops.
+
+Compares, on the same randomly generated designs:
+    - CanonicalLayoutGenerator._validate_design, one design at a time
+      (canvas clamp of x/y and min_font_size only)
+    - a per-layer Python loop doing the same checks as GeometryValidator
+    - GeometryValidator.validate over all designs at once
+and then revalidation under several safe zone margins (a constraint
+change), where the validator reads the models only once.
+
+Usage:
+    cd backend
+    uv run python misc_tests/benchmark_geometry_validator.py [designs] [layers]
+"""
+
+import gc
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from app.schemas.canonical_design import CanonicalDesign, DesignConstraints
+from app.services.canonical_layout_generator import canonical_layout_generator
+from app.services.geometry_validator import geometry_validator
+
+
+def make_design(index: int, layers: int, rng: random.Random) -> CanonicalDesign:
+    """A 1080x1080 design with random layers, about one in ten misplaced."""
+    items = [{
+        "id": "background", "type": "image", "name": "background",
+        "position": {"x": 0, "y": 0, "width": 1080, "height": 1080, "z_index": 0},
+        "image": {"role": "background"},
+    }]
+    for z in range(1, layers):
+        kind = ("text", "image", "shape")[z % 3]
+        width, height = rng.uniform(50, 500), rng.uniform(30, 300)
+        misplaced = rng.random() < 0.1
+        position = {
+            "x": rng.uniform(-100, 1100) if misplaced else rng.uniform(60, 1020 - width),
+            "y": rng.uniform(-100, 1100) if misplaced else rng.uniform(60, 1020 - height),
+            "width": width, "height": height,
+            "rotation": 15 if misplaced and z % 2 else 0, "z_index": z,
+        }
+        item = {"id": f"layer_{z}", "type": kind, "name": kind, "position": position}
+        if kind == "text":
+            item["text"] = {
+                "content": "Text", "font_family": "Inter",
+                "font_size": rng.uniform(6, 11) if misplaced else rng.uniform(12, 96), "color": "#000000",
+            }
+        elif kind == "image":
+            item["image"] = {"role": "product"}
+        else:
+            item["shape"] = {"shape_type": "rectangle"}
+        items.append(item)
+    return CanonicalDesign.model_validate({
+        "id": f"design_{index}", "owner_id": "benchmark", "title": "Benchmark",
+        "format": "instagram_post", "canvas": {"width": 1080, "height": 1080},
+        "background": {"type": "color", "color": "#ffffff"},
+        "metadata": {"source": "manual"}, "layers": items,
+    })
+
+
+def python_validate(
+    design: CanonicalDesign, margin: Optional[float] = None, fix: bool = True
+) -> Dict[str, Any]:
+    """Per-layer loop with GeometryValidator's checks and report (unrotated boxes only)."""
+    report = {"design_id": design.id, "outside": [], "font_too_small": [], "overlaps": []}
+    width, height = design.canvas.width, design.canvas.height
+    if margin is None:
+        margin = design.constraints.safe_zone_margin
+    inset = min(width, height) * margin
+    content = []
+    for layer in design.layers:
+        p = layer.position
+        is_text = layer.type == "text"
+        left = inset if is_text else 0.0
+        right, bottom = width - left, height - left
+        if p.x < left or p.y < left or p.x + p.width > right or p.y + p.height > bottom:
+            report["outside"].append(layer.id)
+            if fix:
+                p.width = min(p.width, right - left)
+                p.height = min(p.height, bottom - left)
+                p.x = min(max(p.x, left), right - p.width)
+                p.y = min(max(p.y, left), bottom - p.height)
+        if is_text and layer.text.font_size < design.constraints.min_font_size:
+            report["font_too_small"].append(layer.id)
+            if fix:
+                layer.text.font_size = design.constraints.min_font_size
+        if is_text or (layer.type == "image" and layer.image.role != "background"):
+            content.append(layer)
+    for i, a in enumerate(content):
+        pa = a.position
+        for b in content[i + 1:]:
+            pb = b.position
+            if (pa.x < pb.x + pb.width and pb.x < pa.x + pa.width
+                    and pa.y < pb.y + pb.height and pb.y < pa.y + pa.height):
+                report["overlaps"].append((a.id, b.id))
+    return report
+
+
+def timed(label: str, func) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40} {elapsed * 1000:>9.1f} ms")
+    return elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    layers = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    # Per-layer warnings would dominate the per-object timings
+    logger.disable("app")
+
+    rng = random.Random(42)
+    source = [make_design(i, layers, rng) for i in range(count)]
+    print(f"{count} designs x {layers} layers = {count * layers} layers")
+    # Keep full collections over the source designs out of the timings
+    gc.collect()
+    gc.freeze()
+
+    designs = [d.model_copy(deep=True) for d in source]
+    generator = timed(
+        "_validate_design (per object)",
+        lambda: [canonical_layout_generator._validate_design(d) for d in designs],
+    )
+    designs = [d.model_copy(deep=True) for d in source]
+    loop = timed("same checks (per object)", lambda: [python_validate(d) for d in designs])
+    designs = [d.model_copy(deep=True) for d in source]
+    report = timed("GeometryValidator (report only)", lambda: geometry_validator.validate(
+        designs, fix=False
+    ))
+    batch = timed("GeometryValidator (fix)", lambda: geometry_validator.validate(designs))
+
+    print(f"\n  speedup vs _validate_design: {generator / batch:.1f}x")
+    print(f"  speedup vs same checks:      {loop / batch:.1f}x")
+    print(f"  report only vs same checks:  {loop / report:.1f}x")
+
+    margins = (0.03, 0.04, 0.05, 0.06, 0.08)
+    print(f"\nRevalidation under {len(margins)} safe zone margins (report only)")
+    loop = timed("same checks (per object)", lambda: [
+        python_validate(d, margin, fix=False) for margin in margins for d in designs
+    ])
+
+    def revalidate():
+        columns = geometry_validator.load(designs)
+        for margin in margins:
+            geometry_validator.validate(
+                columns, fix=False, constraints=DesignConstraints(safe_zone_margin=margin)
+            )
+
+    batch = timed("GeometryValidator (load once)", revalidate)
+    print(f"\n  speedup vs same checks:      {loop / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""Shared pytest configuration."""
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    """Run @pytest.mark.anyio tests on asyncio only (the app's event loop)."""
+    return "asyncio"
@@ -0,0 +1,149 @@
+"""Batch create, update and delete: grouping, per-item statuses and limits."""
+
+import pytest
+
+from app.api.v1.endpoints import batch
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.schemas.design import DesignCreate, DesignUpdate
+
+OWNER = "11111111-1111-1111-1111-111111111111"
+MINE = "22222222-2222-2222-2222-222222222222"
+ALSO_MINE = "33333333-3333-3333-3333-333333333333"
+THEIRS = "44444444-4444-4444-4444-444444444444"
+
+
+class FakeRepository:
+    """Rows keyed by id; every call is recorded as one statement."""
+
+    def __init__(self):
+        self.rows = {
+            MINE: {"id": MINE, "owner_id": OWNER, "title": "a"},
+            ALSO_MINE: {"id": ALSO_MINE, "owner_id": OWNER, "title": "b"},
+            THEIRS: {"id": THEIRS, "owner_id": "someone else", "title": "c"},
+        }
+        self.statements = []
+
+    def _owned(self, ids, owner_id):
+        return [id for id in ids if id in self.rows and self.rows[id]["owner_id"] == owner_id]
+
+    async def create_many(self, rows):
+        self.statements.append(("insert", rows))
+        return [{"id": f"new-{i}", **row} for i, row in enumerate(rows)]
+
+    async def update_many(self, ids, owner_id, data):
+        self.statements.append(("update", sorted(ids), data))
+        for id in self._owned(ids, owner_id):
+            self.rows[id].update(data)
+        return [dict(self.rows[id]) for id in self._owned(ids, owner_id)]
+
+    async def delete_many(self, ids, owner_id):
+        self.statements.append(("delete", sorted(ids)))
+        return [self.rows.pop(id) for id in self._owned(ids, owner_id)]
+
+
+def statuses(response):
+    return [result.status for result in response.results]
+
+
+class TestBatchUpdate:
+    @pytest.mark.anyio
+    async def test_same_change_set_is_one_statement(self):
+        repository = FakeRepository()
+        items = [
+            {"id": MINE, "title": "x"},
+            {"id": ALSO_MINE, "title": "x"},
+        ]
+
+        response = await batch.batch_update(repository, DesignUpdate, items, OWNER, "Design")
+
+        assert statuses(response) == [200, 200]
+        assert repository.statements == [("update", sorted([MINE, ALSO_MINE]), {"title": "x"})]
+
+    @pytest.mark.anyio
+    async def test_different_change_sets_are_separate_statements(self):
+        repository = FakeRepository()
+        items = [{"id": MINE, "title": "x"}, {"id": ALSO_MINE, "title": "y"}]
+
+        response = await batch.batch_update(repository, DesignUpdate, items, OWNER, "Design")
+
+        assert statuses(response) == [200, 200]
+        assert len(repository.statements) == 2
+        assert repository.rows[MINE]["title"] == "x"
+        assert repository.rows[ALSO_MINE]["title"] == "y"
+
+    @pytest.mark.anyio
+    async def test_rows_of_other_owners_are_not_found(self):
+        repository = FakeRepository()
+        items = [{"id": MINE, "title": "x"}, {"id": THEIRS, "title": "x"}]
+
+        response = await batch.batch_update(repository, DesignUpdate, items, OWNER, "Design")
+
+        assert statuses(response) == [200, 404]
+        assert repository.rows[THEIRS]["title"] == "c"
+
+    @pytest.mark.anyio
+    async def test_invalid_items_are_rejected_individually(self):
+        repository = FakeRepository()
+        items = [
+            {"title": "no id"},
+            {"id": MINE},
+            {"id": ALSO_MINE, "title": ["not", "a", "string"]},
+            {"id": "not-a-uuid", "title": "x"},
+        ]
+
+        response = await batch.batch_update(repository, DesignUpdate, items, OWNER, "Design")
+
+        assert statuses(response) == [422, 422, 422, 404]
+        assert response.succeeded == 0
+        assert repository.statements == []
+
+    @pytest.mark.anyio
+    async def test_repeated_id_is_rejected(self):
+        repository = FakeRepository()
+        items = [{"id": MINE, "title": "x"}, {"id": MINE, "title": "y"}]
+
+        response = await batch.batch_update(repository, DesignUpdate, items, OWNER, "Design")
+
+        assert statuses(response) == [200, 422]
+        assert "item 0" in response.results[1].error
+        assert repository.rows[MINE]["title"] == "x"
+
+    @pytest.mark.anyio
+    async def test_batch_over_limit_is_rejected(self, monkeypatch):
+        monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 1)
+        repository = FakeRepository()
+        items = [{"id": MINE, "title": "x"}, {"id": ALSO_MINE, "title": "x"}]
+
+        with pytest.raises(ValidationError):
+            await batch.batch_update(repository, DesignUpdate, items, OWNER, "Design")
+        assert repository.statements == []
+
+
+class TestBatchCreate:
+    @pytest.mark.anyio
+    async def test_valid_items_are_one_insert(self):
+        repository = FakeRepository()
+        items = [
+            {"title": "a", "format": "instagram_post"},
+            {"title": "b"},
+            {"title": "c", "format": "story"},
+        ]
+
+        response = await batch.batch_create(repository, DesignCreate, items, OWNER, "Design")
+
+        assert statuses(response) == [201, 422, 201]
+        assert len(repository.statements) == 1
+        assert all(row["owner_id"] == OWNER for row in repository.statements[0][1])
+
+
+class TestBatchDelete:
+    @pytest.mark.anyio
+    async def test_only_owned_rows_are_deleted(self):
+        repository = FakeRepository()
+
+        response = await batch.batch_delete(repository, [MINE, THEIRS, "not-a-uuid"], OWNER, "Design")
+
+        assert statuses(response) == [204, 404, 404]
+        assert repository.statements == [("delete", sorted([MINE, THEIRS]))]
+        assert THEIRS in repository.rows
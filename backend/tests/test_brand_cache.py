@@ -0,0 +1,126 @@
+"""Brand kit read-through cache and its invalidation."""
+
+import asyncio
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.db.repositories import BrandRepository, SupabaseRepository
+
+OWNER = "owner"
+BRAND = "brand"
+
+
+class FakeTable:
+    """Stands in for the brands table behind SupabaseRepository's methods."""
+
+    def __init__(self):
+        self.rows = {BRAND: {"id": BRAND, "owner_id": OWNER, "name": "Old"}}
+        self.reads = 0
+        # When set, a read takes its row, then waits here before returning it
+        self.pause = None
+        self.paused = asyncio.Event()
+
+    async def get(self, repository, id, owner_id):
+        self.reads += 1
+        row = dict(self.rows[id]) if id in self.rows else None
+        if self.pause is not None:
+            self.paused.set()
+            await self.pause.wait()
+        return row
+
+    async def update(self, repository, id, owner_id, data, expected_updated_at=None):
+        self.rows[id].update(data)
+        return dict(self.rows[id])
+
+    async def delete(self, repository, id, owner_id, expected_updated_at=None):
+        return self.rows.pop(id, None) is not None
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(SupabaseRepository, "get", lambda self, *a: table.get(self, *a))
+    monkeypatch.setattr(SupabaseRepository, "update", lambda self, *a, **k: table.update(self, *a, **k))
+    monkeypatch.setattr(SupabaseRepository, "delete", lambda self, *a, **k: table.delete(self, *a, **k))
+    return table
+
+
+@pytest.fixture
+def brands():
+    return BrandRepository(pool=None, executor=None, cache=TTLCache(max_size=10, ttl=60))
+
+
+class TestBrandCache:
+    @pytest.mark.anyio
+    async def test_get_reads_through_once(self, table, brands):
+        assert (await brands.get(BRAND, OWNER))["name"] == "Old"
+        assert (await brands.get(BRAND, OWNER))["name"] == "Old"
+        assert table.reads == 1
+
+    @pytest.mark.anyio
+    async def test_cached_row_is_a_copy(self, table, brands):
+        (await brands.get(BRAND, OWNER))["name"] = "Mutated"
+        assert (await brands.get(BRAND, OWNER))["name"] == "Old"
+
+    @pytest.mark.anyio
+    async def test_update_invalidates(self, table, brands):
+        await brands.get(BRAND, OWNER)
+
+        await brands.update(BRAND, OWNER, {"name": "New"})
+
+        assert (await brands.get(BRAND, OWNER))["name"] == "New"
+        assert table.reads == 2
+
+    @pytest.mark.anyio
+    async def test_delete_invalidates(self, table, brands):
+        await brands.get(BRAND, OWNER)
+
+        await brands.delete(BRAND, OWNER)
+
+        assert await brands.get(BRAND, OWNER) is None
+
+    @pytest.mark.anyio
+    async def test_read_racing_an_update_is_not_cached(self, table, brands):
+        table.pause = asyncio.Event()
+        read = asyncio.create_task(brands.get(BRAND, OWNER))
+        await table.paused.wait()
+
+        # The update lands while the read holds the old row
+        await brands.update(BRAND, OWNER, {"name": "New"})
+        table.pause.set()
+        assert (await read)["name"] == "Old"
+
+        table.pause = None
+        assert (await brands.get(BRAND, OWNER))["name"] == "New"
+
+
+class TestTTLCacheVersions:
+    def test_set_if_version_without_invalidation(self):
+        cache = TTLCache(max_size=10, ttl=60)
+        version = cache.version("k")
+
+        assert cache.set_if_version("k", 1, version)
+        assert cache.get("k") == 1
+
+    def test_invalidate_rejects_older_version(self):
+        cache = TTLCache(max_size=10, ttl=60)
+        cache.set("k", 1)
+        version = cache.version("k")
+
+        cache.invalidate("k")
+
+        assert cache.get("k") is None
+        assert not cache.set_if_version("k", 2, version)
+        assert cache.set_if_version("k", 2, cache.version("k"))
+
+    def test_forgotten_version_never_matches_again(self):
+        cache = TTLCache(max_size=1, ttl=60)
+        cache.invalidate("k")
+        version = cache.version("k")
+
+        # Pushes "k" out of the bounded version table, then invalidates it again
+        cache.invalidate("other")
+        cache.invalidate("k")
+
+        assert not cache.set_if_version("k", 1, version)
@@ -0,0 +1,178 @@
+"""
+JSON Patch operations for PATCH /designs/{id}/design-json.
+
+The patch itself is applied by the apply_design_json_patch SQL function;
+these tests cover what happens before and after it: pointer parsing,
+operation validation, the RPC parameters and the error mapping.
+"""
+
+import pytest
+from postgrest.exceptions import APIError
+from pydantic import ValidationError as PydanticValidationError
+
+from app.core.exceptions import (
+    ConflictError,
+    NotFoundError,
+    PreconditionFailedError,
+    ValidationError,
+)
+from app.db.executor import BlockingIOExecutor
+from app.db.repositories import DesignRepository
+from app.schemas.design import JsonPatchOperation, parse_json_pointer
+
+
+class FakeRpc:
+    def __init__(self, client):
+        self.client = client
+
+    def execute(self):
+        if self.client.error is not None:
+            raise self.client.error
+        return type("Response", (), {"data": self.client.data})()
+
+
+class FakeClient:
+    def __init__(self, data=None, error=None):
+        self.data = data
+        self.error = error
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return FakeRpc(self)
+
+
+class FakePool:
+    def __init__(self, client):
+        self.client = client
+
+
+@pytest.fixture
+def executor():
+    executor = BlockingIOExecutor(max_workers=1, name="test-io")
+    yield executor
+    executor.shutdown()
+
+
+def repository(client, executor) -> DesignRepository:
+    return DesignRepository(FakePool(client), executor)
+
+
+class TestParseJsonPointer:
+    def test_root(self):
+        assert parse_json_pointer("") == []
+
+    def test_segments_are_unescaped(self):
+        assert parse_json_pointer("/objects/0/a~1b/c~0d") == ["objects", "0", "a/b", "c~d"]
+
+    def test_escapes_are_decoded_in_order(self):
+        # "~01" is "~" followed by "1", not "/"
+        assert parse_json_pointer("/~01") == ["~1"]
+
+    def test_empty_segment(self):
+        assert parse_json_pointer("/") == [""]
+
+    def test_must_start_with_slash(self):
+        with pytest.raises(ValueError):
+            parse_json_pointer("objects/0")
+
+
+class TestJsonPatchOperation:
+    def test_from_alias(self):
+        operation = JsonPatchOperation.model_validate(
+            {"op": "move", "from": "/objects/0", "path": "/objects/2"}
+        )
+        assert operation.from_ == "/objects/0"
+
+    @pytest.mark.parametrize("op", ["add", "replace", "test"])
+    def test_value_required(self, op):
+        with pytest.raises(PydanticValidationError):
+            JsonPatchOperation.model_validate({"op": op, "path": "/title"})
+
+    def test_null_value_is_a_value(self):
+        operation = JsonPatchOperation.model_validate({"op": "replace", "path": "/title", "value": None})
+        assert operation.value is None
+
+    @pytest.mark.parametrize("op", ["move", "copy"])
+    def test_from_required(self, op):
+        with pytest.raises(PydanticValidationError):
+            JsonPatchOperation.model_validate({"op": op, "path": "/objects/0"})
+
+    def test_remove_needs_no_value(self):
+        JsonPatchOperation.model_validate({"op": "remove", "path": "/objects/0"})
+
+    def test_unknown_op(self):
+        with pytest.raises(PydanticValidationError):
+            JsonPatchOperation.model_validate({"op": "merge", "path": "/objects"})
+
+    def test_invalid_pointer(self):
+        with pytest.raises(PydanticValidationError):
+            JsonPatchOperation.model_validate({"op": "remove", "path": "objects"})
+
+
+class TestApplyJsonPatch:
+    @pytest.mark.anyio
+    async def test_operations_are_sent_split_and_unescaped(self, executor):
+        result = {"id": "d1", "updated_at": "2026-01-01T00:00:00+00:00", "changes": []}
+        client = FakeClient(data=result)
+        operations = [
+            JsonPatchOperation.model_validate({"op": "replace", "path": "/objects/3/left", "value": 10}),
+            JsonPatchOperation.model_validate({"op": "copy", "from": "/a~1b", "path": "/c"}),
+            JsonPatchOperation.model_validate({"op": "replace", "path": "", "value": {"objects": []}}),
+        ]
+
+        assert await repository(client, executor).apply_json_patch(
+            "d1", "u1", operations, expected_updated_at="2025-12-31T00:00:00+00:00"
+        ) == result
+
+        name, params = client.calls[0]
+        assert name == "apply_design_json_patch"
+        assert params["p_design_id"] == "d1"
+        assert params["p_owner_id"] == "u1"
+        assert params["p_expected_updated_at"] == "2025-12-31T00:00:00+00:00"
+        assert params["p_operations"] == [
+            {"op": "replace", "path": ["objects", "3", "left"], "from": None, "value": 10,
+             "pointer": "/objects/3/left", "from_pointer": None},
+            {"op": "copy", "path": ["c"], "from": ["a/b"], "value": None,
+             "pointer": "/c", "from_pointer": "/a~1b"},
+            {"op": "replace", "path": [], "from": None, "value": {"objects": []},
+             "pointer": "", "from_pointer": None},
+        ]
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("code, error", [
+        ("PT404", NotFoundError),
+        ("PT409", ConflictError),
+        ("PT412", PreconditionFailedError),
+        ("PT422", ValidationError),
+    ])
+    async def test_sql_errors_map_to_api_errors(self, executor, code, error):
+        client = FakeClient(error=APIError({"code": code, "message": "Test failed: /title"}))
+        operation = JsonPatchOperation.model_validate({"op": "test", "path": "/title", "value": "x"})
+
+        with pytest.raises(error) as raised:
+            await repository(client, executor).apply_json_patch("d1", "u1", [operation])
+        assert raised.value.message == "Test failed: /title"
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("pointer, segment", [("/objects/-1", "-1"), ("/objects/01", "01")])
+    @pytest.mark.parametrize("field", ["path", "from"])
+    async def test_non_canonical_array_index_is_rejected(self, executor, pointer, segment, field):
+        # The SQL function rejects the index; it must reach it unnormalized
+        message = f"Invalid array index: {pointer}"
+        client = FakeClient(error=APIError({"code": "PT422", "message": message}))
+        fields = {"path": pointer} if field == "path" else {"from": pointer, "path": "/objects/0"}
+        operation = JsonPatchOperation.model_validate({"op": "move" if field == "from" else "remove", **fields})
+
+        with pytest.raises(ValidationError) as raised:
+            await repository(client, executor).apply_json_patch("d1", "u1", [operation])
+        assert raised.value.message == message
+        assert client.calls[0][1]["p_operations"][0][field] == ["objects", segment]
+
+    @pytest.mark.anyio
+    async def test_other_errors_propagate(self, executor):
+        client = FakeClient(error=APIError({"code": "42P01", "message": "relation does not exist"}))
+        operation = JsonPatchOperation.model_validate({"op": "remove", "path": "/title"})
+
+        with pytest.raises(APIError):
+            await repository(client, executor).apply_json_patch("d1", "u1", [operation])
@@ -0,0 +1,113 @@
+"""CanonicalDesign <-> Fabric.js conversion."""
+
+import pytest
+
+from app.schemas.canonical_design import CanonicalDesign
+from app.services.fabric_converter import fabric_converter
+from app.services.layout_engine import brief_from_prompt, layout_engine
+
+
+def make_design(*layers):
+    return CanonicalDesign.model_validate({
+        "id": "design", "owner_id": "test", "title": "Test",
+        "format": "instagram_post", "canvas": {"width": 1080, "height": 1080},
+        "background": {"type": "color", "color": "#ffffff"},
+        "metadata": {"source": "manual"}, "layers": list(layers),
+    })
+
+
+def shape(layer_id, z_index=1, **position):
+    return {
+        "id": layer_id, "type": "shape", "name": layer_id,
+        "position": {"z_index": z_index, **position},
+        "shape": {"shape_type": "rectangle"},
+    }
+
+
+def positions(design):
+    return {layer.id: layer.position for layer in design.layers}
+
+
+def group_fabric(**transform):
+    """A 200x100 group centered at (500, 500) with one 50x50 member at its center."""
+    return {
+        "width": 1080, "height": 1080,
+        "objects": [{
+            "type": "group", "id": "group", "left": 500, "top": 500,
+            "width": 200, "height": 100, "originX": "center", "originY": "center",
+            **transform,
+            "objects": [{
+                "type": "rect", "id": "member", "left": 50, "top": 0,
+                "width": 50, "height": 50, "originX": "center", "originY": "center",
+            }],
+        }],
+    }
+
+
+class TestGroups:
+    def test_group_scale_applies_to_members(self):
+        design = fabric_converter.to_canonical(group_fabric(scaleX=2, scaleY=2))
+
+        member = positions(design)["member"]
+        assert (member.x, member.y) == pytest.approx((600, 500))
+        assert (member.width, member.height) == pytest.approx((100, 100))
+
+    def test_group_angle_applies_to_members(self):
+        design = fabric_converter.to_canonical(group_fabric(angle=90))
+
+        member = positions(design)["member"]
+        assert (member.x, member.y) == pytest.approx((500, 550))
+        assert member.rotation == pytest.approx(90)
+
+    def test_rotated_group_round_trip(self):
+        design = make_design(
+            {
+                "id": "group", "type": "group", "name": "group", "children": ["a", "b"],
+                "position": {"x": 400, "y": 400, "width": 300, "height": 200,
+                             "rotation": 30, "z_index": 1},
+            },
+            shape("a", z_index=2, x=420, y=420, width=100, height=50, rotation=30),
+            shape("b", z_index=3, x=600, y=450, width=80, height=80, rotation=10,
+                  origin_x="center", origin_y="center"),
+        )
+
+        back = fabric_converter.to_canonical(fabric_converter.to_fabric(design))
+
+        for layer_id, position in positions(design).items():
+            result = positions(back)[layer_id]
+            assert (result.x, result.y) == pytest.approx((position.x, position.y))
+            assert result.rotation == pytest.approx(position.rotation)
+
+    def test_members_are_stored_unrotated_in_group_frame(self):
+        design = make_design(
+            {
+                "id": "group", "type": "group", "name": "group", "children": ["a"],
+                "position": {"x": 500, "y": 500, "width": 200, "height": 100, "rotation": 90,
+                             "origin_x": "center", "origin_y": "center", "z_index": 1},
+            },
+            shape("a", z_index=2, x=500, y=550, width=50, height=50, rotation=90,
+                  origin_x="center", origin_y="center"),
+        )
+
+        member = fabric_converter.to_fabric(design)["objects"][0]["objects"][0]
+
+        assert (member["left"], member["top"]) == pytest.approx((50, 0))
+        assert member["angle"] == pytest.approx(0)
+
+
+class TestCanvasSize:
+    def test_missing_size_requires_format(self):
+        with pytest.raises(ValueError):
+            fabric_converter.to_canonical({"objects": []})
+
+    def test_missing_size_uses_given_format(self):
+        design = fabric_converter.to_canonical({"objects": []}, format="instagram_story")
+
+        assert (design.canvas.width, design.canvas.height) == (1080, 1920)
+
+    def test_layout_engine_designs_keep_their_format(self):
+        brief = brief_from_prompt("Summer sale", format="instagram_story")
+
+        design = fabric_converter.to_canonical(layout_engine.layout(brief))
+
+        assert design.format.value == "instagram_story"
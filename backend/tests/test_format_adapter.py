@@ -0,0 +1,72 @@
+"""Rule-based format adaptation of canonical designs."""
+
+from app.schemas.canonical_design import CanonicalDesign, DesignFormat
+from app.services.format_adapter import format_adapter
+
+
+def make_design(*layers):
+    return CanonicalDesign.model_validate({
+        "id": "design", "owner_id": "test", "title": "Test",
+        "format": "instagram_post", "canvas": {"width": 1080, "height": 1080},
+        "background": {"type": "color", "color": "#ffffff"},
+        "metadata": {"source": "manual"}, "layers": list(layers),
+    })
+
+
+def shape(layer_id, **position):
+    return {
+        "id": layer_id, "type": "shape", "name": layer_id,
+        "position": {"z_index": 1, **position},
+        "shape": {"shape_type": "rectangle"},
+    }
+
+
+def covered(position):
+    """Axis-aligned box of an unrotated layer, from its origin point."""
+    fraction = {"left": 0, "top": 0, "center": 0.5, "right": 1, "bottom": 1}
+    x = position.x - fraction[position.origin_x] * position.width
+    y = position.y - fraction[position.origin_y] * position.height
+    return x, y, x + position.width, y + position.height
+
+
+def test_layers_stay_inside_the_canvas():
+    design = make_design(
+        shape("right", x=900, y=500, width=400, height=100),
+        shape("bottom", x=500, y=1000, width=100, height=300),
+    )
+
+    adapted = format_adapter.adapt(design, DesignFormat.LINKEDIN_POST)
+
+    canvas = adapted.canvas
+    for layer in adapted.layers:
+        left, top, right, bottom = covered(layer.position)
+        assert left >= 0 and top >= 0
+        assert right <= canvas.width + 0.01 and bottom <= canvas.height + 0.01
+
+
+def test_center_origin_is_anchored_by_the_covered_box():
+    # Centered at the canvas center: same layer whatever the origin
+    by_corner = make_design(shape("logo", x=440, y=440, width=200, height=200))
+    by_center = make_design(shape(
+        "logo", x=540, y=540, width=200, height=200, origin_x="center", origin_y="center",
+    ))
+
+    corner = format_adapter.adapt(by_corner, DesignFormat.INSTAGRAM_STORY).layers[0].position
+    center = format_adapter.adapt(by_center, DesignFormat.INSTAGRAM_STORY).layers[0].position
+
+    assert covered(center) == covered(corner)
+    assert (center.origin_x, center.origin_y) == ("center", "center")
+
+
+def test_rotated_layer_bounds_stay_inside_the_canvas():
+    design = make_design(shape("tag", x=980, y=60, width=300, height=80, rotation=45))
+
+    adapted = format_adapter.adapt(design, DesignFormat.INSTAGRAM_STORY)
+
+    position = adapted.layers[0].position
+    assert position.rotation == 45
+    # Rotated about the top-left origin: corners at origin + rotated offsets
+    corners_x = [position.x + dx * 0.7071 - dy * 0.7071
+                 for dx in (0, position.width) for dy in (0, position.height)]
+    assert min(corners_x) >= -0.01
+    assert max(corners_x) <= adapted.canvas.width + 0.01
@@ -0,0 +1,149 @@
+"""Vectorized geometry checks and repairs over canonical designs."""
+
+import pytest
+
+from app.schemas.canonical_design import CanonicalDesign
+from app.services.geometry_validator import geometry_validator
+
+# 1000x1000 canvas; default constraints: 5% safe zone (50px), 12px minimum font
+CANVAS = 1000
+INSET = 50
+
+
+def make_design(design_id, *layers):
+    return CanonicalDesign.model_validate({
+        "id": design_id, "owner_id": "test", "title": "Test",
+        "format": "instagram_post", "canvas": {"width": CANVAS, "height": CANVAS},
+        "background": {"type": "color", "color": "#ffffff"},
+        "metadata": {"source": "manual"}, "layers": list(layers),
+    })
+
+
+def shape(layer_id, **position):
+    return {
+        "id": layer_id, "type": "shape", "name": layer_id,
+        "position": {"z_index": 1, **position},
+        "shape": {"shape_type": "rectangle"},
+    }
+
+
+def text(layer_id, font_size=40, **position):
+    return {
+        "id": layer_id, "type": "text", "name": layer_id,
+        "position": {"z_index": 2, **position},
+        "text": {"content": "Sale", "font_family": "Arial", "font_size": font_size, "color": "#000000"},
+    }
+
+
+def position(design, layer_id):
+    return next(layer.position for layer in design.layers if layer.id == layer_id)
+
+
+def validate_one(*layers, **kwargs):
+    design = make_design("design", *layers)
+    return design, geometry_validator.validate([design], **kwargs)[0]
+
+
+def test_off_canvas_box_is_clamped():
+    design, report = validate_one(shape("box", x=900, y=-50, width=200, height=100))
+
+    assert report["out_of_bounds"] == ["box"]
+    assert report["outside_safe_zone"] == []
+    moved = position(design, "box")
+    assert (moved.x, moved.y, moved.width, moved.height) == (800, 0, 200, 100)
+
+
+def test_text_is_inset_into_safe_zone():
+    design, report = validate_one(text("headline", x=10, y=960, width=300, height=30))
+
+    assert report["outside_safe_zone"] == ["headline"]
+    assert report["out_of_bounds"] == []
+    moved = position(design, "headline")
+    assert (moved.x, moved.y) == (INSET, CANVAS - INSET - 30)
+
+
+def test_shapes_may_use_the_safe_zone():
+    _, report = validate_one(shape("band", x=0, y=960, width=1000, height=40))
+
+    assert report["out_of_bounds"] == report["outside_safe_zone"] == []
+
+
+def test_rotated_box_with_center_origin():
+    # 400x100 centered near the top edge fits unrotated; turned 90 degrees it
+    # spans y -140..260
+    design, report = validate_one(shape(
+        "bar", x=500, y=60, width=400, height=100, rotation=90,
+        origin_x="center", origin_y="center",
+    ))
+
+    assert report["rotation_out_of_bounds"] == ["bar"]
+    assert report["out_of_bounds"] == ["bar"]
+    moved = position(design, "bar")
+    assert moved.x == 500
+    assert moved.y == pytest.approx(200)
+    assert (moved.width, moved.height) == (400, 100)
+
+
+def test_rotated_box_larger_than_canvas_is_unfixable():
+    design, report = validate_one(shape(
+        "huge", x=500, y=500, width=900, height=900, rotation=45,
+        origin_x="center", origin_y="center",
+    ))
+
+    assert report["unfixable"] == ["huge"]
+    # Centered on the canvas as well as it can be
+    moved = position(design, "huge")
+    assert (moved.x, moved.y) == pytest.approx((500, 500))
+
+
+def test_unrotated_box_larger_than_canvas_is_shrunk():
+    design, report = validate_one(shape("huge", x=-100, y=0, width=1200, height=500))
+
+    assert report["out_of_bounds"] == ["huge"]
+    assert report["unfixable"] == []
+    moved = position(design, "huge")
+    assert (moved.x, moved.width) == (0, CANVAS)
+
+
+def test_small_text_is_raised_to_min_font_size():
+    design, report = validate_one(
+        text("small", font_size=8, x=100, y=100, width=300, height=30),
+        text("fine", font_size=12, x=100, y=300, width=300, height=30),
+    )
+
+    assert report["font_too_small"] == ["small"]
+    assert design.layers[0].text.font_size == 12
+    assert design.layers[1].text.font_size == 12
+
+
+def test_overlaps_are_paired_within_each_design():
+    layers = [
+        text("a", x=100, y=100, width=300, height=100),
+        text("b", x=200, y=150, width=300, height=100),
+        text("c", x=600, y=600, width=100, height=100),
+        # Shapes are decoration, not content: never reported
+        shape("under", x=100, y=100, width=400, height=200),
+    ]
+    first = make_design("first", *layers)
+    second = make_design("second", *[dict(layer, id=f"2{layer['id']}") for layer in layers])
+
+    reports = geometry_validator.validate([first, second])
+
+    assert reports[0]["overlaps"] == [("a", "b")]
+    assert reports[1]["overlaps"] == [("2a", "2b")]
+
+
+def test_report_only_leaves_models_unchanged():
+    design = make_design(
+        "design",
+        shape("box", x=900, y=-50, width=200, height=100),
+        text("small", font_size=8, x=0, y=0, width=300, height=30),
+    )
+    before = design.model_dump()
+
+    report = geometry_validator.validate([design], fix=False)[0]
+
+    assert report["out_of_bounds"] == ["box"]
+    assert report["outside_safe_zone"] == ["small"]
+    assert report["font_too_small"] == ["small"]
+    assert design.model_dump() == before
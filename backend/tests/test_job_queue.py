@@ -0,0 +1,279 @@
+"""Durable job queue: leases, fairness, limits and the generation job handler."""
+
+import asyncio
+
+import pytest
+
+from app.core.exceptions import TooManyRequestsError
+from app.core.resilience import Deadline
+from app.services import generation_jobs
+from app.services.job_queue import FAILED, QUEUED, RUNNING, JobQueue, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+
+def make_queue(tmp_path, **kwargs):
+    options = dict(
+        path=str(tmp_path / "jobs.db"), workers=1, lease=30, max_attempts=3, timeout=5,
+        poll_interval=0.01, retention=3600, max_queued=100, max_queued_per_user=10,
+    )
+    options.update(kwargs)
+    return JobQueue(**options)
+
+
+async def collect(queue, job_id):
+    return [(event, data) async for _, event, data in queue.follow(job_id)]
+
+
+def enqueue(store, user_id, max_queued=100, max_queued_per_user=10):
+    return store.enqueue("test", {}, user_id, max_queued, max_queued_per_user)
+
+
+class TestJobStore:
+    def test_jobs_survive_reopening(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        store = JobStore(path)
+        job = enqueue(store, "alice")
+        store.close()
+
+        reopened = JobStore(path)
+        try:
+            assert reopened.get(job["id"])["status"] == QUEUED
+            assert reopened.claim("w1", lease=30, max_attempts=3)["id"] == job["id"]
+        finally:
+            reopened.close()
+
+    def test_per_user_limit(self, store):
+        enqueue(store, "alice", max_queued_per_user=2)
+        enqueue(store, "alice", max_queued_per_user=2)
+
+        with pytest.raises(TooManyRequestsError):
+            enqueue(store, "alice", max_queued_per_user=2)
+        enqueue(store, "bob", max_queued_per_user=2)
+
+    def test_claims_are_fair_across_users(self, store):
+        alice = [enqueue(store, "alice")["id"] for _ in range(3)]
+        bob = enqueue(store, "bob")["id"]
+
+        order = [store.claim(f"w{i}", lease=30, max_attempts=3)["id"] for i in range(4)]
+
+        # Bob's one job does not wait behind Alice's burst
+        assert order == [alice[0], bob, alice[1], alice[2]]
+
+    def test_expired_lease_is_requeued(self, store):
+        job = enqueue(store, "alice")
+        store.claim("w1", lease=-1, max_attempts=3)
+
+        claimed = store.claim("w2", lease=30, max_attempts=3)
+
+        assert claimed["id"] == job["id"]
+        assert claimed["attempts"] == 2
+        assert not store.renew(job["id"], "w1", lease=30)
+        assert not store.finish(job["id"], "w1", result={})
+        assert store.finish(job["id"], "w2", result={})
+
+    def test_expired_lease_fails_after_max_attempts(self, store):
+        job = enqueue(store, "alice")
+        store.claim("w1", lease=-1, max_attempts=1)
+
+        assert store.claim("w2", lease=30, max_attempts=1) is None
+        status, events = store.events(job["id"])
+        assert status == FAILED
+        assert events[-1][1:] == ("error", {"error": "JOB_LOST", "message": "Worker stopped responding"})
+
+    def test_release_does_not_use_an_attempt(self, store):
+        job = enqueue(store, "alice")
+        store.claim("w1", lease=30, max_attempts=3)
+
+        store.release(job["id"], "w1")
+
+        released = store.get(job["id"])
+        assert released["status"] == QUEUED
+        assert released["attempts"] == 0
+
+
+class TestJobQueue:
+    @pytest.mark.anyio
+    async def test_runs_job_and_records_events(self, tmp_path):
+        queue = make_queue(tmp_path)
+
+        @queue.handler("test")
+        async def handler(job, emit):
+            await emit("progress", {"step": 1})
+            return {"ok": True}
+
+        await queue.start()
+        try:
+            job = await queue.submit("test", {}, "alice")
+            events = [(event, data) async for _, event, data in queue.follow(job["id"])]
+        finally:
+            await queue.stop()
+            queue.close()
+
+        assert [event for event, _ in events] == [QUEUED, "started", "progress", "done"]
+        assert events[-1][1]["result"] == {"ok": True}
+
+    @pytest.mark.anyio
+    async def test_stop_releases_running_job(self, tmp_path):
+        queue = make_queue(tmp_path)
+        started = asyncio.Event()
+
+        @queue.handler("test")
+        async def handler(job, emit):
+            started.set()
+            await asyncio.sleep(60)
+
+        await queue.start()
+        job = await queue.submit("test", {}, "alice")
+        await asyncio.wait_for(started.wait(), 5)
+        await queue.stop(grace=0.05)
+        try:
+            released = await queue.get(job["id"])
+        finally:
+            queue.close()
+
+        assert released["status"] == QUEUED
+        assert released["attempts"] == 0
+
+    @pytest.mark.anyio
+    async def test_lost_lease_cancels_handler(self, tmp_path):
+        # Heartbeats every lease / 3 = 0.05s
+        queue = make_queue(tmp_path, lease=0.15)
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        @queue.handler("test")
+        async def handler(job, emit):
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        await queue.start()
+        try:
+            job = await queue.submit("test", {}, "alice")
+            await asyncio.wait_for(started.wait(), 5)
+            # Another worker takes the job over
+            queue.store._conn.execute("UPDATE jobs SET worker_id = 'other' WHERE id = ?", (job["id"],))
+
+            await asyncio.wait_for(cancelled.wait(), 5)
+            await asyncio.sleep(0.05)
+            taken = await queue.get(job["id"])
+        finally:
+            await queue.stop()
+            queue.close()
+
+        # Left to the worker that holds the lease
+        assert taken["status"] == RUNNING
+        assert queue.active == 0
+
+
+    @pytest.mark.anyio
+    async def test_cancelled_handler_fails_job_and_keeps_worker(self, tmp_path):
+        queue = make_queue(tmp_path)
+
+        @queue.handler("test")
+        async def handler(job, emit):
+            if job["payload"].get("cancel"):
+                raise asyncio.CancelledError()
+            return {"ok": True}
+
+        await queue.start()
+        try:
+            cancelled = await queue.submit("test", {"cancel": True}, "alice")
+            events = await asyncio.wait_for(collect(queue, cancelled["id"]), 5)
+            # The same (only) worker still takes jobs
+            after = await queue.submit("test", {}, "alice")
+            after_events = [event for event, _ in await asyncio.wait_for(collect(queue, after["id"]), 5)]
+            failed = await queue.get(cancelled["id"])
+        finally:
+            await queue.stop()
+            queue.close()
+
+        assert failed["status"] == FAILED
+        assert events[-1] == ("error", {"error": "JOB_FAILED", "message": "Job was cancelled"})
+        assert after_events[-1] == "done"
+        assert queue.active == 0
+
+
+class FakeDesigns:
+    def __init__(self, saved=None):
+        self.saved = saved
+        self.created = []
+
+    async def get(self, id, owner_id):
+        return self.saved if self.saved and self.saved["id"] == id else None
+
+    async def create(self, data):
+        self.created.append(data)
+        return data
+
+
+class TestGenerateJob:
+    @pytest.mark.anyio
+    async def test_retry_returns_design_saved_by_earlier_attempt(self, monkeypatch):
+        job_id = "0123456789abcdef0123456789abcdef"
+        saved = {"id": generation_jobs.job_design_id(job_id), "design_json": {"objects": []}}
+        designs = FakeDesigns(saved)
+        monkeypatch.setattr(generation_jobs, "get_design_repository", lambda: designs)
+        events = []
+
+        async def emit(event, data):
+            events.append(event)
+
+        job = {"id": job_id, "user_id": "alice", "attempts": 2, "payload": {"prompt": "Sale"}}
+        result = await generation_jobs.run_generate_job(job, emit)
+
+        assert result == saved
+        assert events == ["design", "saved"]
+        assert designs.created == []
+
+    @pytest.mark.anyio
+    async def test_design_is_saved_under_job_id(self, monkeypatch):
+        job_id = "0123456789abcdef0123456789abcdef"
+        designs = FakeDesigns()
+        monkeypatch.setattr(generation_jobs, "get_design_repository", lambda: designs)
+
+        async def emit(event, data):
+            pass
+
+        job = {"id": job_id, "user_id": "alice", "attempts": 1,
+               "payload": {"prompt": "Summer sale", "instant": True}}
+        result = await generation_jobs.run_generate_job(job, emit)
+
+        assert result["id"] == "01234567-89ab-cdef-0123-456789abcdef"
+        assert len(designs.created) == 1
+
+    @pytest.mark.anyio
+    async def test_generation_runs_under_one_deadline(self, monkeypatch):
+        designs = FakeDesigns()
+        monkeypatch.setattr(generation_jobs, "get_design_repository", lambda: designs)
+        deadlines = []
+
+        async def prompt_to_brief(prompt, use_cache=True):
+            deadlines.append(Deadline.current())
+            return {"headline": "Sale"}
+
+        async def stream_design(brief, brand_id=None):
+            deadlines.append(Deadline.current())
+            yield {"type": "design", "design": {"objects": []}}
+
+        monkeypatch.setattr(generation_jobs.layout_ai, "prompt_to_brief", prompt_to_brief)
+        monkeypatch.setattr(generation_jobs.layout_ai, "stream_design", stream_design)
+
+        async def emit(event, data):
+            pass
+
+        job = {"id": "0123456789abcdef0123456789abcdef", "user_id": "alice", "attempts": 1,
+               "payload": {"prompt": "Summer sale", "fused": False}}
+        await generation_jobs.run_generate_job(job, emit)
+
+        assert deadlines[0] is not None
+        assert deadlines == [deadlines[0], deadlines[0]]
@@ -0,0 +1,58 @@
+"""Incremental parsing of streamed layout JSON."""
+
+import json
+
+import pytest
+
+from app.services.json_stream import ArrayElementStream, fabric_object_stream
+
+RECT = {"type": "rect", "left": 1, "top": 2, "width": 30, "height": 40, "fill": "#ff0000"}
+CIRCLE = {"type": "circle", "left": 5, "top": 6, "radius": 7, "fill": "#00ff00"}
+DOCUMENT = json.dumps({
+    "version": "5.3.0",
+    "other": [{"type": "rect"}],
+    "objects": [RECT, 3, "a, b", [1, 2], {"text": "}{\"]["}, CIRCLE],
+    "background": "#ffffff",
+})
+
+
+def feed_in_chunks(stream, text, size):
+    out = []
+    for start in range(0, len(text), size):
+        out += stream.feed(text[start:start + size])
+    return out
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, len(DOCUMENT)])
+def test_elements_keep_their_array_positions(size):
+    stream = ArrayElementStream("objects")
+
+    elements = feed_in_chunks(stream, DOCUMENT, size)
+
+    # Scalars (1, 2) are skipped but still counted
+    assert elements == [(0, RECT), (3, [1, 2]), (4, {"text": "}{\"]["}), (5, CIRCLE)]
+    assert stream.done
+    assert json.loads(stream.text) == json.loads(DOCUMENT)
+
+
+def test_malformed_element_is_skipped_but_counted():
+    stream = ArrayElementStream("objects")
+
+    elements = stream.feed('{"objects": [{"a": }, {"b": 1}]}')
+
+    assert elements == [(1, {"b": 1})]
+
+
+def test_only_the_top_level_key_is_read():
+    stream = ArrayElementStream("objects")
+
+    assert stream.feed('{"meta": {"objects": [{"x": 1}]}, "objects": [{"y": 2}]}') == [(0, {"y": 2})]
+
+
+def test_layout_stream_reports_array_positions():
+    stream = fabric_object_stream()
+
+    ready = feed_in_chunks(stream, DOCUMENT, 5)
+
+    assert [index for index, _ in ready] == [0, 5]
+    assert [index for index, _ in stream.rejected] == [3, 4]
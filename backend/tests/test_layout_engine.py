@@ -0,0 +1,139 @@
+"""Rule-based layouts and instant briefs derived from prompts without a model."""
+
+import pytest
+
+from app.services.layout_engine import (
+    MIN_BODY_SIZE,
+    MIN_HEADLINE_SIZE,
+    SAFE_ZONE,
+    STYLES,
+    brief_from_prompt,
+    contrast_ratio,
+    layout_engine,
+)
+
+FORMATS = ["instagram_post", "instagram_story", "facebook_post"]
+
+
+def make_brief(**fields):
+    brief = {
+        "headline": "Summer Sale Starts Now",
+        "subheadline": "Up to 50% off everything in store and online this weekend",
+        "layout_style": "modern",
+        "visual_focus": ["headline"],
+        "color_scheme": {"primary": "#3b82f6", "secondary": "#1e293b", "accent": "#64748b"},
+        "format": "instagram_post",
+    }
+    brief.update(fields)
+    return brief
+
+
+def texts(design):
+    return [obj for obj in design["objects"] if obj["type"] == "textbox"]
+
+
+def extent(obj):
+    if obj["type"] == "circle":
+        return obj["radius"] * 2, obj["radius"] * 2
+    return obj["width"], obj["height"]
+
+
+@pytest.mark.parametrize("style", sorted(STYLES))
+@pytest.mark.parametrize("format", FORMATS)
+@pytest.mark.parametrize("variant", range(4))
+def test_layout_stays_on_canvas_and_text_in_safe_zone(style, format, variant):
+    brief = make_brief(layout_style=style, format=format, visual_focus=["product"])
+
+    design = layout_engine.layout(brief, variant=variant)
+
+    width, height = design["width"], design["height"]
+    for obj in design["objects"]:
+        w, h = extent(obj)
+        assert 0 <= obj["left"] and obj["left"] + w <= width + 1
+        assert 0 <= obj["top"] and obj["top"] + h <= height + 1
+    margin = round(min(width, height) * SAFE_ZONE)
+    for obj in texts(design):
+        w, h = extent(obj)
+        assert margin <= obj["left"] and obj["left"] + w <= width - margin + 1
+        assert margin <= obj["top"] and obj["top"] + h <= height - margin + 1
+
+
+@pytest.mark.parametrize("style", sorted(STYLES))
+def test_headline_outranks_subheadline(style):
+    headline, subheadline = texts(layout_engine.layout(make_brief(layout_style=style)))
+
+    assert headline["fontSize"] > subheadline["fontSize"]
+    assert headline["fontSize"] >= MIN_HEADLINE_SIZE
+    assert subheadline["fontSize"] >= MIN_BODY_SIZE
+    assert headline["top"] + headline["height"] <= subheadline["top"]
+
+
+def test_long_headline_shrinks_but_not_below_minimum():
+    brief = make_brief(headline=" ".join(["Extraordinary"] * 12))
+
+    headline = texts(layout_engine.layout(brief))[0]
+
+    assert headline["fontSize"] >= MIN_HEADLINE_SIZE
+    assert headline["fontSize"] < texts(layout_engine.layout(make_brief()))[0]["fontSize"]
+
+
+@pytest.mark.parametrize("style", sorted(STYLES))
+def test_low_contrast_text_color_is_replaced(style):
+    # Text colors that vanish on a white or primary-colored background
+    scheme = {"primary": "#ffffff", "secondary": "#fefefe", "accent": "#fdfdfd"}
+    design = layout_engine.layout(make_brief(layout_style=style, color_scheme=scheme))
+
+    for obj in texts(design):
+        assert contrast_ratio(obj["fill"], design["background"]) >= 4.5
+
+
+@pytest.mark.parametrize("style", sorted(STYLES))
+def test_style_template(style):
+    design = layout_engine.layout(make_brief(layout_style=style))
+    headline = texts(design)[0]
+
+    assert headline["fontFamily"] == STYLES[style]["font"]
+    assert headline["fontWeight"] == STYLES[style]["weight"]
+    assert headline["textAlign"] == STYLES[style]["align"]
+    assert (headline["text"] == "SUMMER SALE STARTS NOW") == STYLES[style]["upper"]
+
+
+def test_free_form_style_resolves_to_template():
+    design = layout_engine.layout(make_brief(layout_style="Luxury and refined"))
+
+    assert texts(design)[0]["fontFamily"] == STYLES["elegant"]["font"]
+
+
+def test_odd_variants_are_mirrored():
+    design = layout_engine.layout(make_brief(layout_style="modern"), variant=1)
+
+    assert texts(design)[0]["textAlign"] == "right"
+
+
+@pytest.mark.parametrize(
+    "prompt, headline",
+    [
+        ("Create an Instagram post for our summer sale", "Our Summer Sale"),
+        ("Make a bold minimalist ad for a coffee shop", "Coffee Shop"),
+        ("Can you make me a flyer announcing the grand opening", "Grand Opening"),
+        ("design a banner with the text Free Shipping", "Free Shipping"),
+        ("An ad for the new menu", "New Menu"),
+        ("The Big Game Tonight", "The Big Game Tonight"),
+        ("Summer sale poster design", "Summer Sale"),
+        ("Create a flyer design for the bake sale", "Bake Sale"),
+        ("Our Story", "Our Story"),
+    ],
+)
+def test_headline_leaves_out_request_phrasing(prompt, headline):
+    assert brief_from_prompt(prompt)["headline"] == headline
+
+
+def test_request_only_clause_moves_to_next_clause():
+    brief = brief_from_prompt("Please design a poster. Fresh bread daily - visit us")
+
+    assert brief["headline"] == "Fresh Bread Daily"
+    assert brief["subheadline"] == "visit us"
+
+
+def test_request_without_copy_uses_placeholder():
+    assert brief_from_prompt("Design a poster")["headline"] == "Your Headline Here"
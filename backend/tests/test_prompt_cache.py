@@ -0,0 +1,206 @@
+"""Provider-side prompt prefix caching and the full-prompt fallback."""
+
+import asyncio
+
+import pytest
+
+from app.services import canonical_layout_generator
+from app.services.canonical_layout_generator import CanonicalLayoutGenerator
+from app.services.prompt_cache import LocalPromptCacheProvider, PromptCache
+
+PREFIX = "static system prompt"
+
+
+class FailingProvider(LocalPromptCacheProvider):
+    """Local provider whose creates fail until allowed."""
+
+    def __init__(self):
+        super().__init__()
+        self.fail = True
+        self.create_calls = 0
+
+    async def create(self, model, content, ttl, display_name):
+        self.create_calls += 1
+        if self.fail:
+            raise RuntimeError("model does not support caching")
+        return await super().create(model, content, ttl, display_name)
+
+
+class SlowProvider(LocalPromptCacheProvider):
+    async def create(self, model, content, ttl, display_name):
+        await asyncio.sleep(1)
+        return await super().create(model, content, ttl, display_name)
+
+
+def make_cache(provider, **kwargs):
+    return PromptCache(provider, model="m", content=PREFIX, display_name="test", **kwargs)
+
+
+class TestLocalPromptCacheProvider:
+    @pytest.mark.anyio
+    async def test_create_refresh_delete(self):
+        provider = LocalPromptCacheProvider()
+
+        name = await provider.create("m", PREFIX, ttl=60, display_name="test")
+        assert provider.content(name) == PREFIX
+
+        await provider.refresh(name, ttl=60)
+        await provider.delete(name)
+        with pytest.raises(KeyError):
+            provider.content(name)
+
+    @pytest.mark.anyio
+    async def test_expired_entry_is_gone(self):
+        provider = LocalPromptCacheProvider()
+        name = await provider.create("m", PREFIX, ttl=0, display_name="test")
+
+        with pytest.raises(KeyError):
+            provider.content(name)
+        with pytest.raises(KeyError):
+            await provider.refresh(name, ttl=60)
+
+
+class TestPromptCache:
+    @pytest.mark.anyio
+    async def test_creates_once_and_reuses(self):
+        provider = LocalPromptCacheProvider()
+        cache = make_cache(provider)
+
+        first = await cache.handle()
+        second = await cache.handle()
+
+        assert first == second
+        assert provider.content(first) == PREFIX
+        assert cache.stats()["creates"] == 1
+        assert cache.stats()["hits"] == 2
+
+    @pytest.mark.anyio
+    async def test_refreshes_within_margin(self):
+        provider = LocalPromptCacheProvider()
+        cache = make_cache(provider, ttl=60, refresh_margin=30)
+        name = await cache.handle()
+
+        # Pretend only 10s remain
+        cache._expires_at -= 50
+        assert await cache.handle() == name
+        assert cache.stats()["refreshes"] == 1
+        assert cache.stats()["creates"] == 1
+
+    @pytest.mark.anyio
+    async def test_recreates_after_expiry(self):
+        provider = LocalPromptCacheProvider()
+        cache = make_cache(provider, ttl=60)
+        name = await cache.handle()
+
+        cache._expires_at -= 60
+        renewed = await cache.handle()
+
+        assert renewed != name
+        assert cache.stats()["refreshes"] == 0
+        assert cache.stats()["creates"] == 2
+
+    @pytest.mark.anyio
+    async def test_recreates_when_refresh_fails(self):
+        provider = LocalPromptCacheProvider()
+        cache = make_cache(provider, ttl=60, refresh_margin=30)
+        name = await cache.handle()
+
+        await provider.delete(name)
+        cache._expires_at -= 50
+        renewed = await cache.handle()
+
+        assert renewed != name
+        assert provider.content(renewed) == PREFIX
+
+    @pytest.mark.anyio
+    async def test_invalidate_forgets_name(self):
+        provider = LocalPromptCacheProvider()
+        cache = make_cache(provider)
+        name = await cache.handle()
+
+        cache.invalidate("cachedContents/other")
+        assert await cache.handle() == name
+
+        cache.invalidate(name)
+        assert await cache.handle() != name
+
+    @pytest.mark.anyio
+    async def test_failed_create_waits_retry_after(self):
+        provider = FailingProvider()
+        cache = make_cache(provider, retry_after=60)
+
+        assert await cache.handle() is None
+        provider.fail = False
+        assert await cache.handle() is None
+        assert provider.create_calls == 1
+
+        cache._retry_at -= 60
+        assert await cache.handle() is not None
+        assert cache.stats()["failures"] == 1
+
+    @pytest.mark.anyio
+    async def test_handle_bounded_by_timeout(self):
+        cache = make_cache(SlowProvider())
+
+        assert await cache.handle(timeout=0.01) is None
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.anyio
+    async def test_close_deletes_entry(self):
+        provider = LocalPromptCacheProvider()
+        cache = make_cache(provider)
+        name = await cache.handle()
+
+        await cache.close()
+
+        assert not cache.stats()["active"]
+        with pytest.raises(KeyError):
+            provider.content(name)
+
+
+class CacheRejectedError(Exception):
+    code = 400
+
+    def __str__(self):
+        return "Cached content not found"
+
+
+class FakeModels:
+    def __init__(self):
+        self.configs = []
+
+    async def generate_content(self, model, contents, config):
+        self.configs.append(config)
+        if "cached_content" in config:
+            raise CacheRejectedError()
+        raise RuntimeError("upstream error")
+
+
+class FakeClients:
+    is_configured = True
+
+    def __init__(self):
+        self.models = FakeModels()
+        self.client = self
+        self.aio = self
+
+
+async def passthrough(func, timeout, deadline_bound=False, kind="default"):
+    return await func()
+
+
+class TestGenerateLayoutFallback:
+    @pytest.mark.anyio
+    async def test_cache_rejection_does_not_use_an_attempt(self, monkeypatch):
+        monkeypatch.setattr(canonical_layout_generator, "call_gemini", passthrough)
+        clients = FakeClients()
+        cache = make_cache(LocalPromptCacheProvider())
+        generator = CanonicalLayoutGenerator(clients=clients, prompt_cache=cache)
+        generator.max_retries = 1
+
+        with pytest.raises(ValueError):
+            await generator.generate_layout("summer sale")
+
+        # The rejected cached call, then the full-prompt fallback
+        assert len(clients.models.configs) == 2
+        assert "cached_content" not in clients.models.configs[1]
@@ -0,0 +1,150 @@
+"""Circuit breaker, deadlines and hedging for upstream AI calls."""
+
+import asyncio
+
+import pytest
+
+from app.core.resilience import CircuitBreaker, CircuitOpenError, Deadline, Hedger, request_deadline
+
+
+async def slow():
+    await asyncio.sleep(1)
+
+
+async def failing():
+    raise RuntimeError("upstream error")
+
+
+class TestCircuitBreaker:
+    @pytest.mark.anyio
+    async def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await breaker.call(failing, timeout=1)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(failing, timeout=1)
+
+    @pytest.mark.anyio
+    async def test_timeout_counts_as_failure(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(slow, timeout=0.01)
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+    @pytest.mark.anyio
+    async def test_deadline_bound_timeout_is_not_a_failure(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(slow, timeout=0.01, deadline_bound=True)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.stats()["consecutive_failures"] == 0
+
+    @pytest.mark.anyio
+    async def test_deadline_bound_call_still_counts_errors(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+
+        with pytest.raises(RuntimeError):
+            await breaker.call(failing, timeout=1, deadline_bound=True)
+
+        assert breaker.state == CircuitBreaker.OPEN
+
+    @pytest.mark.anyio
+    async def test_half_open_probe_cut_by_deadline_is_released(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0)
+        with pytest.raises(RuntimeError):
+            await breaker.call(failing, timeout=1)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(slow, timeout=0.01, deadline_bound=True)
+
+        # The probe slot is free again and a success closes the circuit
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        await breaker.call(lambda: asyncio.sleep(0), timeout=1)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestDeadline:
+    def test_timeout_is_capped_by_time_left(self):
+        deadline = Deadline(5)
+
+        assert deadline.timeout(1) == 1
+        assert 4 < deadline.timeout(30) <= 5
+
+    def test_expired(self):
+        assert Deadline(0).expired
+        assert not Deadline(5).expired
+
+    def test_sooner_outer_deadline_is_kept(self):
+        with request_deadline(1) as outer:
+            with request_deadline(60) as inner:
+                assert inner is outer
+                assert Deadline.current() is outer
+        assert Deadline.current() is None
+
+    @pytest.mark.anyio
+    async def test_generator_scope_closed_from_another_task(self):
+        async def events():
+            with request_deadline(5):
+                yield Deadline.current()
+
+        async def first():
+            stream = events()
+            assert await anext(stream) is not None
+            return stream
+
+        # Opened in one task and closed in another, as an abandoned generator is
+        stream = await asyncio.create_task(first())
+        await asyncio.create_task(stream.aclose())
+
+
+class TestHedger:
+    def test_latency_windows_are_kept_per_kind(self):
+        hedger = Hedger("test", percentile=50, min_delay=0, min_samples=3)
+        for latency in (1.0, 1.0, 1.0):
+            hedger.record(latency, "brief")
+        for latency in (10.0, 10.0, 10.0):
+            hedger.record(latency, "design")
+
+        assert hedger.delay("brief") == 1.0
+        assert hedger.delay("design") == 10.0
+        assert hedger.delay("other") is None
+
+    def test_no_hedging_until_enough_samples(self):
+        hedger = Hedger("test", min_samples=3)
+        hedger.record(1.0, "brief")
+
+        assert hedger.delay("brief") is None
+
+    @pytest.mark.anyio
+    async def test_slow_call_is_hedged_and_faster_duplicate_wins(self):
+        hedger = Hedger("test", percentile=50, min_delay=0.01, min_samples=1)
+        hedger.record(0.01, "brief")
+        calls = []
+
+        async def call():
+            calls.append(len(calls))
+            await asyncio.sleep(1 if len(calls) == 1 else 0)
+            return len(calls)
+
+        assert await hedger.call(call, key="brief") == 2
+        assert hedger.hedged == 1 and hedger.hedge_wins == 1
+
+    @pytest.mark.anyio
+    async def test_other_kinds_latency_does_not_trigger_hedging(self):
+        hedger = Hedger("test", percentile=50, min_delay=0.01, min_samples=1)
+        hedger.record(0.01, "brief")
+
+        async def call():
+            await asyncio.sleep(0.05)
+            return "design"
+
+        assert await hedger.call(call, key="design") == "design"
+        assert hedger.hedged == 0
@@ -0,0 +1,99 @@
+"""Streaming design generation: per-object events, timeouts and the fallback."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.ai_layout import LayoutAI
+
+RECT = {"type": "rect", "left": 10, "top": 20, "width": 100, "height": 50, "fill": "#ff0000"}
+DESIGN = json.dumps({"version": "5.3.0", "objects": [RECT, RECT], "background": "#ffffff"})
+BRIEF = {"headline": "Sale", "format": "instagram_post"}
+FALLBACK = {"version": "5.3.0", "objects": [], "background": "#000000"}
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.closed = asyncio.Event()
+
+    async def generate_content_stream(self, model, contents, config):
+        async def chunks():
+            try:
+                for start in range(0, len(DESIGN), 16):
+                    await asyncio.sleep(self.delay)
+                    yield Chunk(DESIGN[start:start + 16])
+            finally:
+                self.closed.set()
+
+        return chunks()
+
+
+class FakeClients:
+    is_configured = True
+
+    def __init__(self, models):
+        self.models = models
+        self.client = self
+        self.aio = self
+
+
+def make_layout_ai(monkeypatch, models, timeout):
+    layout_ai = LayoutAI(clients=FakeClients(models))
+    layout_ai.timeout = timeout
+
+    async def brief_to_design(brief, brand_id=None):
+        return FALLBACK
+
+    monkeypatch.setattr(layout_ai, "brief_to_design", brief_to_design)
+    return layout_ai
+
+
+class TestStreamDesign:
+    @pytest.mark.anyio
+    async def test_streams_objects_then_design(self, monkeypatch):
+        layout_ai = make_layout_ai(monkeypatch, FakeModels(), timeout=5)
+
+        events = [event async for event in layout_ai.stream_design(BRIEF)]
+
+        assert [event["type"] for event in events] == ["object", "object", "design"]
+        assert [event["index"] for event in events[:2]] == [0, 1]
+        assert len(events[-1]["design"]["objects"]) == 2
+
+    @pytest.mark.anyio
+    async def test_slow_consumer_does_not_time_out_the_stream(self, monkeypatch):
+        layout_ai = make_layout_ai(monkeypatch, FakeModels(), timeout=0.1)
+        events = []
+
+        async for event in layout_ai.stream_design(BRIEF):
+            events.append(event)
+            # Holding each event longer than the whole Gemini timeout
+            await asyncio.sleep(0.15)
+
+        assert [event["type"] for event in events] == ["object", "object", "design"]
+        assert events[-1]["design"] is not FALLBACK
+
+    @pytest.mark.anyio
+    async def test_slow_upstream_falls_back(self, monkeypatch):
+        layout_ai = make_layout_ai(monkeypatch, FakeModels(delay=0.05), timeout=0.1)
+
+        events = [event async for event in layout_ai.stream_design(BRIEF)]
+
+        assert events[-1] == {"type": "design", "design": FALLBACK}
+
+    @pytest.mark.anyio
+    async def test_closing_the_stream_stops_the_upstream_read(self, monkeypatch):
+        models = FakeModels(delay=0.01)
+        layout_ai = make_layout_ai(monkeypatch, models, timeout=5)
+        events = layout_ai.stream_design(BRIEF)
+
+        assert (await anext(events))["type"] == "object"
+        await events.aclose()
+
+        await asyncio.wait_for(models.closed.wait(), 1)
@@ -1,6 +1,8 @@
 import { NextResponse } from "next/server";
 
 const BACKEND_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000/api/v1";
+// Largest page the backend serves (MAX_PAGE_SIZE in backend/app/db/repositories.py)
+const MAX_PAGE_SIZE = 200;
 
 export async function GET(request: Request) {
     try {
@@ -10,24 +12,44 @@ export async function GET(request: Request) {
         // Get authorization header from request
         const authHeader = request.headers.get("authorization");
 
-        const response = await fetch(`${BACKEND_URL}/designs`, {
-            headers: authHeader ? { "Authorization": authHeader } : {},
-        });
+        const headers = authHeader ? { "Authorization": authHeader } : {};
 
-        console.log("[API Route] Backend response status:", response.status);
-
-        if (!response.ok) {
-            const errorData = await response.json().catch(() => ({ detail: "Unknown error" }));
-            console.error("[API Route] Backend error:", errorData);
-            return NextResponse.json(
-                { error: errorData.detail || "Failed to fetch designs" },
-                { status: response.status }
-            );
+        // The backend pages its results (X-Next-Cursor). Forward paging
+        // parameters when the caller uses them; otherwise collect every
+        // page so callers expecting the full list still get it.
+        const params = new URL(request.url).searchParams;
+        const paged = params.has("cursor") || params.has("limit");
+        if (!paged) {
+            params.set("limit", String(MAX_PAGE_SIZE));
         }
 
-        const data = await response.json();
+        const data: any[] = [];
+        let nextCursor: string | null = null;
+        do {
+            if (nextCursor) {
+                params.set("cursor", nextCursor);
+            }
+            const response = await fetch(`${BACKEND_URL}/designs?${params}`, { headers });
+
+            console.log("[API Route] Backend response status:", response.status);
+
+            if (!response.ok) {
+                const errorData = await response.json().catch(() => ({ detail: "Unknown error" }));
+                console.error("[API Route] Backend error:", errorData);
+                return NextResponse.json(
+                    { error: errorData.detail || "Failed to fetch designs" },
+                    { status: response.status }
+                );
+            }
+
+            data.push(...(await response.json()));
+            nextCursor = response.headers.get("X-Next-Cursor");
+        } while (nextCursor && !paged);
+
         console.log("[API Route] Success:", data);
-        return NextResponse.json(data);
+        return NextResponse.json(data, {
+            headers: nextCursor ? { "X-Next-Cursor": nextCursor } : {},
+        });
     } catch (error: any) {
         console.error("[API Route] Error:", error);
         return NextResponse.json(
@@ -0,0 +1,17 @@
+-- Radic Keyset Pagination Indexes
+-- Version: 1.1.0
+-- Date: 2026-10-17
+
+-- ============================================================================
+-- LIST QUERIES
+-- ============================================================================
+-- GET /designs and GET /brands filter on owner_id and page on
+-- (created_at DESC, id DESC). A composite index lets each page be a single
+-- range scan regardless of how many rows the owner has or how deep the
+-- cursor is, instead of combining idx_*_owner_id with idx_*_created_at.
+
+CREATE INDEX IF NOT EXISTS idx_designs_owner_created_id
+    ON designs(owner_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_brands_owner_created_id
+    ON brands(owner_id, created_at DESC, id DESC);
@@ -0,0 +1,205 @@
+-- Radic Design JSON Patch
+-- Version: 1.3.0
+-- Date: 2026-10-17
+
+-- ============================================================================
+-- APPLY RFC 6902 JSON PATCH TO designs.design_json
+-- ============================================================================
+-- Called through PostgREST RPC by PATCH /designs/{id}/design-json. Applies
+-- the operations to the stored document inside the database so autosave
+-- only ships the edit, not the whole design, and the read-modify-write is
+-- a single round trip under a row lock.
+--
+-- p_operations is a JSON array of
+--   {"op": ..., "path": [segments], "from": [segments], "value": ...,
+--    "pointer": "/original/json/pointer"}
+-- where paths are already split and unescaped by the API.
+--
+-- Errors use PostgREST's PTxxx SQLSTATEs, which map to HTTP status xxx:
+--   PT404 design not found, PT412 version mismatch,
+--   PT409 failed "test" operation, PT422 invalid operation/path.
+
+-- ============================================================================
+-- ARRAY INDEX CHECK
+-- ============================================================================
+-- jsonb's #>, #- and jsonb_set accept negative indexes (counted from the
+-- end) and leading zeros, which RFC 6901 does not. Returns false if any
+-- segment of path that indexes an array is not a canonical index of an
+-- existing element. Segments below a missing value are left to the caller,
+-- which reports the path as not found.
+
+CREATE OR REPLACE FUNCTION design_json_array_indexes_valid(doc JSONB, path TEXT[])
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+    node JSONB := doc;
+    segment TEXT;
+BEGIN
+    FOREACH segment IN ARRAY path LOOP
+        IF node IS NULL THEN
+            RETURN TRUE;
+        ELSIF jsonb_typeof(node) = 'array' THEN
+            -- Nine digits is past any array jsonb can hold and still fits an int
+            IF segment !~ '^(0|[1-9][0-9]{0,8})$'
+               OR segment::int >= jsonb_array_length(node) THEN
+                RETURN FALSE;
+            END IF;
+            node := node -> segment::int;
+        ELSIF jsonb_typeof(node) = 'object' THEN
+            node := node -> segment;
+        ELSE
+            node := NULL;
+        END IF;
+    END LOOP;
+    RETURN TRUE;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION apply_design_json_patch(
+    p_design_id UUID,
+    p_owner_id UUID,
+    p_operations JSONB,
+    p_expected_updated_at TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    doc JSONB;
+    current_updated_at TIMESTAMPTZ;
+    new_updated_at TIMESTAMPTZ;
+    operation JSONB;
+    op_name TEXT;
+    target TEXT[];
+    source TEXT[];
+    parent_path TEXT[];
+    parent JSONB;
+    last_segment TEXT;
+    new_value JSONB;
+    changes JSONB := '[]'::jsonb;
+BEGIN
+    SELECT design_json, updated_at
+    INTO doc, current_updated_at
+    FROM designs
+    WHERE id = p_design_id AND owner_id = p_owner_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE SQLSTATE 'PT404' USING MESSAGE = 'Design not found';
+    END IF;
+
+    IF p_expected_updated_at IS NOT NULL AND current_updated_at <> p_expected_updated_at THEN
+        RAISE SQLSTATE 'PT412' USING MESSAGE = 'Design has been modified';
+    END IF;
+
+    FOR operation IN SELECT * FROM jsonb_array_elements(p_operations) LOOP
+        op_name := operation->>'op';
+        target := ARRAY(SELECT jsonb_array_elements_text(operation->'path'));
+        new_value := operation->'value';
+
+        -- move/copy are an add of the value found at "from"
+        IF op_name IN ('move', 'copy') THEN
+            source := ARRAY(SELECT jsonb_array_elements_text(operation->'from'));
+            IF NOT design_json_array_indexes_valid(doc, source) THEN
+                RAISE SQLSTATE 'PT422' USING MESSAGE = 'Invalid array index: ' || (operation->>'from_pointer');
+            END IF;
+            new_value := doc #> source;
+            IF new_value IS NULL THEN
+                RAISE SQLSTATE 'PT422' USING MESSAGE = 'Path not found: ' || (operation->>'from_pointer');
+            END IF;
+            IF op_name = 'move' THEN
+                IF cardinality(target) > cardinality(source)
+                   AND target[1:cardinality(source)] = source THEN
+                    RAISE SQLSTATE 'PT422' USING MESSAGE = 'Cannot move a value into itself';
+                END IF;
+                doc := doc #- source;
+            END IF;
+            op_name := 'add';
+        END IF;
+
+        -- add checks its parent here and its last segment below, where "-"
+        -- and the index one past the end are allowed
+        IF NOT design_json_array_indexes_valid(
+            doc, CASE WHEN op_name = 'add' THEN target[1:cardinality(target) - 1] ELSE target END
+        ) THEN
+            RAISE SQLSTATE 'PT422' USING MESSAGE = 'Invalid array index: ' || (operation->>'pointer');
+        END IF;
+
+        IF op_name = 'test' THEN
+            IF (doc #> target) IS DISTINCT FROM new_value THEN
+                RAISE SQLSTATE 'PT409' USING MESSAGE = 'Test failed: ' || (operation->>'pointer');
+            END IF;
+            CONTINUE;
+        END IF;
+
+        IF op_name IN ('remove', 'replace') THEN
+            -- The root ("") can be replaced (like a root add) but not removed
+            IF (op_name = 'remove' AND cardinality(target) = 0) OR (doc #> target) IS NULL THEN
+                RAISE SQLSTATE 'PT422' USING MESSAGE = 'Path not found: ' || (operation->>'pointer');
+            END IF;
+        END IF;
+
+        IF op_name = 'remove' THEN
+            doc := doc #- target;
+        ELSIF op_name = 'replace' THEN
+            IF cardinality(target) = 0 THEN
+                doc := new_value;
+            ELSE
+                doc := jsonb_set(doc, target, new_value, false);
+            END IF;
+        ELSIF op_name = 'add' THEN
+            IF cardinality(target) = 0 THEN
+                doc := new_value;
+            ELSE
+                parent_path := target[1:cardinality(target) - 1];
+                parent := doc #> parent_path;
+                last_segment := target[cardinality(target)];
+                IF parent IS NULL THEN
+                    RAISE SQLSTATE 'PT422' USING MESSAGE = 'Parent not found: ' || (operation->>'pointer');
+                ELSIF jsonb_typeof(parent) = 'array' THEN
+                    IF last_segment = '-' THEN
+                        parent := parent || jsonb_build_array(new_value);
+                        doc := CASE WHEN cardinality(parent_path) = 0 THEN parent
+                                    ELSE jsonb_set(doc, parent_path, parent) END;
+                        target := parent_path || (jsonb_array_length(parent) - 1)::text;
+                    ELSIF last_segment !~ '^(0|[1-9][0-9]{0,8})$'
+                          OR last_segment::int > jsonb_array_length(parent) THEN
+                        RAISE SQLSTATE 'PT422' USING MESSAGE = 'Invalid array index: ' || (operation->>'pointer');
+                    ELSE
+                        doc := jsonb_insert(doc, target, new_value);
+                    END IF;
+                ELSIF jsonb_typeof(parent) = 'object' THEN
+                    doc := jsonb_set(doc, target, new_value, true);
+                ELSE
+                    RAISE SQLSTATE 'PT422' USING MESSAGE = 'Parent is not a container: ' || (operation->>'pointer');
+                END IF;
+            END IF;
+        ELSE
+            RAISE SQLSTATE 'PT422' USING MESSAGE = 'Unsupported operation: ' || coalesce(op_name, 'null');
+        END IF;
+
+        changes := changes || jsonb_build_array(jsonb_build_object(
+            'op', operation->>'op',
+            'path', operation->'pointer',
+            -- After an array remove, doc #> target is the element that shifted in
+            'value', CASE WHEN op_name = 'remove' THEN NULL ELSE doc #> target END
+        ));
+    END LOOP;
+
+    UPDATE designs
+    SET design_json = doc
+    WHERE id = p_design_id
+    RETURNING updated_at INTO new_updated_at;
+
+    RETURN jsonb_build_object(
+        'id', p_design_id,
+        'updated_at', new_updated_at,
+        'changes', changes
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION design_json_array_indexes_valid IS 'Check that every array index in a JSON Pointer path is canonical and in range';
+COMMENT ON FUNCTION apply_design_json_patch IS 'Apply an RFC 6902 JSON Patch to a design''s design_json in one statement';